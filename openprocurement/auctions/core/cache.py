@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from json import dumps
+from threading import Lock
+
+from openprocurement.api.utils import get_now
+
+from openprocurement.auctions.core.constants import ETAG_UNSTABLE_STATUSES
+from openprocurement.auctions.core.models import calc_auction_end_time
+
+
+class SerializedCache(object):
+    """LRU cache of serialized auctions and their sub-resources
+    limited by the summary size in bytes of the entries kept.
+
+    Entries are shared between requests and must not be changed.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, now):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            data, size, expires = entry
+            if expires is not None and expires <= now:
+                self.size -= size
+                return
+            self.entries[key] = entry
+            return data
+
+    def set(self, key, data, expires=None):
+        size = len(dumps(data, default=unicode))
+        if size > self.max_size:
+            return
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+            self.entries[key] = (data, size, expires)
+            self.size += size
+            while self.size > self.max_size:
+                _, entry = self.entries.popitem(last=False)
+                self.size -= entry[1]
+
+
+def get_auction_stable_until(auction, now):
+    """Time until which the serialized auction changes only with the
+    document: `None` if it doesn't depend on time at all and `now` if
+    it may change at any moment.
+    """
+    if auction.status != 'active.tendering':
+        return now if auction.status in ETAG_UNSTABLE_STATUSES else None
+    # `shouldStartAfter` of the auction period changes
+    # once the planned auction should have been ended
+    ends = []
+    if not auction.lots:
+        period = auction.auctionPeriod
+        if period and period.startDate and not period.endDate:
+            ends.append(calc_auction_end_time(auction.numberOfBids, period.startDate))
+    for lot in auction.lots:
+        period = lot.auctionPeriod
+        if lot.status == 'active' and period and period.startDate and not period.endDate:
+            ends.append(calc_auction_end_time(lot.numberOfBids, period.startDate))
+    ends = [i for i in ends if i > now]
+    return min(ends) if ends else None
+
+
+def serialize_cached(request, role, serialize, expires=None):
+    """Serialized representation of the requested resource of the auction.
+
+    `serialize` is called without arguments on a cache miss, its result
+    is kept until the auction changes or `expires` comes.
+    """
+    cache = getattr(request.registry, 'serialized_cache', None)
+    if cache is None:
+        return serialize()
+    now = get_now()
+    if expires is not None and expires <= now:
+        return serialize()
+    auction = request.validated['auction']
+    key = (
+        auction.id,
+        auction.rev,
+        request.path,
+        role,
+        getattr(request.registry, 'use_docservice', False),
+        getattr(request.registry, 'docservice_url', None),
+    )
+    data = cache.get(key, now)
+    if data is None:
+        data = serialize()
+        cache.set(key, data, expires)
+    return data
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from schematics.exceptions import ValidationError
+from schematics.types import BaseType, StringType
+
+from openprocurement.api.models.auction_models import CPV_CODES
+from openprocurement.auctions.core.constants import (
+    CAVPS_CODES_DGF_CDB2,
+    CLASSIFICATION_ERROR_CODES,
+    CPVS_CODES_DGF_CDB2,
+    CPV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2,
+    CAV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2
+)
+
+
+class PrefixTrie(object):
+    """Prefixes of codes, which are matched char by char,
+    so a match costs no more than the length of the longest prefix
+    """
+
+    def __init__(self, prefixes):
+        self.root = {}
+        for prefix in prefixes:
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[None] = True
+
+    def match(self, code):
+        """Whether the code starts with one of the prefixes"""
+        node = self.root
+        for char in code:
+            if None in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return None in node
+
+
+def get_choices_message(codes):
+    """Error message for a code not in `codes`, listing at most
+    CLASSIFICATION_ERROR_CODES of them
+    """
+    codes = list(codes)
+    if len(codes) <= CLASSIFICATION_ERROR_CODES:
+        return BaseType.MESSAGES['choices'].format(unicode(codes))
+    choices = u'{}, ... ({} more)]'.format(unicode(codes[:CLASSIFICATION_ERROR_CODES])[:-1],
+                                          len(codes) - CLASSIFICATION_ERROR_CODES)
+    return BaseType.MESSAGES['choices'].format(choices)
+
+
+class CodeType(StringType):
+    """String with one of the codes, looked up in a frozenset instead of
+    the `choices` list
+    """
+
+    def __init__(self, codes, **kwargs):
+        super(CodeType, self).__init__(**kwargs)
+        self.codes = frozenset(codes)
+        self.codes_message = get_choices_message(codes)
+
+    def validate_code(self, value):
+        if value not in self.codes:
+            raise ValidationError(self.codes_message)
+
+
+# codes of classification schemes
+CLASSIFICATION_CODES = {
+    u'CPV': frozenset(CPV_CODES),
+    u'CAV-PS': frozenset(CAVPS_CODES_DGF_CDB2),
+    u'CPVS': frozenset(CPVS_CODES_DGF_CDB2),
+}
+CLASSIFICATION_MESSAGES = {
+    u'CPV': get_choices_message(CPV_CODES),
+    u'CAV-PS': get_choices_message(CAVPS_CODES_DGF_CDB2),
+    u'CPVS': get_choices_message(CPVS_CODES_DGF_CDB2),
+}
+# classes of codes, which items have no specific location
+NON_SPECIFIC_LOCATION_UNITS = {
+    u'CPV': PrefixTrie(CPV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2),
+    u'CAV-PS': PrefixTrie(CAV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2),
+}
+
+
+def validate_classification_code(scheme, code):
+    codes = CLASSIFICATION_CODES.get(scheme)
+    if codes is not None and code not in codes:
+        raise ValidationError(CLASSIFICATION_MESSAGES[scheme])
+
+
+def is_location_required(scheme, code):
+    """Whether an item classified with the code should have a location"""
+    units = NON_SPECIFIC_LOCATION_UNITS.get(scheme)
+    return units is not None and not units.match(code)
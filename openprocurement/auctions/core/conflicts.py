@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from copy import deepcopy
+from logging import getLogger
+from time import sleep, time
+
+from jsonpatch import JsonPatchException, apply_patch, make_patch
+from jsonpointer import JsonPointerException
+
+from openprocurement.auctions.core.constants import CONFLICTS_BATCH_SIZE
+
+LOGGER = getLogger(__name__)
+# fields of the auction document, which aren't tracked by revisions
+UNTRACKED_FIELDS = ('_id', '_rev', '_attachments', '_conflicts', 'revisions', 'dateModified')
+
+
+class UnresolvableConflict(Exception):
+    """Raised when conflicting revisions of a document can't be merged"""
+
+
+def get_revision_key(revision):
+    return revision.get('rev'), revision.get('date')
+
+
+def get_tracked_data(doc):
+    return dict([(i, deepcopy(j)) for i, j in doc.items() if i not in UNTRACKED_FIELDS])
+
+
+def get_changed_paths(patch):
+    """Paths changed by the patch, cut at the first list index,
+    as operations on list items shift each other
+    """
+    paths = set()
+    for operation in patch:
+        parts = []
+        for part in operation['path'].split('/')[1:]:
+            if part.isdigit() or part == '-':
+                break
+            parts.append(part)
+        paths.add(tuple(parts))
+    return paths
+
+
+def is_overlapping(paths, other):
+    return any([i[:len(j)] == j or j[:len(i)] == i for i in paths for j in other])
+
+
+def get_forward_changes(doc, revisions):
+    """Patches that made the last `revisions` of the document, oldest first.
+
+    Revisions hold patches to the previous state, so the states are
+    restored from the document backwards.
+    """
+    state = get_tracked_data(doc)
+    changes = []
+    for revision in reversed(revisions):
+        previous = apply_patch(state, revision['changes'])
+        changes.insert(0, make_patch(previous, state).patch)
+        state = previous
+    return changes
+
+
+def merge_conflict(winner, loser):
+    """Replay changes of the conflicting revision `loser` on `winner`.
+
+    Changes made by revisions of `loser` since the common history are applied
+    to `winner` with new revisions, unless they touch the same fields as the
+    ones made by `winner` since then.
+    """
+    if winner.get('doc_type') != 'Auction' or loser.get('doc_type') != 'Auction':
+        raise UnresolvableConflict('Not an auction')
+    if winner.get('revisionsChunks') != loser.get('revisionsChunks'):
+        raise UnresolvableConflict('Revisions moved to chunks since the common history')
+    winner_keys = set([get_revision_key(i) for i in winner.get('revisions', [])])
+    loser_keys = set([get_revision_key(i) for i in loser.get('revisions', [])])
+    own = [i for i in loser.get('revisions', []) if get_revision_key(i) not in winner_keys]
+    if not own:
+        return False
+    if loser['revisions'][-len(own):] != own:
+        raise UnresolvableConflict('No common history')
+    try:
+        changes = get_forward_changes(loser, own)
+    except (JsonPatchException, JsonPointerException):
+        raise UnresolvableConflict('Broken revisions')
+    winner_paths = set()
+    for revision in winner.get('revisions', []):
+        if get_revision_key(revision) not in loser_keys:
+            winner_paths.update(get_changed_paths(revision['changes']))
+    loser_paths = set()
+    for patch in changes:
+        loser_paths.update(get_changed_paths(patch))
+    if is_overlapping(winner_paths, loser_paths):
+        raise UnresolvableConflict('Same fields changed')
+
+    for revision, patch in zip(own, changes):
+        src = get_tracked_data(winner)
+        try:
+            dst = apply_patch(src, patch)
+        except (JsonPatchException, JsonPointerException):
+            raise UnresolvableConflict('Changes not applicable')
+        for key in set(src).difference(dst):
+            del winner[key]
+        winner.update(dst)
+        # the revision keeps its rev and date, so it's known as replayed
+        winner['revisions'].append(dict(revision, changes=make_patch(dst, src).patch))
+    winner['dateModified'] = max(winner.get('dateModified'), loser.get('dateModified'))
+    return True
+
+
+def normalize_auction(doc, models, root=None):
+    """The merged auction document run through its model, so fields derived
+    from the merged ones (`next_check`, `numberOfBids` etc.) are computed again
+    """
+    model = models.get(doc.get('procurementMethodType'))
+    if model is None:
+        raise UnresolvableConflict('procurementMethodType is not implemented')
+    # the stored next_check would be kept for the merged document
+    auction = model(dict([(i, j) for i, j in doc.items() if i != 'next_check']))
+    auction.__parent__ = root
+    data = auction.to_primitive()
+    for key in doc:
+        if key[:1] == '_' and key not in data:
+            data[key] = doc[key]
+    return data
+
+
+def resolve_conflict(db, doc, revs):
+    """Merge conflicting revisions `revs` of the document into `doc`"""
+    changed = False
+    for rev in revs:
+        loser = db.get(doc['_id'], rev=rev)
+        if loser is not None:
+            changed = merge_conflict(doc, loser) or changed
+    return changed
+
+
+def write_resolved(db, resolved):
+    """Save the merged documents, then delete conflicting revisions
+    of the saved and unchanged ones. Returns the number of resolved documents.
+    """
+    changed = [(doc, revs) for doc, revs, merged in resolved if merged]
+    done = [(doc['_id'], revs) for doc, revs, merged in resolved if not merged]
+    results = db.update([doc for doc, revs in changed]) if changed else []
+    for (doc, revs), (success, doc_id, rev) in zip(changed, results):
+        if success:
+            done.append((doc_id, revs))
+        else:
+            LOGGER.info('Conflicting auction {} changed while resolved: {}'.format(doc_id, rev),
+                        extra={'MESSAGE_ID': 'conflict_resolve_skipped'})
+    deleted = [{'_id': doc_id, '_rev': i, '_deleted': True} for doc_id, revs in done for i in revs]
+    if deleted:
+        db.update(deleted)
+    return len(done)
+
+
+def resolve_conflicts(db, models, batch_size=CONFLICTS_BATCH_SIZE, root=None):
+    """Resolve conflicts of auctions in the database.
+
+    Merged auctions are run through the models of their procurementMethodType
+    from `models`, with `root` as their parent.
+
+    Returns stats with numbers of resolved documents, ids of unresolvable
+    ones and the throughput. Unresolvable documents are left as is, documents
+    changed while resolved are skipped and can be resolved by the next run.
+    """
+    stats = {'resolved': 0, 'skipped': 0, 'unresolvable': []}
+    start = time()
+    resolved = []
+    for row in db.iterview('conflicts/all', batch_size, include_docs=True):
+        doc, revs = row.doc, [i for i in row.value if i != row.doc['_rev']]
+        try:
+            merged = resolve_conflict(db, doc, revs)
+            if merged:
+                doc = normalize_auction(doc, models, root)
+        except UnresolvableConflict as e:
+            stats['unresolvable'].append(doc['_id'])
+            LOGGER.warning('Unresolvable conflict of {}: {}'.format(doc['_id'], e),
+                           extra={'MESSAGE_ID': 'conflict_unresolvable'})
+            continue
+        resolved.append((doc, revs, merged))
+        if len(resolved) >= batch_size:
+            saved = write_resolved(db, resolved)
+            stats['resolved'] += saved
+            stats['skipped'] += len(resolved) - saved
+            resolved = []
+    saved = write_resolved(db, resolved)
+    stats['resolved'] += saved
+    stats['skipped'] += len(resolved) - saved
+    stats['elapsed'] = time() - start
+    stats['rate'] = stats['resolved'] / stats['elapsed'] if stats['elapsed'] else 0
+    LOGGER.info('Resolved {resolved} conflicts in {elapsed:.2f}s ({rate:.2f}/s), '
+                '{skipped} skipped, {0} unresolvable'.format(len(stats['unresolvable']), **stats),
+                extra={'MESSAGE_ID': 'conflicts_resolved'})
+    return stats
+
+
+def main():
+    """Resolve conflicts of auctions once or, with `--interval`, every
+    given number of seconds. Run by a single process, as resolvers running
+    at once would conflict with each other.
+    """
+    parser = ArgumentParser(description='Resolve conflicts of auctions')
+    parser.add_argument('config', help='Path to .ini file')
+    parser.add_argument('--batch-size', type=int, default=CONFLICTS_BATCH_SIZE)
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Seconds between runs, conflicts are resolved once if it\'s 0')
+    args = parser.parse_args()
+
+    from pyramid.paster import bootstrap, setup_logging
+    setup_logging(args.config)
+    env = bootstrap(args.config)
+    registry = env['registry']
+    try:
+        while True:
+            try:
+                stats = resolve_conflicts(registry.db, registry.auction_procurementMethodTypes,
+                                          args.batch_size, env['root'])
+            except Exception as e:  # pragma: no cover
+                if not args.interval:
+                    raise
+                LOGGER.error('Conflicts resolver failed: {}'.format(e),
+                             extra={'MESSAGE_ID': 'conflicts_resolver_failed'})
+            if not args.interval:
+                break
+            sleep(args.interval)
+    finally:
+        env['closer']()
+    print('Resolved: {resolved}, skipped: {skipped}, unresolvable: {0}, {rate:.2f}/s'.format(
+        len(stats['unresolvable']), **stats))
+    for doc_id in stats['unresolvable']:
+        print(doc_id)
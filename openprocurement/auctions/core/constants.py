@@ -25,6 +25,8 @@ CPV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2 = (
     '79', '80', '85', '90', '92', '98'
 )
 CAV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2 = ('07', '08')
+# Number of codes listed in the error of a code not in classification
+CLASSIFICATION_ERROR_CODES = 10
 DGF_CDB2_ADDRESS_REQUIRED_FROM = datetime(2018, 5, 9, tzinfo=TZ)
 DGF_CDB2_CLASSIFICATION_PRECISELY_FROM = datetime(2017, 7, 19, tzinfo=TZ)
 
@@ -54,6 +56,78 @@ DGF_DECISION_REQUIRED_FROM = datetime(2017, 1, 1, tzinfo=TZ)
 
 ADDITIONAL_CLASSIFICATIONS_SCHEMES = [u'ДКПП', u'NONE', u'ДК003', u'ДК015', u'ДК018']
 
+# Auction fields, which values hold fields computed from the rest of the
+# auction, so they're diffed on each save even if they weren't written
+COMPUTED_SUBTREES = ('auctionPeriod', 'lots')
+# Auction fields, which values fields computed within the rest of the
+# auction depend on, like urls of documents on the status, so the whole
+# auction is diffed on saves writing them
+COMPUTED_DEPENDENCIES = ('status', 'procurementMethodDetails', 'submissionMethodDetails', 'mode')
+
+# Seconds between checks of the index of a staging design doc
+DESIGN_WARM_UP_INTERVAL = 10
+
+# Max summary size in bytes of serialized auctions and their sub-resources
+# kept in memory by a process, nothing is kept if it's 0
+SERIALIZED_CACHE_SIZE = 0
+
+# Whether GETs of auction-level questions, documents, cancellations and
+# complaints fetch only their list and PARTIAL_FETCH_FIELDS of the auction
+PARTIAL_FETCH = 0
+PARTIAL_FETCH_FIELDS = ('status', 'procurementMethodType', 'mode', 'owner', 'owner_token', 'auctionID', 'dateModified')
+PARTIAL_FETCH_SUBTREES = ('questions', 'documents', 'cancellations', 'complaints')
+
+# Whether models are exported with serializers compiled per model and role
+# instead of the export loop of schematics. The output is the same, but the
+# serializable fields skipped by a role aren't evaluated, so it's opt-in
+COMPILED_SERIALIZERS = 0
+
+# Auction fields `next_check` depends on, while none of them changes
+# the stored `next_check` is used until it comes
+NEXT_CHECK_FIELDS = (
+    'status', 'enquiryPeriod', 'tenderPeriod', 'auctionPeriod', 'lots', 'bids',
+    'complaints', 'awards', 'contracts', 'procurementMethodDetails'
+)
+
+# Number of signed docservice download URLs kept in memory
+DOCSERVICE_URL_CACHE_SIZE = 10000
+
+# Number of auction revisions, which local roles and ACL are kept in memory
+ACCESS_CACHE_SIZE = 1000
+
+# Max number of revisions kept in a chunk document out of the auction,
+# revisions are kept in the auction document if it's 0
+REVISIONS_CHUNK_SIZE = 0
+REVISIONS_PAGE_SIZE = 100
+REVISIONS_PAGE_MAX_SIZE = 1000
+
+# Page size of auctions due for a check
+DUE_AUCTIONS_PAGE_SIZE = 100
+DUE_AUCTIONS_PAGE_MAX_SIZE = 1000
+
+# Number of auctionID daily indices leased by a process at once
+AUCTION_ID_BLOCK_SIZE = 1
+# Number of attempts to lease auctionID indices on conflicting writes
+AUCTION_ID_LEASE_ATTEMPTS = 10
+
+# Auction statuses, in which the representation of an auction changes
+# with time (`shouldStartAfter` of the auction period while tendering,
+# `next_check` during the auction), so it gets no ETag
+ETAG_UNSTABLE_STATUSES = ('active.tendering', 'active.auction')
+
+# Max number of seconds a request to the changes feed waits for new changes,
+# the request holds a worker while it waits
+CHANGES_LONGPOLL_TIMEOUT = 5
+
+# Max number of auctions created with one batch request
+AUCTIONS_BATCH_MAX_SIZE = 100
+
+# Number of conflicting auctions resolved with one bulk write
+CONFLICTS_BATCH_SIZE = 100
+
+# Max number of re-runs of a view opted in for replay on auction save conflicts
+CONFLICT_REPLAY_ATTEMPTS = 3
+
 # Declares what roles can interact with document in different statuses
 STATUS4ROLE = {
     'complaint_owner': ['draft', 'answered'],
@@ -1,12 +1,29 @@
 # -*- coding: utf-8 -*-
+from hashlib import sha1
+from json import dumps
+from logging import getLogger
+from threading import Thread
+from time import sleep
+
+from couchdb.client import Row
 from couchdb.design import ViewDefinition
+from couchdb.http import ResourceConflict, ResourceNotFound
 from openprocurement.api import design
 
+from openprocurement.auctions.core.constants import DESIGN_WARM_UP_INTERVAL
+
+LOGGER = getLogger(__name__)
+DESIGN_HASH = 'design_hash'
+STAGING_SUFFIX = '_staging'
+
+# Fields emitted by the listing views for auctions of any procurementMethodType,
+# large subtrees like `lots` are emitted only for the procurementMethodTypes
+# registered with `register_auction_listing_projection`
 FIELDS = [
     'auctionPeriod',
     'status',
     'auctionID',
-    'lots',
+    #'lots',
     'procurementMethodType',
     'next_check',
     #'auctionUrl',
@@ -28,21 +45,188 @@ FIELDS = [
 CHANGES_FIELDS = FIELDS + [
     'dateModified',
 ]
+# Names, conditions, keys and fields of the listing views
+LISTING_VIEWS = []
+LISTING_MAP_FUN = '''function(doc) {
+    if(doc.doc_type == 'Auction' && doc.status != 'draft'%(condition)s) {
+        var projections=%(projections)s, data={};
+        var fields=projections[doc.procurementMethodType] || %(fields)s;
+        for (var i in fields) {
+            if (doc[fields[i]]) {
+                data[fields[i]] = doc[fields[i]]
+            }
+        }
+        %(emit)s
+    }
+}'''
+# Show functions of design docs, by design doc name
+SHOWS = {
+    # auction document with only `_id`, `_rev`, `doc_type` and the comma
+    # separated top-level `fields`
+    'auctions': {'partial': '''function(doc, req) {
+    if(!doc || doc.doc_type != 'Auction') {
+        return {code: 404, json: {error: 'not_found', reason: 'missing'}};
+    }
+    var fields=(req.query.fields || '').split(','), data={_id: doc._id, _rev: doc._rev, doc_type: doc.doc_type};
+    for (var i in fields) {
+        if (fields[i] in doc) {
+            data[fields[i]] = doc[fields[i]]
+        }
+    }
+    return {json: data};
+}'''},
+}
 
 
 def add_design():
     for i, j in globals().items():
         if "_view" in i:
             setattr(design, i, j)
+    # design docs are synced by the API with its `add_index_options` callback
+    # and `ViewDefinition.sync_many`, which are looked up when it syncs them
+    design.add_index_options = add_index_options
+    design.ViewDefinition = StagedViewDefinition
 
 
 def add_index_options(doc):
     doc['options'] = {'local_seq': True}
+    shows = SHOWS.get(doc['_id'][len('_design/'):])
+    if shows:
+        doc['shows'] = dict(doc.get('shows', {}), **shows)
+
+
+def get_listing_map_fun(condition, keys, fields, projections=None):
+    """Map function of a listing view, which emits `fields` of auctions
+    and the fields of `projections` for auctions of their procurementMethodType
+    """
+    projections = dict([(i, fields + [k for k in j if k not in fields]) for i, j in (projections or {}).items()])
+    return LISTING_MAP_FUN % {
+        'condition': condition,
+        'projections': dumps(projections, sort_keys=True),
+        'fields': dumps(fields),
+        'emit': '\n        '.join(['emit({}, data);'.format(i) for i in keys]),
+    }
+
+
+def add_listing_projections(projections):
+    """Replace the listing views synced by the API with ones emitting the
+    fields of `projections`, a mapping of procurementMethodType to the
+    fields emitted in addition to FIELDS for its auctions.
+    """
+    for name, view_name, condition, keys, fields in LISTING_VIEWS:
+        map_fun = get_listing_map_fun(condition, keys, fields, projections)
+        setattr(design, name, ViewDefinition('auctions', view_name, map_fun))
+
+
+class FilteredView(object):
+    """Rows of a view with composite keys starting with `prefix`,
+    keyed by the last item of the key like the listing views.
+    """
+
+    def __init__(self, view, prefix):
+        self.view = view
+        self.prefix = list(prefix)
+
+    def __call__(self, db, startkey=None, descending=False, **options):
+        # {} is collated after any key, so it bounds the prefix from above
+        if startkey is None or startkey == '':
+            start = self.prefix + ([{}] if descending else [])
+        else:
+            start = self.prefix + [startkey]
+        end = self.prefix + ([] if descending else [{}])
+        for row in self.view(db, startkey=start, endkey=end, descending=descending, **options):
+            yield Row(row, key=row.key[-1])
 
 
-def sync_design(db):
+def get_design_docs(views, callback=None):
+    """Design docs with the views stamped with the hash of their content"""
+    docs = {}
+    for view in views:
+        doc = docs.setdefault(view.design, {'_id': '_design/{}'.format(view.design),
+                                            'language': view.language, 'views': {}})
+        funcs = {'map': view.map_fun}
+        if view.reduce_fun:
+            funcs['reduce'] = view.reduce_fun
+        if view.options:
+            funcs['options'] = view.options
+        doc['views'][view.name] = funcs
+    for doc in docs.values():
+        if callback is not None:
+            callback(doc)
+        doc[DESIGN_HASH] = sha1(dumps(doc, sort_keys=True)).hexdigest()
+    return docs
+
+
+def sync_design_docs(db, views, callback=None, remove_missing=False, warm_up=True):
+    """Update design docs, which views changed.
+
+    Design docs in use are updated through staging ones, which indexes
+    are built in background first. The index is shared by design docs
+    with the same views, so the updated one is ready to be queried.
+    """
+    for data in get_design_docs(views, callback).values():
+        doc = db.get(data['_id'], {'_id': data['_id']})
+        if doc.get(DESIGN_HASH) == data[DESIGN_HASH]:
+            continue
+        for key in ('views', 'shows'):
+            if key in doc and not remove_missing:
+                data[key] = dict(doc[key], **data.get(key, {}))
+        doc.update(data)
+        if '_rev' in doc and warm_up:
+            stage_design(db, doc)
+        else:
+            db.save(doc)
+
+
+def stage_design(db, doc):
+    staging_id = doc['_id'] + STAGING_SUFFIX
+    staging = db.get(staging_id, {'_id': staging_id})
+    staging.update(dict([(i, j) for i, j in doc.items() if i not in ('_id', '_rev')]))
+    db.save(staging)
+    thread = Thread(target=warm_up_design, args=(db, doc, staging_id))
+    thread.daemon = True
+    thread.start()
+
+
+def warm_up_design(db, doc, staging_id):
+    name = staging_id[len('_design/'):]
+    view = '{}/{}'.format(name, sorted(doc['views'])[0])
+    try:
+        db.view(view, limit=0, stale='update_after').rows
+        while db.info(name)['view_index'].get('updater_running'):
+            sleep(DESIGN_WARM_UP_INTERVAL)
+        # returns at once unless the index is still behind the database
+        db.view(view, limit=0).rows
+    except ResourceNotFound:
+        # swapped in by another process
+        return
+    try:
+        db.save(doc)
+    except ResourceConflict:
+        LOGGER.info('Design doc {} changed while warmed up'.format(doc['_id']),
+                    extra={'MESSAGE_ID': 'design_warm_up_conflict'})
+    else:
+        LOGGER.info('Updated design doc {}'.format(doc['_id']),
+                    extra={'MESSAGE_ID': 'design_updated'})
+    try:
+        db.delete(db[staging_id])
+    except (ResourceConflict, ResourceNotFound):
+        pass
+
+
+class StagedViewDefinition(ViewDefinition):
+    """View definition, which design docs are synced by content hash
+    through warmed up staging design docs.
+    """
+
+    @staticmethod
+    def sync_many(db, views, remove_missing=False, callback=None):
+        sync_design_docs(db, views, callback=callback, remove_missing=remove_missing)
+
+
+def sync_design(db, warm_up=True):
     views = [j for i, j in globals().items() if "_view" in i]
-    ViewDefinition.sync_many(db, views, callback=add_index_options)
+    sync_design_docs(db, views, callback=add_index_options, warm_up=warm_up)
 
 
 auctions_all_view = ViewDefinition('auctions', 'all', '''function(doc) {
@@ -52,77 +236,56 @@ auctions_all_view = ViewDefinition('auctions', 'all', '''function(doc) {
 }''')
 
 
-auctions_by_dateModified_view = ViewDefinition('auctions', 'by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
+def listing_definition(name, condition, keys, fields):
+    LISTING_VIEWS.append(('auctions_{}_view'.format(name), name, condition, keys, fields))
+    return ViewDefinition('auctions', name, get_listing_map_fun(condition, keys, fields))
 
-auctions_real_by_dateModified_view = ViewDefinition('auctions', 'real_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft' && !doc.mode) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
 
-auctions_test_by_dateModified_view = ViewDefinition('auctions', 'test_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft' && doc.mode == 'test') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
+auctions_by_dateModified_view = listing_definition('by_dateModified', '', ['doc.dateModified'], FIELDS)
 
-auctions_by_local_seq_view = ViewDefinition('auctions', 'by_local_seq', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc._local_seq, data);
-    }
-}''' % CHANGES_FIELDS)
+auctions_real_by_dateModified_view = listing_definition('real_by_dateModified', ' && !doc.mode', ['doc.dateModified'], FIELDS)
 
-auctions_real_by_local_seq_view = ViewDefinition('auctions', 'real_by_local_seq', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft' && !doc.mode) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc._local_seq, data);
+auctions_test_by_dateModified_view = listing_definition('test_by_dateModified', " && doc.mode == 'test'", ['doc.dateModified'], FIELDS)
+
+auctions_by_local_seq_view = listing_definition('by_local_seq', '', ['doc._local_seq'], CHANGES_FIELDS)
+
+auctions_real_by_local_seq_view = listing_definition('real_by_local_seq', ' && !doc.mode', ['doc._local_seq'], CHANGES_FIELDS)
+
+auctions_test_by_local_seq_view = listing_definition('test_by_local_seq', " && doc.mode == 'test'", ['doc._local_seq'], CHANGES_FIELDS)
+
+# auctions are emitted with [procurementMethodType, dateModified] keys
+# to be filtered by procurementMethodType in dateModified order
+TYPE_KEYS = ['[doc.procurementMethodType, doc.dateModified]']
+
+auctions_type_by_dateModified_view = listing_definition('type_by_dateModified', '', TYPE_KEYS, FIELDS)
+
+auctions_real_type_by_dateModified_view = listing_definition('real_type_by_dateModified', ' && !doc.mode', TYPE_KEYS, FIELDS)
+
+auctions_test_type_by_dateModified_view = listing_definition('test_type_by_dateModified', " && doc.mode == 'test'", TYPE_KEYS, FIELDS)
+
+# and with [procurementMethodType, status, dateModified] keys
+# to be filtered by procurementMethodType and status
+TYPE_STATUS_KEYS = ['[doc.procurementMethodType, doc.status, doc.dateModified]']
+
+auctions_type_status_by_dateModified_view = listing_definition('type_status_by_dateModified', '', TYPE_STATUS_KEYS, FIELDS)
+
+auctions_real_type_status_by_dateModified_view = listing_definition('real_type_status_by_dateModified', ' && !doc.mode', TYPE_STATUS_KEYS, FIELDS)
+
+auctions_test_type_status_by_dateModified_view = listing_definition('test_type_status_by_dateModified', " && doc.mode == 'test'", TYPE_STATUS_KEYS, FIELDS)
+
+# next_check is emitted in UTC, so keys are ordered in time across DST changes
+auctions_by_next_check_view = ViewDefinition('auctions', 'by_next_check', '''function(doc) {
+    if(doc.doc_type == 'Auction' && doc.status != 'draft' && doc.next_check) {
+        var next_check = new Date(doc.next_check.replace(/\\.\\d+/, ''));
+        emit(isNaN(next_check) ? doc.next_check : next_check.toISOString(), doc.next_check);
     }
-}''' % CHANGES_FIELDS)
+}''')
 
-auctions_test_by_local_seq_view = ViewDefinition('auctions', 'test_by_local_seq', '''function(doc) {
-    if(doc.doc_type == 'Auction' && doc.status != 'draft' && doc.mode == 'test') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc._local_seq, data);
+auctions_revisions_chunks_view = ViewDefinition('auctions', 'revisions_chunks', '''function(doc) {
+    if(doc.doc_type == 'AuctionRevisions') {
+        emit([doc.auction_id, doc.index], doc.revisions.length);
     }
-}''' % CHANGES_FIELDS)
+}''')
 
 conflicts_view = ViewDefinition('conflicts', 'all', '''function(doc) {
     if (doc._conflicts) {
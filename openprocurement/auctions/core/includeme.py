@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from pyramid.events import ContextFound
+from pyramid.events import ApplicationCreated, ContextFound
+from pyramid.exceptions import ConfigurationError
 from pyramid.interfaces import IRequest
 
 from openprocurement.api.interfaces import (
@@ -13,22 +14,40 @@ from openprocurement.api.utils import (
     get_plugin_aliases
 )
 
+from openprocurement.auctions.core.constants import (
+    AUCTION_ID_BLOCK_SIZE,
+    CHANGES_LONGPOLL_TIMEOUT,
+    COMPILED_SERIALIZERS,
+    CONFLICT_REPLAY_ATTEMPTS,
+    PARTIAL_FETCH,
+    REVISIONS_CHUNK_SIZE,
+    SERIALIZED_CACHE_SIZE
+)
 from openprocurement.auctions.core.adapters import (
     AuctionConfigurator,
     AuctionAwardingNextCheckAdapter,
     AuctionManagerAdapter
 )
+from openprocurement.auctions.core.cache import SerializedCache
 from openprocurement.auctions.core.design import add_design
 from openprocurement.auctions.core.models import IAuction
+from openprocurement.auctions.core.serializers import (
+    compile_auction_serializers,
+    install_serializers
+)
 from openprocurement.auctions.core.interfaces import IAuctionManager
 from openprocurement.auctions.core.utils import (
     set_logging_context,
     extract_auction,
     register_auction_procurementMethodType,
+    register_auction_listing_projection,
     isAuction,
     auction_from_data,
+    auction_etag_view,
     init_plugins,
     awardingTypePredicate,
+    build_route_dispatch,
+    get_auction_route_dispatch,
     SubscribersPicker
 )
 from openprocurement.api.app import get_evenly_plugins
@@ -43,15 +62,41 @@ def includeme(config, plugin_map):
     # auction procurementMethodType plugins support
     config.registry.auction_procurementMethodTypes = {}
     config.registry.pmtConfigurator = {}
+    config.registry.auction_route_dispatch = {}
+    config.registry.auction_listing_projections = {}
+    config.registry.revisions_chunk_size = int(plugin_map.get('revisions_chunk_size', REVISIONS_CHUNK_SIZE))
+    config.registry.auction_id_block_size = int(plugin_map.get('auction_id_block_size', AUCTION_ID_BLOCK_SIZE))
+    if config.registry.auction_id_block_size < 1:
+        raise ConfigurationError('auction_id_block_size should be 1 or greater')
+    settings = config.registry.settings or {}
+    config.registry.changes_longpoll_timeout = int(settings.get(
+        'changes_longpoll_timeout',
+        plugin_map.get('changes_longpoll_timeout', CHANGES_LONGPOLL_TIMEOUT)
+    ))
+    config.registry.conflict_replay_attempts = int(plugin_map.get('conflict_replay_attempts', CONFLICT_REPLAY_ATTEMPTS))
+    config.registry.compiled_serializers = int(plugin_map.get('compiled_serializers', COMPILED_SERIALIZERS))
+    if config.registry.compiled_serializers:
+        install_serializers()
+        config.add_subscriber(compile_auction_serializers, ApplicationCreated)
+    config.registry.partial_fetch = int(plugin_map.get('partial_fetch', PARTIAL_FETCH))
+    serialized_cache_size = int(plugin_map.get('serialized_cache_size', SERIALIZED_CACHE_SIZE))
+    config.registry.serialized_cache = SerializedCache(serialized_cache_size) if serialized_cache_size else None
     config.add_route_predicate('auctionsprocurementMethodType', isAuction)
     config.add_route_predicate('awardingType', awardingTypePredicate)
     config.add_subscriber_predicate('auctionsprocurementMethodType', SubscribersPicker)
     config.add_request_method(extract_auction, 'auction', reify=True)
+    config.add_view_deriver(auction_etag_view)
+    config.add_request_method(get_auction_route_dispatch, 'auction_route_dispatch', reify=True)
+    config.add_subscriber(build_route_dispatch, ApplicationCreated)
     config.add_request_method(auction_from_data)
     config.add_directive(
         'add_auction_procurementMethodType',
         register_auction_procurementMethodType
     )
+    config.add_directive(
+        'add_auction_listing_projection',
+        register_auction_listing_projection
+    )
     config.scan("openprocurement.auctions.core.views")
     config.scan("openprocurement.api.subscribers")
     config.scan("openprocurement.auctions.core.subscribers")
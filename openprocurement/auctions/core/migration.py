@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from openprocurement.auctions.core.revisions import (
+    save_revisions_chunk,
+    split_revisions
+)
+
+
+def migrate_revisions_to_chunks(db, auction, chunk_size):
+    """Move revisions of the raw auction document above `chunk_size`
+    to chunk documents.
+
+    Chunks are saved immediately, the auction itself has to be saved
+    by the caller if it was changed.
+    """
+    chunks, revisions = split_revisions(auction.get('revisions', []), chunk_size)
+    if not chunks:
+        return False
+    index = auction.get('revisionsChunks', 0)
+    for chunk in chunks:
+        save_revisions_chunk(db, auction['_id'], index, chunk)
+        index += 1
+    auction['revisions'] = revisions
+    auction['revisionsChunks'] = index
+    return True
+
+
+def migrate_auctions_revisions(db, chunk_size, batch_size=100):
+    """Move revisions of all auctions in the database to chunk documents.
+
+    Returns the number of migrated auctions, auctions that were modified
+    concurrently are skipped and can be migrated by the next run.
+    """
+    migrated = 0
+    docs = []
+    for row in db.iterview('auctions/all', batch_size, include_docs=True):
+        if migrate_revisions_to_chunks(db, row.doc, chunk_size):
+            docs.append(row.doc)
+        if len(docs) >= batch_size:
+            migrated += len([i for i in db.update(docs) if i[0]])
+            docs = []
+    if docs:
+        migrated += len([i for i in db.update(docs) if i[0]])
+    return migrated
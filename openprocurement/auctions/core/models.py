@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime, timedelta, time
 from string import hexdigits
+from threading import Lock
 from uuid import uuid4
 from urlparse import (
     urlparse,
@@ -25,7 +27,11 @@ from schematics.types import (
     FloatType,
     BaseType
 )
-from schematics.types.compound import DictType
+from schematics.types.compound import (
+    DictType,
+    ListType as SchematicsListType,
+    ModelType as SchematicsModelType
+)
 from schematics.types.serializable import serializable
 from schematics_flexible.schematics_flexible import FlexibleModelType
 from openprocurement.schemas.dgf.schemas_store import SchemaStore
@@ -47,7 +53,7 @@ from openprocurement.api.models.auction_models import (
     Organization as BaseOrganization,
     Address,
     Location,
-    CPV_CODES,
+    CPV_CODES,  # noqa forwarded import
     schematics_embedded_role,
     schematics_default_role,
     IsoDateTimeType,
@@ -70,17 +76,21 @@ from openprocurement.api.utils import get_now, get_request_from_root
 from openprocurement.api.validation import validate_items_uniq  # noqa forwarded import
 
 from openprocurement.auctions.core.constants import (
+    ACCESS_CACHE_SIZE,
     DOCUMENT_TYPE_OFFLINE,
     DOCUMENT_TYPE_URL_ONLY,
     CAV_CODES_DGF,
     CAV_CODES_FLASH,
     ORA_CODES,
-    CPVS_CODES_DGF_CDB2,
-    CAVPS_CODES_DGF_CDB2,
-    CPV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2,
-    CAV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2,
     DGF_CDB2_ADDRESS_REQUIRED_FROM,
-    DGF_CDB2_CLASSIFICATION_PRECISELY_FROM
+    DOCSERVICE_URL_CACHE_SIZE,
+    DGF_CDB2_CLASSIFICATION_PRECISELY_FROM,
+    NEXT_CHECK_FIELDS
+)
+from openprocurement.auctions.core.classifications import (
+    CodeType,
+    is_location_required,
+    validate_classification_code
 )
 from openprocurement.auctions.core.utils import get_auction_creation_date
 from openprocurement.auctions.core.validation import (
@@ -88,7 +98,12 @@ from openprocurement.auctions.core.validation import (
 )
 
 view_complaint_role = (blacklist('owner_token', 'owner') + schematics_default_role)
-auction_embedded_role = (blacklist('owner_token', 'transfer_token') + schematics_embedded_role)
+auction_embedded_role = (blacklist('owner_token', 'transfer_token', 'revisionsChunks') + schematics_embedded_role)
+ACCESS_CACHE = OrderedDict()
+ACCESS_CACHE_LOCK = Lock()
+DOCSERVICE_URL_CACHE = OrderedDict()
+DOCSERVICE_URL_CACHE_LOCK = Lock()
+HIDDEN_FIELDS = {}
 
 
 deprecated('IAuction', 'IAuction moved to interfaces.py')
@@ -99,14 +114,388 @@ def get_auction(model):
     return model
 
 
+class TrackedDict(dict):
+    """ Data of a tracked model or a dict within it, which marks the field
+        of the auction it belongs to as written on any change. Fields of
+        the auction itself are marked by their own names.
+    """
+    __slots__ = ('written', 'field')
+
+    def __init__(self, data, written, field=None):
+        dict.__init__(self, data)
+        self.written = written
+        self.field = field
+
+    def mark(self, key):
+        if key[:1] == '_':
+            return
+        self.written.add(key if self.field is None else self.field)
+
+    def __setitem__(self, key, value):
+        self.mark(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.mark(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        data = dict(*args, **kwargs)
+        for key in data:
+            self.mark(key)
+        dict.update(self, data)
+
+    def pop(self, key, *args):
+        self.mark(key)
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self.mark(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.mark(key)
+        return dict.setdefault(self, key, default)
+
+    def clear(self):
+        for key in self:
+            self.mark(key)
+        dict.clear(self)
+
+
+def _tracked_method(name):
+    method = getattr(list, name)
+
+    def tracked(self, *args, **kwargs):
+        self.written.add(self.field)
+        return method(self, *args, **kwargs)
+    tracked.__name__ = name
+    return tracked
+
+
+class TrackedList(list):
+    """ List within a tracked model, which marks the field of the auction
+        it belongs to as written on any change.
+    """
+    __slots__ = ('written', 'field')
+
+    def __init__(self, items, written, field):
+        list.__init__(self, items)
+        self.written = written
+        self.field = field
+
+    __setitem__ = _tracked_method('__setitem__')
+    __delitem__ = _tracked_method('__delitem__')
+    __setslice__ = _tracked_method('__setslice__')
+    __delslice__ = _tracked_method('__delslice__')
+    __iadd__ = _tracked_method('__iadd__')
+    __imul__ = _tracked_method('__imul__')
+    append = _tracked_method('append')
+    extend = _tracked_method('extend')
+    insert = _tracked_method('insert')
+    pop = _tracked_method('pop')
+    remove = _tracked_method('remove')
+    reverse = _tracked_method('reverse')
+    sort = _tracked_method('sort')
+
+
+def track_changes(value, written, field):
+    """ Replace the data of models and the lists and dicts within `value`
+        with tracked ones, which mark `field` as written on change.
+        Returns the value to be put in place of the given one.
+    """
+    if isinstance(value, Model):
+        value._data = data = TrackedDict(value._data, written, field)
+        for key, item in data.items():
+            if key[:1] != '_' and isinstance(item, (Model, list, dict)):
+                dict.__setitem__(data, key, track_changes(item, written, field))
+    elif isinstance(value, list):
+        value = TrackedList([track_changes(i, written, field) for i in value], written, field)
+    elif isinstance(value, dict):
+        value = TrackedDict(dict([(k, track_changes(v, written, field)) for k, v in value.items()]),
+                            written, field)
+    return value
+
+
+class DirtyFieldsMixin(object):
+    """ Records which fields were written after `start_tracking` call.
+
+        Data of the model and of every model, list and dict within it is
+        replaced with tracked containers, which record writes only, so
+        reading the model costs the same as before. A field is written when
+        it's assigned, imported or deleted, or anything within its value is
+        changed.
+    """
+    _written = None
+
+    def start_tracking(self):
+        self._written = written = set()
+        self._data = data = TrackedDict(self._data, written)
+        for key, item in data.items():
+            if key[:1] != '_' and isinstance(item, (Model, list, dict)):
+                dict.__setitem__(data, key, track_changes(item, written, key))
+
+    def get_dirty_fields(self):
+        """ Names of fields that could differ from their state at the moment
+            of `start_tracking` call or None if tracking wasn't started.
+
+            Fields which names start with an underscore are always dirty.
+        """
+        if self._written is None:
+            return None
+        return self._written.union([i for i in self._data if i[:1] == '_'])
+
+
+class LazyHydrationMixin(object):
+    """ Allows to create a model with lists of models converted on first access.
+
+        Raw data of such lists is kept aside and the fields are left out of
+        the model data until they're read, so a request touching a single bid
+        or document doesn't convert the rest. Reads of the fields fall back
+        to `__getattr__`, which converts them. A field assigned before it's
+        read isn't converted at all. All lists are converted before
+        validation or import of data.
+    """
+    _lazy = None
+
+    @classmethod
+    def lazy(cls, raw_data):
+        instance = cls.__new__(cls)
+        instance._lazy = {}
+        instance.__init__(raw_data)
+        return instance
+
+    def convert(self, raw_data, **kw):
+        # only the data the model is created with is kept aside
+        if self._lazy is not None and '_data' not in self.__dict__ and raw_data:
+            raw_data = dict(raw_data)
+            for name, field in type(self)._fields.items():
+                key = field.serialized_name or name
+                if raw_data.get(key) and isinstance(field, SchematicsListType) and \
+                        isinstance(field.field, SchematicsModelType):
+                    self._lazy[name] = raw_data.pop(key)
+            data = super(LazyHydrationMixin, self).convert(raw_data, **kw)
+            for name in self._lazy:
+                data.pop(name, None)
+            return data
+        return super(LazyHydrationMixin, self).convert(raw_data, **kw)
+
+    def __getattr__(self, name):
+        lazy = self.__dict__.get('_lazy')
+        if lazy and name in lazy:
+            return self._hydrate(name)
+        raise AttributeError(name)
+
+    def __contains__(self, name):
+        return name in (self._lazy or ()) or super(LazyHydrationMixin, self).__contains__(name)
+
+    def __setitem__(self, name, value):
+        if name in (self._lazy or ()):
+            return setattr(self, name, value)
+        return super(LazyHydrationMixin, self).__setitem__(name, value)
+
+    def get_raw_list(self, name):
+        """Raw data of the list field while it isn't converted, None otherwise"""
+        lazy = self._lazy
+        if lazy and name in lazy and name not in self._data:
+            return lazy[name]
+
+    def _hydrate(self, name):
+        raw = self._lazy.pop(name)
+        if name in self._data:
+            return self._data[name]
+        value = type(self)._fields[name].to_native(raw)
+        for item in value:
+            item.__parent__ = self
+        written = getattr(self, '_written', None)
+        if written is not None:
+            value = track_changes(value, written, name)
+        dict.__setitem__(self._data, name, value)
+        return value
+
+    def _hydrate_all(self):
+        for name in list(self._lazy or []):
+            self._hydrate(name)
+        self._lazy = None
+
+    def import_data(self, raw_data, **kw):
+        self._hydrate_all()
+        return super(LazyHydrationMixin, self).import_data(raw_data, **kw)
+
+    def validate(self, *args, **kwargs):
+        self._hydrate_all()
+        return super(LazyHydrationMixin, self).validate(*args, **kwargs)
+
+
+def get_bid_owners(auction):
+    """Owners and tokens of bids of the auction, without converting lazy bids"""
+    raw = auction.get_raw_list('bids') if hasattr(auction, 'get_raw_list') else None
+    if raw is not None:
+        return [(i.get('owner'), i.get('owner_token')) for i in raw]
+    return [(i.owner, i.owner_token) for i in auction._data.get('bids') or []]
+
+
+def is_access_changed(auction):
+    """Whether owners of the auction or its bids could change since it was loaded"""
+    dirty = auction.get_dirty_fields()
+    return dirty is not None and bool(dirty.intersection(['owner', 'owner_token', 'bids']))
+
+
+def get_auction_access(auction):
+    """Local roles and ACL of the auction built from the owners of the auction
+    and its bids.
+
+    Both are cached by the auction revision, as owners are stored with it,
+    unless the owners could change since the auction was loaded. Access
+    built from a partially fetched auction, which lacks its bids, is never
+    cached. The cached ones are shared, so they're copied by the model.
+    """
+    key = (type(auction), auction.id, auction.rev)
+    cacheable = auction.rev and not is_access_changed(auction)
+    if cacheable:
+        with ACCESS_CACHE_LOCK:
+            access = ACCESS_CACHE.pop(key, None)
+            if access is not None:
+                ACCESS_CACHE[key] = access
+                return access
+    owner = '{}_{}'.format(auction.owner, auction.owner_token)
+    bids = ['{}_{}'.format(*i) for i in get_bid_owners(auction)]
+    roles = dict([(owner, 'auction_owner')] + [(i, 'bid_owner') for i in bids])
+    acl = tuple([(Allow, i, 'create_award_complaint') for i in bids] + [
+        (Allow, owner, 'edit_auction'),
+        (Allow, owner, 'upload_auction_documents'),
+        (Allow, owner, 'edit_complaint'),
+    ])
+    access = roles, acl
+    if cacheable and ACCESS_CACHE_SIZE and not getattr(auction, 'partial_fields', None):
+        with ACCESS_CACHE_LOCK:
+            ACCESS_CACHE[key] = access
+            while len(ACCESS_CACHE) > ACCESS_CACHE_SIZE:
+                ACCESS_CACHE.popitem(last=False)
+    return access
+
+
+def is_hidden_field(cls, role, field):
+    """Whether the field named as in the document URL is hidden by the role
+    of the model.
+
+    Filtering is done once per model and role for all of its fields,
+    other names are filtered each time.
+    """
+    if "_" in field:
+        field = field[0] + field.title().replace("_", "")[1:]
+    roles = cls._options.roles
+    gottago = roles[role if role in roles else 'default']
+    key = (cls, role)
+    hidden = HIDDEN_FIELDS.get(key)
+    if hidden is None:
+        hidden = HIDDEN_FIELDS[key] = frozenset([i for i in cls._fields if gottago(i, [])])
+    if field in cls._fields:
+        return field in hidden
+    return bool(gottago(field, []))
+
+
+def get_docservice_url(request, url, hashed):
+    """Signed docservice URL for the document `url`.
+
+    URLs are signed without expiry, so they are cached by the document URL
+    and the docservice address and key used to sign them.
+    """
+    registry = request.registry
+    key = (url, hashed, registry.docservice_url, getattr(registry, 'docservice_key', None))
+    with DOCSERVICE_URL_CACHE_LOCK:
+        signed = DOCSERVICE_URL_CACHE.pop(key, None)
+        if signed is not None:
+            DOCSERVICE_URL_CACHE[key] = signed
+            return signed
+    from openprocurement.api.utils import generate_docservice_url
+    doc_id = parse_qs(urlparse(url).query)['download'][-1]
+    if not hashed:
+        path = [i for i in urlparse(url).path.split('/') if len(i) == 32 and not set(i).difference(hexdigits)]
+        signed = generate_docservice_url(request, doc_id, False, '{}/{}'.format(path[0], path[-1]))
+    else:
+        signed = generate_docservice_url(request, doc_id, False)
+    if DOCSERVICE_URL_CACHE_SIZE:
+        with DOCSERVICE_URL_CACHE_LOCK:
+            DOCSERVICE_URL_CACHE[key] = signed
+            while len(DOCSERVICE_URL_CACHE) > DOCSERVICE_URL_CACHE_SIZE:
+                DOCSERVICE_URL_CACHE.popitem(last=False)
+    return signed
+
+
+def get_stored_next_check(auction):
+    """`next_check` stored with the revision the auction was loaded from,
+    or None if it has to be computed again.
+
+    The stored value is used while it hasn't come yet and none of
+    NEXT_CHECK_FIELDS could change since the auction was loaded, that is
+    the auction isn't tracked and is read by GET or its tracked fields
+    are clean.
+    """
+    doc = auction._initial
+    if not auction.rev or not isinstance(doc, dict) or doc.get('_rev') != auction.rev or not doc.get('next_check'):
+        return None
+    dirty = auction.get_dirty_fields()
+    if dirty is None:
+        request = get_request_from_root(auction)
+        if request is None or request.method != 'GET':
+            return None
+    elif dirty.intersection(NEXT_CHECK_FIELDS):
+        return None
+    if IsoDateTimeType().to_native(doc['next_check']) <= get_now():
+        return None
+    return doc['next_check']
+
+
+def get_lot_bids_counts(auction):
+    """Numbers of active bids of the auction by lot id.
+
+    Counts are built in one pass over the bids (raw ones while they aren't
+    converted) and kept on the auction until a bid status or lot values
+    change, or the list of bids is replaced, appended to or shrunk, so lots
+    don't scan the bids for each lookup.
+    """
+    bids = auction.get_raw_list('bids') if hasattr(auction, 'get_raw_list') else None
+    raw = bids is not None
+    if not raw:
+        bids = auction.bids
+    cached = auction.__dict__.get('_bids_counts')
+    if cached and cached[0] is bids and cached[1] == len(bids):
+        return cached[2]
+    counts = {}
+    for bid in bids:
+        if raw:
+            status = bid.get('status', 'active')
+            lots = [i.get('relatedLot') for i in bid.get('lotValues') or []]
+        else:
+            status = getattr(bid, 'status', 'active')
+            lots = [i.relatedLot for i in bid.lotValues]
+        if status != 'active':
+            continue
+        for lot_id in set(lots):
+            counts[lot_id] = counts.get(lot_id, 0) + 1
+    auction.__dict__['_bids_counts'] = (bids, len(bids), counts)
+    return counts
+
+
+def reset_bids_counts(model):
+    """Drop counts of bids of the auction of the changed bid or lot value"""
+    while model is not None and not IAuction.providedBy(model):
+        model = getattr(model, '__parent__', None)
+    if model is not None:
+        model.__dict__.pop('_bids_counts', None)
+
+
 class dgfCAVClassification(Classification):
     scheme = StringType(required=True, default=u'CAV', choices=[u'CAV'])
-    id = StringType(required=True, choices=CAV_CODES_DGF)
+    id = CodeType(CAV_CODES_DGF, required=True)
 
 
 class flashCAVClassification(Classification):
     scheme = StringType(required=True, default=u'CAV', choices=[u'CAV'])
-    id = StringType(required=True, choices=CAV_CODES_FLASH)
+    id = CodeType(CAV_CODES_FLASH, required=True)
 
 
 ADDITIONAL_CLASSIFICATIONS_SCHEMES = [u'ДКПП', u'NONE', u'ДК003', u'ДК015', u'ДК018']
@@ -157,18 +546,16 @@ class dgfCDB2CPVCAVClassification(Classification):
 
     def validate_id(self, data, code):
         auction = get_auction(data['__parent__'])
-        if data.get('scheme') == u'CPV' and code not in CPV_CODES:
-            raise ValidationError(BaseType.MESSAGES['choices'].format(unicode(CPV_CODES)))
-        elif data.get('scheme') == u'CAV-PS' and code not in CAVPS_CODES_DGF_CDB2:
-            raise ValidationError(BaseType.MESSAGES['choices'].format(unicode(CAVPS_CODES_DGF_CDB2)))
+        if data.get('scheme') in (u'CPV', u'CAV-PS'):
+            validate_classification_code(data['scheme'], code)
         if code.find("00000-") > 0 and get_auction_creation_date(auction) > DGF_CDB2_CLASSIFICATION_PRECISELY_FROM:
             raise ValidationError('At least {} classification class (XXXX0000-Y) should be specified more precisely'.format(data.get('scheme')))
 
 
 class dgfCDB2AdditionalClassification(Classification):
     def validate_id(self, data, code):
-        if data.get('scheme') == u'CPVS' and code not in CPVS_CODES_DGF_CDB2:
-            raise ValidationError(BaseType.MESSAGES['choices'].format(unicode(CPVS_CODES_DGF_CDB2)))
+        if data.get('scheme') == u'CPVS':
+            validate_classification_code(data['scheme'], code)
 
 
 class dgfCDB2Item(flashItem):
@@ -193,9 +580,7 @@ class dgfCDB2Item(flashItem):
         if not address:
             auction = get_auction(data['__parent__'])
             if get_auction_creation_date(auction) > DGF_CDB2_ADDRESS_REQUIRED_FROM:
-                non_specific_location_cav = data['classification']['scheme'] == u'CAV-PS' and not data['classification']['id'].startswith(CAV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2)
-                non_specific_location_cpv = data['classification']['scheme'] == u'CPV' and not data['classification']['id'].startswith(CPV_NON_SPECIFIC_LOCATION_UNITS_DGF_CDB2)
-                if non_specific_location_cav or non_specific_location_cpv:
+                if is_location_required(data['classification']['scheme'], data['classification']['id']):
                     raise ValidationError(u'This field is required.')
 
 
@@ -251,7 +636,6 @@ class dgfDocument(flashDocument):
         url = self.url
         if not url or '?download=' not in url:
             return url
-        doc_id = parse_qs(urlparse(url).query)['download'][-1]
         root = self.__parent__
         parents = []
         while root.__parent__ is not None:
@@ -262,20 +646,13 @@ class dgfDocument(flashDocument):
             return url
         if 'status' in parents[0] and parents[0].status in type(parents[0])._options.roles:
             role = parents[0].status
+            parts = url.split('/')
             for index, obj in enumerate(parents):
-                if obj.id != url.split('/')[(index - len(parents)) * 2 - 1]:
+                if obj.id != parts[(index - len(parents)) * 2 - 1]:
                     break
-                field = url.split('/')[(index - len(parents)) * 2]
-                if "_" in field:
-                    field = field[0] + field.title().replace("_", "")[1:]
-                roles = type(obj)._options.roles
-                if roles[role if role in roles else 'default'](field, []):
+                if is_hidden_field(type(obj), role, parts[(index - len(parents)) * 2]):
                     return url
-        from openprocurement.api.utils import generate_docservice_url
-        if not self.hash:
-            path = [i for i in urlparse(url).path.split('/') if len(i) == 32 and not set(i).difference(hexdigits)]
-            return generate_docservice_url(request, doc_id, False, '{}/{}'.format(path[0], path[-1]))
-        return generate_docservice_url(request, doc_id, False)
+        return get_docservice_url(request, url, bool(self.hash))
 
     def validate_hash(self, data, hash_):
         doc_type = data.get('documentType')
@@ -603,6 +980,11 @@ class LotValue(Model):
     participationUrl = URLType()
     date = IsoDateTimeType(default=get_now)
 
+    def __setattr__(self, name, value):
+        super(LotValue, self).__setattr__(name, value)
+        if name == 'relatedLot':
+            reset_bids_counts(self)
+
     def validate_value(self, data, value):
         if value and isinstance(data['__parent__'], Model) and data['relatedLot']:
             lots = [i for i in get_auction(data['__parent__']).lots if i.id == data['relatedLot']]
@@ -695,12 +1077,7 @@ class Lot(Model):
     @serializable
     def numberOfBids(self):
         """A property that is serialized by schematics exports."""
-        bids = [
-            bid
-            for bid in self.__parent__.bids
-            if self.id in [i.relatedLot for i in bid.lotValues] and getattr(bid, "status", "active") == "active"
-        ]
-        return len(bids)
+        return get_lot_bids_counts(self.__parent__).get(self.id, 0)
 
     @serializable(serialized_name="value", type=ModelType(Value))
     def lot_value(self):
@@ -862,8 +1239,15 @@ class Bid(Model):
             del data[k]
 
         self._data.update(data)
+        if 'status' in data or 'lotValues' in data:
+            reset_bids_counts(self)
         return self
 
+    def __setattr__(self, name, value):
+        super(Bid, self).__setattr__(name, value)
+        if name in ('status', 'lotValues'):
+            reset_bids_counts(self)
+
     def __acl__(self):
         return [
             (Allow, '{}_{}'.format(self.owner, self.owner_token), 'edit_bid'),
@@ -948,16 +1332,13 @@ class AuctionAuctionPeriod(Period):
         return rounding_shouldStartAfter(start_after, auction).isoformat()
 
 
-class Auction(SchematicsDocument, Model):
+class Auction(LazyHydrationMixin, DirtyFieldsMixin, SchematicsDocument, Model):
     """Data regarding auction process - publicly inviting prospective contractors to submit bids for evaluation and selecting a winner or winners."""
     class Options:
         roles = flash_auction_roles
 
     def __local_roles__(self):
-        roles = dict([('{}_{}'.format(self.owner, self.owner_token), 'auction_owner')])
-        for i in self.bids:
-            roles['{}_{}'.format(i.owner, i.owner_token)] = 'bid_owner'
-        return roles
+        return dict(get_auction_access(self)[0])
 
     def __init__(self, *args, **kwargs):
         super(Auction, self).__init__(*args, **kwargs)
@@ -1003,6 +1384,7 @@ class Auction(SchematicsDocument, Model):
     procuringEntity = ModelType(ProcuringEntity,
                                 required=True)  # The entity managing the procurement, which may be different from the buyer who is paying / using the items being procured.
     revisions = ListType(ModelType(Revision), default=list())
+    revisionsChunks = IntType(min_value=0)  # The number of chunk documents with revisions moved out of the auction.
     auctionPeriod = ModelType(AuctionAuctionPeriod, default={})
 
     minimalStep = ModelType(Value, required=True)
@@ -1048,16 +1430,7 @@ class Auction(SchematicsDocument, Model):
         return role
 
     def __acl__(self):
-        acl = [
-            (Allow, '{}_{}'.format(i.owner, i.owner_token), 'create_award_complaint')
-            for i in self.bids
-        ]
-        acl.extend([
-            (Allow, '{}_{}'.format(self.owner, self.owner_token), 'edit_auction'),
-            (Allow, '{}_{}'.format(self.owner, self.owner_token), 'upload_auction_documents'),
-            (Allow, '{}_{}'.format(self.owner, self.owner_token), 'edit_complaint'),
-        ])
-        return acl
+        return list(get_auction_access(self)[1])
 
     def __repr__(self):
         return '<%s:%r@%r>' % (type(self).__name__, self.id, self.rev)
@@ -1080,6 +1453,20 @@ class Auction(SchematicsDocument, Model):
             Chronograph will check Auction for patching status
             to next by workflow
         '''
+        if '_next_check' in self.__dict__:
+            return self.__dict__['_next_check']
+        return get_stored_next_check(self) or self.compute_next_check()
+
+    def pin_next_check(self):
+        '''
+            Compute `next_check` once before the auction is saved,
+            so it's neither computed again for the revision nor
+            for the stored document and the response
+        '''
+        self.__dict__.pop('_next_check', None)
+        self.__dict__['_next_check'] = self.next_check
+
+    def compute_next_check(self):
         now = get_now()
         checks = []
         if self.status == 'active.enquiries' and self.tenderPeriod.startDate:
@@ -1133,7 +1520,8 @@ class Auction(SchematicsDocument, Model):
     @serializable
     def numberOfBids(self):
         """A property that is serialized by schematics exports."""
-        return len(self.bids)
+        raw = self.get_raw_list('bids')
+        return len(raw if raw is not None else self.bids)
 
     @serializable(serialized_name='id')
     def doc_id(self):
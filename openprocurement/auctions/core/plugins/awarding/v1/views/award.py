@@ -5,6 +5,7 @@ from openprocurement.api.utils import (
     APIResource,
 )
 
+from openprocurement.auctions.core.cache import serialize_cached
 from openprocurement.auctions.core.utils import (
     save_auction,
     opresource,
@@ -26,7 +27,8 @@ class AuctionAwardResource(APIResource):
 
     @json_view(permission='view_auction')
     def collection_get(self):
-        return {'data': [i.serialize("view") for i in self.request.validated['auction'].awards]}
+        auction = self.request.validated['auction']
+        return {'data': serialize_cached(self.request, 'view', lambda: [i.serialize("view") for i in auction.awards])}
 
     @json_view(permission='view_auction')
     def get(self):
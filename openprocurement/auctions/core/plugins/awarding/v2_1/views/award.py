@@ -4,6 +4,7 @@ from openprocurement.api.utils import (
     context_unpack,
     APIResource,
 )
+from openprocurement.auctions.core.cache import serialize_cached
 from openprocurement.auctions.core.utils import (
     save_auction,
     opresource,
@@ -25,7 +26,8 @@ class AuctionAwardResource(APIResource):
 
     @json_view(permission='view_auction')
     def collection_get(self):
-        return {'data': [i.serialize("view") for i in self.request.validated['auction'].awards]}
+        auction = self.request.validated['auction']
+        return {'data': serialize_cached(self.request, 'view', lambda: [i.serialize("view") for i in auction.awards])}
 
     @json_view(content_type="application/json", permission='create_award', validators=(validate_award_data,))
     def collection_post(self):
@@ -5,6 +5,7 @@ from openprocurement.api.utils import (
     APIResource,
     get_now,
 )
+from openprocurement.auctions.core.cache import serialize_cached
 from openprocurement.auctions.core.utils import (
     apply_patch,
     save_auction,
@@ -83,7 +84,8 @@ class AuctionAwardResource(APIResource):
             }
 
         """
-        return {'data': [i.serialize("view") for i in self.request.validated['auction'].awards]}
+        auction = self.request.validated['auction']
+        return {'data': serialize_cached(self.request, 'view', lambda: [i.serialize("view") for i in auction.awards])}
 
     @json_view(content_type="application/json", permission='create_award',
                validators=(validate_award_data, validate_award_data_post_common))
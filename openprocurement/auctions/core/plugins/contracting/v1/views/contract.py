@@ -5,6 +5,7 @@ from openprocurement.api.utils import (
     context_unpack,
     APIResource,
 )
+from openprocurement.auctions.core.cache import serialize_cached
 from openprocurement.auctions.core.endpoints import ENDPOINTS
 from openprocurement.auctions.core.utils import (
     apply_patch,
@@ -48,7 +49,8 @@ class BaseAuctionAwardContractResource(APIResource):
     def collection_get(self):
         """List contracts for award
         """
-        return {'data': [i.serialize() for i in self.request.context.contracts]}
+        auction = self.request.context
+        return {'data': serialize_cached(self.request, None, lambda: [i.serialize() for i in auction.contracts])}
 
     @json_view(permission='view_auction')
     def get(self):
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from openprocurement.auctions.core.design import auctions_revisions_chunks_view
+
+REVISIONS_CHUNK_DOC_TYPE = 'AuctionRevisions'
+
+
+def get_revisions_chunk_id(auction_id, index):
+    return '{}_revisions_{}'.format(auction_id, index)
+
+
+def split_revisions(revisions, chunk_size):
+    """Split revisions of an auction into chunks to be moved out of the document
+    and the ones to be kept in it.
+
+    The first revision always stays in the auction document, as it is used
+    to get the creation date of the auction.
+    """
+    chunks = []
+    while chunk_size and len(revisions) > chunk_size + 1:
+        chunks.append(revisions[1:chunk_size + 1])
+        revisions = revisions[:1] + revisions[chunk_size + 1:]
+    return chunks, revisions
+
+
+def save_revisions_chunk(db, auction_id, index, revisions):
+    chunk_id = get_revisions_chunk_id(auction_id, index)
+    # the chunk could be left by a save of the auction that failed after it,
+    # in this case it holds the same revisions and is simply overwritten
+    chunk = db.get(chunk_id, {'_id': chunk_id})
+    chunk.update({
+        'doc_type': REVISIONS_CHUNK_DOC_TYPE,
+        'auction_id': auction_id,
+        'index': index,
+        'revisions': revisions,
+    })
+    db.save(chunk)
+
+
+def move_revisions_to_chunks(db, auction, chunk_size):
+    """Move revisions of the auction model above `chunk_size` to chunk documents"""
+    chunks, revisions = split_revisions(auction.revisions, chunk_size)
+    if not chunks:
+        return False
+    index = auction.revisionsChunks or 0
+    for chunk in chunks:
+        save_revisions_chunk(db, auction.id, index, [i.to_primitive() for i in chunk])
+        index += 1
+    auction.revisions = revisions
+    auction.revisionsChunks = index
+    return True
+
+
+def get_auction_revisions(db, auction, offset=0, limit=100):
+    """Page of the auction history, both stored in chunks and in the document.
+
+    Returns revisions starting from `offset` and the total number of them.
+    Only chunks that overlap the requested page are fetched.
+    """
+    revisions = auction.revisions
+    segments = [(len(revisions[:1]), revisions[:1])]
+    if auction.revisionsChunks:
+        rows = auctions_revisions_chunks_view(db, startkey=[auction.id, 0], endkey=[auction.id, auction.revisionsChunks - 1])
+        segments.extend([(row.value, row.id) for row in rows])
+    segments.append((len(revisions[1:]), revisions[1:]))
+
+    selected = []
+    position = 0
+    for size, source in segments:
+        start = max(offset - position, 0)
+        end = min(offset + limit - position, size)
+        if start < end:
+            selected.append((source, start, end))
+        position += size
+
+    chunk_ids = [source for source, _s, _e in selected if isinstance(source, basestring)]
+    chunks = {}
+    if chunk_ids:
+        chunks = dict([(row.id, row.doc) for row in db.view('_all_docs', keys=chunk_ids, include_docs=True)])
+    page = []
+    for source, start, end in selected:
+        if isinstance(source, basestring):
+            page.extend(chunks[source]['revisions'][start:end])
+        else:
+            page.extend([i.to_primitive() for i in source[start:end]])
+    return page, position
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+from itertools import chain
+
+from schematics import transforms
+from schematics.transforms import Role, allow_none, sort_dict, wholelist
+from schematics.types import compound
+
+from openprocurement.api.models.auction_models import Model
+
+# the export loop of schematics replaced by `export_loop`
+EXPORT_LOOP = transforms.export_loop
+# role filters, which skip fields by their names only
+NAME_FILTERS = (Role.wholelist, Role.whitelist, Role.blacklist)
+# compiled serializers by model class and role,
+# None for roles, which filters depend on values of fields
+SERIALIZERS = {}
+
+
+def is_compiled(cls):
+    """Whether the model class is exported with compiled serializers,
+    models other than the ones of openprocurement are left to schematics
+    """
+    return isinstance(cls, type) and issubclass(cls, Model)
+
+
+def get_role_filter(cls, role):
+    roles = cls._options.roles
+    if role in roles:
+        return roles[role]
+    return roles.get('default', wholelist())
+
+
+def compile_serializer(cls, role):
+    """Fields of the model exported with the role, with their serialized names,
+    whether they're compound and whether they're exported when None.
+
+    Fields skipped by the role are left out, so neither the role filter
+    is called nor the value is got for them on export.
+    """
+    gottago = get_role_filter(cls, role)
+    if not isinstance(gottago, Role) or gottago.function not in NAME_FILTERS:
+        return None
+    fields = []
+    for name, field in chain(cls._fields.items(), cls._serializables.items()):
+        if gottago(name, None):
+            continue
+        fields.append((name, field, field.serialized_name or name, hasattr(field, 'export_loop'), allow_none(cls, field)))
+    return fields, getattr(cls._options, 'fields_order', None)
+
+
+def get_serializer(cls, role):
+    key = (cls, role)
+    if key not in SERIALIZERS:
+        SERIALIZERS[key] = compile_serializer(cls, role)
+    return SERIALIZERS[key]
+
+
+def export_value(data, field, value, serialized_name, is_compound, none_allowed,
+                 field_converter, role=None, print_none=False):
+    """Put the value of the field exported with the role to `data`"""
+    if value is not None:
+        if is_compound:
+            shaped = field.export_loop(value, field_converter, role=role, print_none=print_none)
+        else:
+            shaped = field_converter(field, value)
+        if shaped is None and none_allowed:
+            data[serialized_name] = shaped
+        elif shaped is not None:
+            data[serialized_name] = shaped
+        elif print_none:
+            data[serialized_name] = shaped
+    elif none_allowed:
+        data[serialized_name] = value
+    elif print_none:
+        data[serialized_name] = value
+
+
+def export_fields(instance, role, names, context=None):
+    """Serialize fields of the model instance with given names the same way
+    `to_primitive` does, without getting values of other fields.
+    """
+    cls = type(instance)
+    if role not in cls._options.roles:
+        error_msg = u'%s Model has no role "%s"'
+        raise ValueError(error_msg % (cls.__name__, role))
+    field_converter = lambda field, value: field.to_primitive(value, context=context)
+    data = {}
+    serializer = get_serializer(cls, role)
+    if serializer is not None:
+        for field_name, field, serialized_name, is_compound, none_allowed in serializer[0]:
+            if field_name in names:
+                export_value(data, field, instance[field_name], serialized_name, is_compound, none_allowed,
+                             field_converter, role)
+        return data
+    gottago = get_role_filter(cls, role)
+    for field_name, field in chain(cls._fields.items(), cls._serializables.items()):
+        if field_name not in names:
+            continue
+        value = instance[field_name]
+        if not gottago(field_name, value):
+            export_value(data, field, value, field.serialized_name or field_name,
+                         hasattr(field, 'export_loop'), allow_none(cls, field), field_converter, role)
+    return data
+
+
+def export_loop(cls, instance_or_dict, field_converter,
+                role=None, raise_error_on_role=False, print_none=False):
+    """Drop-in replacement of the export loop of schematics, which exports
+    models with compiled serializers, so the output is the same.
+    """
+    if not is_compiled(cls):
+        return EXPORT_LOOP(cls, instance_or_dict, field_converter, role, raise_error_on_role, print_none)
+    if role and raise_error_on_role and role not in cls._options.roles:
+        error_msg = u'%s Model has no role "%s"'
+        raise ValueError(error_msg % (cls.__name__, role))
+    serializer = get_serializer(cls, role)
+    if serializer is None:
+        return EXPORT_LOOP(cls, instance_or_dict, field_converter, role, raise_error_on_role, print_none)
+    fields, fields_order = serializer
+
+    data = {}
+    for field_name, field, serialized_name, is_compound, none_allowed in fields:
+        export_value(data, field, instance_or_dict[field_name], serialized_name, is_compound, none_allowed,
+                     field_converter, role, print_none)
+
+    if len(data) > 0:
+        if fields_order:
+            return sort_dict(data, fields_order)
+        return data
+    elif print_none:
+        return data
+
+
+def get_model_classes(field):
+    """Model classes nested in the field"""
+    classes = list(getattr(field, 'model_classes', None) or [])
+    if getattr(field, 'model_class', None) is not None:
+        classes.append(field.model_class)
+    if getattr(field, 'field', None) is not None:
+        classes.extend(get_model_classes(field.field))
+    return classes
+
+
+def compile_serializers(models):
+    """Compile serializers of the models and the ones nested in them
+    for roles of the models
+    """
+    for model in models:
+        roles = list(model._options.roles)
+        classes, seen = [model], set()
+        while classes:
+            cls = classes.pop()
+            if cls in seen or not is_compiled(cls):
+                continue
+            seen.add(cls)
+            for role in roles + list(cls._options.roles):
+                get_serializer(cls, role)
+            for field in chain(cls._fields.values(), cls._serializables.values()):
+                classes.extend(get_model_classes(field))
+
+
+def install_serializers():
+    """Export models with compiled serializers.
+
+    The export loop of schematics is replaced for the whole process,
+    models other than the ones of openprocurement are still exported by it.
+    """
+    transforms.export_loop = export_loop
+    compound.export_loop = export_loop
+
+
+def compile_auction_serializers(event):
+    compile_serializers(event.app.registry.auction_procurementMethodTypes.values())
@@ -2,7 +2,17 @@
 import unittest
 
 from openprocurement.auctions.core.tests.base import BaseWebTest, snitch
-from openprocurement.auctions.core.tests.blanks.tender_blanks import empty_listing
+from openprocurement.auctions.core.tests.blanks.tender_blanks import (
+    # AuctionResourceTest
+    empty_listing,
+    listing_changes_longpoll,
+    create_auctions_batch,
+    create_auctions_batch_invalid,
+    due_auctions,
+    due_auctions_pages,
+    listing_filtered,
+    auction_revisions_etag,
+)
 from openprocurement.auctions.core.tests.blanks.auction_blanks import (
     # AuctionAuctionResourceTest
     get_auction_auction_not_found,
@@ -23,6 +33,13 @@ from openprocurement.auctions.core.tests.blanks.auction_blanks import (
 class AuctionResourceTest(BaseWebTest):
 
     test_empty_listing = snitch(empty_listing)
+    test_listing_changes_longpoll = snitch(listing_changes_longpoll)
+    test_create_auctions_batch = snitch(create_auctions_batch)
+    test_create_auctions_batch_invalid = snitch(create_auctions_batch_invalid)
+    test_due_auctions = snitch(due_auctions)
+    test_due_auctions_pages = snitch(due_auctions_pages)
+    test_listing_filtered = snitch(listing_filtered)
+    test_auction_revisions_etag = snitch(auction_revisions_etag)
 
 
 class AuctionAuctionResourceTestMixin(object):
@@ -5,9 +5,17 @@ from datetime import timedelta
 from copy import deepcopy
 from uuid import uuid4
 
-from openprocurement.api.utils import get_now
+from schematics.types import StringType
+from zope.interface import implementer
+
+from openprocurement.api.utils import error_handler, get_now
 from openprocurement.api.utils import ROUTE_PREFIX
 
+from openprocurement.auctions.core.interfaces import IAuction, IAuctionManager
+from openprocurement.auctions.core.models import Auction
+from openprocurement.auctions.core.tests.base import test_procuringEntity
+from openprocurement.auctions.core.constants import AUCTIONS_BATCH_MAX_SIZE, ETAG_UNSTABLE_STATUSES
+
 
 def create_auction_draft_with_registry(self):
     data = self.initial_data.copy()
@@ -528,6 +536,117 @@ def listing_changes(self):
     self.assertEqual(len(response.json['data']), 4)
 
 
+def listing_changes_longpoll(self):
+    response = self.app.get('/auctions?feed=changes&longpoll=a', status=422)
+    self.assertEqual(response.json['errors'], [
+        {u'description': u'Should be a number of seconds', u'location': u'params', u'name': u'longpoll'}
+    ])
+
+    auction_id = uuid4().hex
+    self.db.save({'_id': auction_id, 'doc_type': 'Auction', 'status': 'active.tendering',
+                  'dateModified': get_now().isoformat()})
+
+    response = self.app.get('/auctions?feed=changes&longpoll=1')
+    self.assertEqual(response.status, '200 OK')
+    self.assertEqual([i['id'] for i in response.json['data']], [auction_id])
+    self.assertIn('longpoll=1', response.json['next_page']['uri'])
+    offset = response.json['next_page']['offset']
+
+    started = get_now()
+    response = self.app.get(response.json['next_page']['path'].replace(ROUTE_PREFIX, ''))
+    self.assertEqual(response.status, '200 OK')
+    self.assertEqual(len(response.json['data']), 0)
+    self.assertGreaterEqual((get_now() - started).total_seconds(), 1)
+    self.assertIn('longpoll=1', response.json['next_page']['uri'])
+
+    # requests wait no longer than the timeout of the deployment
+    registry = self.app.app.registry
+    timeout = registry.changes_longpoll_timeout
+    registry.changes_longpoll_timeout = 1
+    try:
+        started = get_now()
+        response = self.app.get('/auctions', {'feed': 'changes', 'longpoll': 600, 'offset': offset})
+        self.assertEqual(len(response.json['data']), 0)
+        self.assertLess((get_now() - started).total_seconds(), 10)
+    finally:
+        registry.changes_longpoll_timeout = timeout
+
+
+def listing_filtered(self):
+    response = self.app.get('/auctions?status=active.tendering', status=422)
+    self.assertEqual(response.json['errors'][0]['name'], u'procurementMethodType')
+    response = self.app.get('/auctions?feed=changes&procurementMethodType=firstType', status=422)
+    self.assertEqual(response.json['errors'][0]['name'], u'feed')
+
+    auctions = []
+    for index, (pmt, status) in enumerate([
+        ('firstType', 'active.tendering'),
+        ('firstType', 'active.qualification'),
+        ('firstType', 'active.tendering'),
+        ('secondType', 'active.tendering'),
+        ('firstType', 'active.tendering'),
+    ]):
+        auction = {
+            '_id': uuid4().hex,
+            'doc_type': 'Auction',
+            'procurementMethodType': pmt,
+            'status': status,
+            'dateModified': u'2018-01-0{}T00:00:00+02:00'.format(index + 1),
+        }
+        self.db.save(auction)
+        auctions.append(auction)
+    self.db.save(dict([(i, j) for i, j in auctions[0].items() if i != '_rev'], _id=uuid4().hex, mode=u'test'))
+    tendering = [i['_id'] for i in auctions if i['procurementMethodType'] == 'firstType' and i['status'] == 'active.tendering']
+    first_type = [i['_id'] for i in auctions if i['procurementMethodType'] == 'firstType']
+
+    params = {'procurementMethodType': 'firstType', 'status': 'active.tendering', 'limit': 2}
+    response = self.app.get('/auctions', params)
+    self.assertEqual(response.status, '200 OK')
+    self.assertEqual([i['id'] for i in response.json['data']], tendering[:2])
+    self.assertIn('status=', response.json['next_page']['uri'])
+    self.assertIn('procurementMethodType=', response.json['next_page']['uri'])
+    response = self.app.get(response.json['next_page']['path'].replace(ROUTE_PREFIX, ''))
+    self.assertEqual([i['id'] for i in response.json['data']], tendering[2:])
+
+    response = self.app.get('/auctions', dict(params, descending=1))
+    self.assertEqual([i['id'] for i in response.json['data']], tendering[:0:-1])
+
+    response = self.app.get('/auctions', {'procurementMethodType': 'firstType', 'opt_fields': 'status'})
+    self.assertEqual([i['id'] for i in response.json['data']], first_type)
+    self.assertEqual([i['status'] for i in response.json['data']], [i['status'] for i in auctions if i['_id'] in first_type])
+
+    response = self.app.get('/auctions', {'procurementMethodType': 'firstType', 'mode': 'test'})
+    self.assertEqual(len(response.json['data']), 1)
+    response = self.app.get('/auctions', {'procurementMethodType': 'firstType', 'status': 'unsuccessful'})
+    self.assertEqual(response.json['data'], [])
+    response = self.app.get('/auctions', {'procurementMethodType': 'unknown'})
+    self.assertEqual(response.json['data'], [])
+
+
+def due_auctions(self):
+    response = self.app.get('/auctions/due?until=a&limit=0', status=422)
+    self.assertEqual(set([i['name'] for i in response.json['errors']]), set(['until', 'limit']))
+
+    now = get_now()
+    next_checks = [(now + timedelta(days=i)).isoformat() for i in (-1, 1, 2)]
+    ids = []
+    for next_check in next_checks:
+        ids.append(uuid4().hex)
+        self.db.save({'_id': ids[-1], 'doc_type': 'Auction', 'status': 'active.tendering', 'next_check': next_check})
+
+    response = self.app.get('/auctions/due')
+    self.assertEqual(response.status, '200 OK')
+    self.assertEqual(response.json['data'], [{u'id': ids[0], u'next_check': next_checks[0]}])
+
+    response = self.app.get('/auctions/due', {'until': (now + timedelta(days=365)).isoformat()})
+    self.assertEqual(response.status, '200 OK')
+    self.assertEqual([i['id'] for i in response.json['data']], ids)
+    self.assertEqual([i['next_check'] for i in response.json['data']], next_checks)
+
+    response = self.app.get('/auctions/due', {'until': next_checks[1]})
+    self.assertEqual([i['id'] for i in response.json['data']], ids[:2])
+
+
 def listing_draft(self):
     response = self.app.get('/auctions')
     self.assertEqual(response.status, '200 OK')
@@ -592,6 +711,167 @@ def create_auction_draft(self):
     self.assertEqual(auction['status'], self.initial_status)
 
 
+def create_auctions_batch(self):
+    class IBatchAuction(IAuction):
+        pass
+
+    @implementer(IBatchAuction)
+    class BatchAuction(Auction):
+        _procedure_type = 'batchAuction'
+        procurementMethodType = StringType(default='batchAuction')
+
+    class BatchAuctionManager(object):
+
+        def __init__(self, context):
+            self.context = context
+
+        def create_auction(self, request):
+            if request.validated['auction'].title == u'rejected':
+                request.errors.add('body', 'title', 'Rejected by the procedure')
+                request.errors.status = 403
+                raise error_handler(request)
+
+    now = get_now()
+    data = {
+        'title': u'title',
+        'procurementMethodType': 'batchAuction',
+        'procuringEntity': test_procuringEntity,
+        'value': {'amount': 100, 'currency': u'UAH'},
+        'minimalStep': {'amount': 35, 'currency': u'UAH'},
+        'enquiryPeriod': {'endDate': (now + timedelta(days=7)).isoformat()},
+        'tenderPeriod': {'endDate': (now + timedelta(days=14)).isoformat()},
+    }
+    invalid_data = dict(data, value={'amount': 'invalid'})
+    rejected_data = dict(data, title=u'rejected')
+
+    registry = self.app.app.registry
+    registry.pmtConfigurator['batchAuction'] = BatchAuction._procedure_type
+    registry.auction_procurementMethodTypes['batchAuction'] = BatchAuction
+    registry.registerAdapter(BatchAuctionManager, (IBatchAuction,), IAuctionManager)
+    self.app.authorization = ('Basic', ('broker1', ''))
+    try:
+        response = self.app.post_json('/auctions/batch', {'data': [data, invalid_data, 'invalid', rejected_data, data]})
+        self.assertEqual(response.status, '201 Created')
+        self.assertEqual(response.content_type, 'application/json')
+        results = response.json['data']
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[1]['status'], 'error')
+        self.assertEqual(results[1]['errors'][0]['name'], u'value')
+        self.assertEqual(results[2], {
+            u'status': u'error',
+            u'errors': [{u'description': u'Data not available', u'location': u'body', u'name': u'data'}]
+        })
+        # errors of the procedure are given for the auction only
+        self.assertEqual(results[3], {
+            u'status': u'error',
+            u'errors': [{u'description': u'Rejected by the procedure', u'location': u'body', u'name': u'title'}]
+        })
+        for result in (results[0], results[4]):
+            self.assertIn('token', result['access'])
+            doc = self.db.get(result['data']['id'])
+            self.assertEqual(doc['auctionID'], result['data']['auctionID'])
+            self.assertEqual(doc['owner'], 'broker1')
+            self.assertEqual(len(doc['revisions']), 1)
+        # auctionIDs are leased for valid auctions only
+        self.assertIn('-000001', results[0]['data']['auctionID'])
+        self.assertIn('-000002', results[4]['data']['auctionID'])
+
+        response = self.app.post_json('/auctions/batch', {'data': [invalid_data, rejected_data]}, status=422)
+        self.assertEqual([i['status'] for i in response.json['data']], ['error', 'error'])
+        response = self.app.post_json('/auctions/batch', {'data': [data]})
+        self.assertIn('-000003', response.json['data'][0]['data']['auctionID'])
+    finally:
+        registry.unregisterAdapter(BatchAuctionManager, (IBatchAuction,), IAuctionManager)
+        registry.auction_procurementMethodTypes.pop('batchAuction')
+        registry.pmtConfigurator.pop('batchAuction')
+
+
+def auction_revisions_etag(self):
+    class IETagAuction(IAuction):
+        pass
+
+    @implementer(IETagAuction)
+    class ETagAuction(Auction):
+        _procedure_type = 'etagAuction'
+        procurementMethodType = StringType(default='etagAuction')
+
+    auction = {
+        '_id': uuid4().hex,
+        'doc_type': 'Auction',
+        'procurementMethodType': 'etagAuction',
+        'title': u'title',
+        'status': 'active.qualification',
+        'revisions': [{'author': u'broker', 'rev': None, 'changes': []}],
+    }
+    self.db.save(auction)
+    path = '/auctions/{}/revisions'.format(auction['_id'])
+
+    registry = self.app.app.registry
+    registry.pmtConfigurator['etagAuction'] = ETagAuction._procedure_type
+    registry.auction_procurementMethodTypes['etagAuction'] = ETagAuction
+    self.app.authorization = ('Basic', ('administrator', ''))
+    try:
+        response = self.app.get(path)
+        self.assertEqual(response.status, '200 OK')
+        etag = response.headers['ETag']
+
+        response = self.app.get(path, headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.body, '')
+
+        # the permission is checked before the ETag
+        self.app.authorization = ('Basic', ('broker', ''))
+        self.app.get(path, headers={'If-None-Match': etag}, status=403)
+        self.app.authorization = ('Basic', ('administrator', ''))
+
+        self.db.save(auction)
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status, '200 OK')
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        auction['status'] = 'active.tendering'
+        self.db.save(auction)
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status, '200 OK')
+        self.assertNotIn('ETag', response.headers)
+    finally:
+        registry.auction_procurementMethodTypes.pop('etagAuction')
+        registry.pmtConfigurator.pop('etagAuction')
+
+
+def auction_etag(self):
+    response = self.app.post_json('/auctions', {'data': self.initial_data})
+    self.assertEqual(response.status, '201 Created')
+    auction_id = response.json['data']['id']
+    path = '/auctions/{}'.format(auction_id)
+
+    doc = self.db.get(auction_id)
+    doc['status'] = 'active.qualification'
+    self.db.save(doc)
+    response = self.app.get(path)
+    self.assertEqual(response.status, '200 OK')
+    etag = response.headers['ETag']
+
+    response = self.app.get(path, headers={'If-None-Match': etag}, status=304)
+    self.assertEqual(response.headers['ETag'], etag)
+    self.assertEqual(response.body, '')
+    response = self.app.get('{}?opt_pretty=1'.format(path), headers={'If-None-Match': etag})
+    self.assertEqual(response.status, '200 OK')
+    self.assertNotEqual(response.headers['ETag'], etag)
+
+    self.db.save(doc)
+    response = self.app.get(path, headers={'If-None-Match': etag})
+    self.assertEqual(response.status, '200 OK')
+    self.assertNotEqual(response.headers['ETag'], etag)
+
+    for status in ETAG_UNSTABLE_STATUSES:
+        doc['status'] = status
+        self.db.save(doc)
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status, '200 OK')
+        self.assertNotIn('ETag', response.headers)
+
+
 def get_auction(self):
     response = self.app.get('/auctions')
     self.assertEqual(response.status, '200 OK')
@@ -1032,6 +1312,70 @@ def guarantee(self):
     self.assertEqual(response.json['data']['guarantee']['currency'], 'UAH')
 
 
+def create_auctions_batch_invalid(self):
+    self.app.authorization = ('Basic', ('broker', ''))
+    response = self.app.post_json('/auctions/batch', {'data': []}, status=422)
+    self.assertEqual(response.status, '422 Unprocessable Entity')
+    self.assertEqual(response.json['errors'], [
+        {u'description': u'Data not available', u'location': u'body', u'name': u'data'}
+    ])
+
+    response = self.app.post_json('/auctions/batch', {'data': [{}] * (AUCTIONS_BATCH_MAX_SIZE + 1)}, status=422)
+    self.assertEqual(response.status, '422 Unprocessable Entity')
+    self.assertEqual(response.json['errors'], [
+        {u'description': u'Batch can contain up to {} auctions'.format(AUCTIONS_BATCH_MAX_SIZE),
+         u'location': u'body', u'name': u'data'}
+    ])
+
+    response = self.app.post_json('/auctions/batch', {'data': [{'procurementMethodType': 'unknown'}, 'invalid']},
+                                  status=422)
+    self.assertEqual(response.status, '422 Unprocessable Entity')
+    self.assertEqual(response.json['data'], [
+        {u'status': u'error', u'errors': [
+            {u'description': u'procurementMethodType is not implemented', u'location': u'body', u'name': u'data'}
+        ]},
+        {u'status': u'error', u'errors': [
+            {u'description': u'Data not available', u'location': u'body', u'name': u'data'}
+        ]},
+    ])
+    response = self.app.get('/auctions')
+    self.assertEqual(response.json['data'], [])
+
+
+def due_auctions_pages(self):
+    next_checks = [
+        u'2018-01-01T00:00:00+02:00',
+        u'2018-01-01T00:00:00+02:00',
+        u'2018-01-01T00:00:00+02:00',
+        u'2017-12-31T23:30:00+00:00',
+        u'2018-01-02T00:00:00+02:00',
+    ]
+    for next_check in next_checks:
+        self.db.save({'_id': uuid4().hex, 'doc_type': 'Auction', 'status': 'active.tendering', 'next_check': next_check})
+    self.db.save({'_id': uuid4().hex, 'doc_type': 'Auction', 'status': 'draft', 'next_check': next_checks[0]})
+
+    response = self.app.get('/auctions/due?offset=a', status=422)
+    self.assertEqual(response.json['errors'], [
+        {u'description': u'Offset should be taken from next_page', u'location': u'querystring', u'name': u'offset'}
+    ])
+
+    response = self.app.get('/auctions/due', {'until': u'2018-01-01T12:00:00+02:00', 'limit': 2})
+    self.assertEqual(response.status, '200 OK')
+    data = response.json['data']
+    while 'next_page' in response.json:
+        self.assertEqual(len(response.json['data']), 2)
+        response = self.app.get(response.json['next_page']['path'].replace(ROUTE_PREFIX, ''))
+        self.assertEqual(response.status, '200 OK')
+        data.extend(response.json['data'])
+    self.assertEqual(len(data), 4)
+    self.assertEqual(len(set([i['id'] for i in data])), 4)
+    self.assertEqual([i['next_check'] for i in data], next_checks[:4])
+
+    response = self.app.get('/auctions/due', {'until': u'2018-01-01T12:00:00+02:00', 'limit': 4})
+    self.assertEqual(response.json['data'], data)
+    self.assertNotIn('next_page', response.json)
+
+
 def auction_Administrator_change(self):
     response = self.app.post_json('/auctions', {'data': self.initial_data})
     self.assertEqual(response.status, '201 Created')
@@ -1,8 +1,30 @@
 # -*- coding: utf-8 -*-
 import os
+from copy import deepcopy
+from datetime import timedelta
+from uuid import uuid4
+
+from schematics.types import StringType
 from zope.interface import implementer
 
-from openprocurement.auctions.core.models import IAuction
+from openprocurement.api.models.auction_models import ListType, ModelType
+from openprocurement.api.utils import get_now
+
+from openprocurement.auctions.core.models import (
+    IAuction,
+    Auction,
+    Award,
+    Contract,
+    dgfCancellation,
+    dgfCDB2Item,
+    dgfComplaint,
+    dgfDocument
+)
+from openprocurement.auctions.core.tests.base import (
+    base_test_bids,
+    test_auction_data,
+    test_organization
+)
 
 
 def fixture_auction():
@@ -26,3 +48,144 @@ def fixture_auction():
             return getattr(self, key, None)
 
     return MockAuction()
+
+
+class FixtureAuction(Auction):
+    """Auction with the sub-resources procedures add to the core model"""
+    items = ListType(ModelType(dgfCDB2Item), default=list())
+    documents = ListType(ModelType(dgfDocument), default=list())
+    awards = ListType(ModelType(Award), default=list())
+    contracts = ListType(ModelType(Contract), default=list())
+    complaints = ListType(ModelType(dgfComplaint), default=list())
+    cancellations = ListType(ModelType(dgfCancellation), default=list())
+    dgfID = StringType()
+
+
+def fixture_document(**kwargs):
+    document = {
+        'id': uuid4().hex,
+        'title': u'document.pdf',
+        'format': u'application/pdf',
+        'url': u'http://localhost/get/{}'.format(uuid4().hex),
+        'datePublished': get_now().isoformat(),
+        'dateModified': get_now().isoformat(),
+    }
+    document.update(kwargs)
+    return document
+
+
+def fixture_complaint(**kwargs):
+    complaint = {
+        'id': uuid4().hex,
+        'title': u'complaint title',
+        'description': u'complaint description',
+        'author': deepcopy(test_organization),
+        'status': u'claim',
+        'owner': u'broker',
+        'owner_token': uuid4().hex,
+        'documents': [fixture_document()],
+    }
+    complaint.update(kwargs)
+    return complaint
+
+
+def fixture_auctions():
+    """Stored auctions in statuses from active.tendering to complete,
+    with bids, awards, contracts, documents and complaints.
+    """
+    now = get_now()
+    auction = dict([(i, j) for i, j in deepcopy(test_auction_data).items() if i in FixtureAuction._fields])
+    auction.update({
+        '_id': uuid4().hex,
+        '_rev': u'1-{}'.format(uuid4().hex),
+        'doc_type': u'Auction',
+        'auctionID': u'UA-EA-{:04}-{:02}-{:02}-000001'.format(now.year, now.month, now.day),
+        'procurementMethodType': u'dgfOtherAssets',
+        'owner': u'broker',
+        'owner_token': uuid4().hex,
+        'date': (now - timedelta(days=20)).isoformat(),
+        'dateModified': now.isoformat(),
+        'enquiryPeriod': {
+            'startDate': (now - timedelta(days=20)).isoformat(),
+            'endDate': (now + timedelta(days=7)).isoformat(),
+        },
+        'tenderPeriod': {
+            'startDate': (now - timedelta(days=20)).isoformat(),
+            'endDate': (now + timedelta(days=7)).isoformat(),
+        },
+        'auctionPeriod': {'startDate': (now + timedelta(days=7)).isoformat()},
+        'status': u'active.tendering',
+        'documents': [fixture_document(), fixture_document(documentType=u'illustration', index=1)],
+        'complaints': [fixture_complaint(), fixture_complaint(status=u'answered', resolution=u'resolution',
+                                                              resolutionType=u'resolved')],
+        'bids': [dict(deepcopy(bid), id=uuid4().hex, owner=u'broker', owner_token=uuid4().hex,
+                      date=(now - timedelta(days=index + 1)).isoformat(),
+                      documents=[fixture_document()])
+                 for index, bid in enumerate(base_test_bids)],
+    })
+    auctions = [auction]
+
+    auction = deepcopy(auction)
+    auction.update({
+        '_id': uuid4().hex,
+        'status': u'active.auction',
+        'tenderPeriod': dict(auction['tenderPeriod'], endDate=(now - timedelta(days=1)).isoformat()),
+        'auctionPeriod': {'startDate': (now + timedelta(hours=1)).isoformat()},
+    })
+    auctions.append(auction)
+
+    auction = deepcopy(auction)
+    bid = auction['bids'][1]
+    auction.update({
+        '_id': uuid4().hex,
+        'status': u'active.qualification',
+        'auctionPeriod': {
+            'startDate': (now - timedelta(hours=2)).isoformat(),
+            'endDate': (now - timedelta(hours=1)).isoformat(),
+        },
+        'awardPeriod': {'startDate': (now - timedelta(hours=1)).isoformat()},
+        'awards': [{
+            'id': uuid4().hex,
+            'bid_id': bid['id'],
+            'status': u'pending',
+            'date': (now - timedelta(hours=1)).isoformat(),
+            'value': bid['value'],
+            'suppliers': bid['tenderers'],
+            'documents': [fixture_document()],
+            'complaints': [fixture_complaint(status=u'pending', type=u'complaint')],
+            'complaintPeriod': {'startDate': (now - timedelta(hours=1)).isoformat()},
+        }],
+    })
+    auctions.append(auction)
+
+    auction = deepcopy(auction)
+    award = auction['awards'][0]
+    award.update({
+        'status': u'active',
+        'complaintPeriod': dict(award['complaintPeriod'], endDate=now.isoformat()),
+    })
+    auction.update({
+        '_id': uuid4().hex,
+        'status': u'active.awarded',
+        'contracts': [{
+            'id': uuid4().hex,
+            'awardID': award['id'],
+            'status': u'pending',
+            'date': now.isoformat(),
+            'value': award['value'],
+            'suppliers': award['suppliers'],
+            'items': auction['items'],
+            'documents': [fixture_document(documentType=u'contractSigned')],
+        }],
+    })
+    auctions.append(auction)
+
+    auction = deepcopy(auction)
+    auction['contracts'][0].update({'status': u'active', 'dateSigned': now.isoformat()})
+    auction.update({
+        '_id': uuid4().hex,
+        'status': u'complete',
+        'awardPeriod': dict(auction['awardPeriod'], endDate=now.isoformat()),
+    })
+    auctions.append(auction)
+    return auctions
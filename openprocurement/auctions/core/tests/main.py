@@ -2,6 +2,17 @@
 import unittest
 
 from openprocurement.auctions.core.tests import auctions
+from openprocurement.auctions.core.tests.unit import (
+    test_cache,
+    test_classifications,
+    test_conflicts,
+    test_design,
+    test_models,
+    test_revisions,
+    test_serializers,
+    test_traversal,
+    test_utils
+)
 from openprocurement.auctions.core.plugins.contracting.v3.tests.main import (
     contracting_v3_test_suite
 )
@@ -9,6 +20,15 @@ from openprocurement.auctions.core.plugins.contracting.v3.tests.main import (
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(auctions.suite())
+    suite.addTest(test_cache.suite())
+    suite.addTest(test_classifications.suite())
+    suite.addTest(test_conflicts.suite())
+    suite.addTest(test_design.suite())
+    suite.addTest(test_models.suite())
+    suite.addTest(test_revisions.suite())
+    suite.addTest(test_serializers.suite())
+    suite.addTest(test_traversal.suite())
+    suite.addTest(test_utils.suite())
     suite.addTest(contracting_v3_test_suite())
     return suite
 
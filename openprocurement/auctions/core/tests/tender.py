@@ -5,9 +5,13 @@ from openprocurement.auctions.core.tests.blanks.tender_blanks import (
     empty_listing,
     listing,
     listing_changes,
+    listing_changes_longpoll,
+    due_auctions,
+    listing_filtered,
     listing_draft,
     create_auction_draft,
     get_auction,
+    auction_etag,
     auction_not_found,
     auction_Administrator_change,
     patch_auction,
@@ -20,9 +24,13 @@ class AuctionResourceTestMixin(object):
     test_empty_listing = snitch(empty_listing)
     test_listing = snitch(listing)
     test_listing_changes = snitch(listing_changes)
+    test_listing_changes_longpoll = snitch(listing_changes_longpoll)
+    test_due_auctions = snitch(due_auctions)
+    test_listing_filtered = snitch(listing_filtered)
     test_listing_draft = snitch(listing_draft)
     test_create_auction_draft = snitch(create_auction_draft)
     test_get_auction = snitch(get_auction)
+    test_auction_etag = snitch(auction_etag)
     test_auction_not_found = snitch(auction_not_found)
     test_auction_Administrator_change = snitch(auction_Administrator_change)
 
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import datetime, timedelta
+
+from mock import MagicMock, patch
+from munch import Munch
+
+from openprocurement.auctions.core.cache import (
+    SerializedCache,
+    get_auction_stable_until,
+    serialize_cached
+)
+from openprocurement.auctions.core.models import calc_auction_end_time
+
+
+class SerializedCacheTest(unittest.TestCase):
+
+    def test_serialized_cache(self):
+        now = datetime(2018, 1, 1, 12)
+
+        cache = SerializedCache(30)
+        cache.set('a', [u'a' * 8])
+        cache.set('b', [u'b' * 8])
+        self.assertEqual(cache.get('a', now), [u'a' * 8])
+        cache.set('c', [u'c' * 8])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b', now))
+        self.assertEqual(cache.get('a', now), [u'a' * 8])
+        self.assertEqual(cache.size, 24)
+
+        cache = SerializedCache(10)
+        cache.set('a', [u'a' * 20])
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+        cache = SerializedCache(100)
+        cache.set('a', [u'a' * 8])
+        cache.set('a', [u'a'])
+        self.assertEqual(cache.size, 5)
+
+        cache = SerializedCache(100)
+        cache.set('a', [], now + timedelta(minutes=1))
+        self.assertEqual(cache.get('a', now), [])
+        self.assertIsNone(cache.get('a', now + timedelta(minutes=1)))
+        self.assertEqual(cache.size, 0)
+
+        def cache_request(cache, rev='1-a', path='/api/2.5/auctions/1'):
+            return Munch(
+                path=path,
+                registry=Munch(serialized_cache=cache, use_docservice=True, docservice_url='http://localhost'),
+                validated={'auction': Munch(id='1', rev=rev)},
+            )
+
+        with patch('openprocurement.auctions.core.cache.get_now', return_value=now):
+            cache = SerializedCache(1000)
+            serialize = MagicMock(side_effect=lambda: {'status': 'active.tendering'})
+            data = serialize_cached(cache_request(cache), 'active.tendering', serialize)
+            self.assertIs(serialize_cached(cache_request(cache), 'active.tendering', serialize), data)
+            self.assertEqual(serialize.call_count, 1)
+            serialize_cached(cache_request(cache), 'chronograph_view', serialize)
+            serialize_cached(cache_request(cache, rev='2-b'), 'active.tendering', serialize)
+            serialize_cached(cache_request(cache, path='/api/2.5/auctions/1/bids'), 'active.tendering', serialize)
+            self.assertEqual(serialize.call_count, 4)
+
+            # expired
+            cache = SerializedCache(1000)
+            serialize = MagicMock(return_value={})
+            serialize_cached(cache_request(cache), 'active.auction', serialize, now)
+            serialize_cached(cache_request(cache), 'active.auction', serialize, now)
+            self.assertEqual(serialize.call_count, 2)
+            self.assertEqual(len(cache), 0)
+
+            # disabled
+            serialize = MagicMock(return_value={})
+            serialize_cached(cache_request(None), 'active.tendering', serialize)
+            serialize_cached(cache_request(None), 'active.tendering', serialize)
+            self.assertEqual(serialize.call_count, 2)
+
+        def stable_auction(status, start=None, lots=()):
+            return Munch(status=status, numberOfBids=2, auctionPeriod=Munch(startDate=start, endDate=None),
+                         lots=list(lots))
+
+        self.assertIsNone(get_auction_stable_until(stable_auction('complete'), now))
+        self.assertIsNone(get_auction_stable_until(stable_auction('active.tendering'), now))
+        self.assertEqual(get_auction_stable_until(stable_auction('active.auction'), now), now)
+
+        start = now + timedelta(days=1)
+        auction = stable_auction('active.tendering', start)
+        self.assertEqual(get_auction_stable_until(auction, now), calc_auction_end_time(2, start))
+        auction = stable_auction('active.tendering', now - timedelta(days=1))
+        self.assertIsNone(get_auction_stable_until(auction, now))
+
+        lots = [
+            Munch(status='active', numberOfBids=1, auctionPeriod=Munch(startDate=start, endDate=None)),
+            Munch(status='cancelled', numberOfBids=0, auctionPeriod=Munch(startDate=start, endDate=None)),
+        ]
+        auction = stable_auction('active.tendering', now + timedelta(days=2), lots)
+        self.assertEqual(get_auction_stable_until(auction, now), calc_auction_end_time(1, start))
+        auction.lots[1].status = 'active'
+        self.assertEqual(get_auction_stable_until(auction, now), calc_auction_end_time(0, start))
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(SerializedCacheTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from schematics.exceptions import ValidationError
+
+from openprocurement.api.models.auction_models import CPV_CODES
+
+from openprocurement.auctions.core.classifications import (
+    CodeType,
+    PrefixTrie,
+    get_choices_message,
+    is_location_required,
+    validate_classification_code
+)
+from openprocurement.auctions.core.constants import CLASSIFICATION_ERROR_CODES
+
+
+class ClassificationsTest(unittest.TestCase):
+
+    def test_classification_codes(self):
+        trie = PrefixTrie(('07', '08', '123'))
+        for code in ('07', '07000000-9', '08126000-5', '12300000-1'):
+            self.assertTrue(trie.match(code))
+        for code in ('0', '06000000-2', '12', '12200000-0', ''):
+            self.assertFalse(trie.match(code))
+        self.assertTrue(PrefixTrie(('',)).match('06000000-2'))
+        self.assertFalse(PrefixTrie(()).match('06000000-2'))
+
+        self.assertFalse(is_location_required(u'CAV-PS', u'07227000-6'))
+        self.assertTrue(is_location_required(u'CAV-PS', u'04121000-2'))
+        self.assertFalse(is_location_required(u'CPV', u'45112000-5'))
+        self.assertTrue(is_location_required(u'CPV', u'03111000-2'))
+        self.assertFalse(is_location_required(u'CPVS', u'PA01-7'))
+
+        # only some of the codes are listed in the error
+        codes = [unicode(i) for i in range(CLASSIFICATION_ERROR_CODES * 100)]
+        message = get_choices_message(codes)
+        self.assertLess(len(message), 20 * CLASSIFICATION_ERROR_CODES)
+        self.assertIn(u'({} more)'.format(len(codes) - CLASSIFICATION_ERROR_CODES), message)
+        self.assertEqual(get_choices_message([u'a']), u"Value must be one of [u'a'].")
+
+        field = CodeType([u'a', u'b'], required=True)
+        field.validate(u'a')
+        with self.assertRaises(ValidationError) as context:
+            field.validate(u'c')
+        self.assertEqual(context.exception.messages, [u"Value must be one of [u'a', u'b']."])
+
+        validate_classification_code(u'CPV', CPV_CODES[0])
+        validate_classification_code(u'unknown', u'c')
+        with self.assertRaises(ValidationError):
+            validate_classification_code(u'CPV', u'c')
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ClassificationsTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
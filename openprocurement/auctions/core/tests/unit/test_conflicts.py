@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import unittest
+from copy import deepcopy
+
+from couchdb.client import Row
+from jsonpatch import make_patch
+from mock import MagicMock
+from schematics.models import Model as SchematicsModel
+from schematics.types import BaseType, StringType
+from schematics.types.compound import DictType, ListType as SchematicsListType
+from schematics.types.serializable import serializable
+
+from openprocurement.auctions.core.conflicts import (
+    UnresolvableConflict,
+    merge_conflict,
+    resolve_conflicts
+)
+
+
+class ConflictsTest(unittest.TestCase):
+
+    def test_auction_conflicts(self):
+        class ConflictingAuction(SchematicsModel):
+            _id = StringType()
+            _rev = StringType()
+            doc_type = StringType()
+            procurementMethodType = StringType()
+            status = StringType()
+            title = StringType()
+            dateModified = StringType()
+            bids = SchematicsListType(DictType(StringType), default=list())
+            revisions = SchematicsListType(DictType(BaseType), default=list())
+
+            @serializable
+            def numberOfBids(self):
+                return len(self.bids)
+
+            @serializable
+            def next_check(self):
+                return u'2018-01-01T00:00:00+02:00' if self.bids else None
+
+        models = {'dgfOtherAssets': ConflictingAuction}
+
+        def change(doc, date, **fields):
+            """Copy of the document with `fields` changed and the revision added"""
+            data = deepcopy(doc)
+            data.update(fields)
+            src = dict([(i, j) for i, j in doc.items() if i not in ('_id', '_rev', 'revisions', 'dateModified')])
+            dst = dict([(i, j) for i, j in data.items() if i not in ('_id', '_rev', 'revisions', 'dateModified')])
+            data['revisions'] = doc['revisions'] + [{'rev': doc['_rev'], 'date': date, 'changes': make_patch(dst, src).patch}]
+            data['dateModified'] = date
+            data['_rev'] = '{}-{}'.format(int(doc['_rev'].split('-')[0]) + 1, date)
+            return data
+
+        def conflict(winner_fields, loser_fields, doc_id='a' * 32, pmt='dgfOtherAssets'):
+            base = {
+                '_id': doc_id, '_rev': '1-a', 'doc_type': 'Auction', 'procurementMethodType': pmt,
+                'status': 'active.tendering', 'title': u'title', 'bids': [], 'numberOfBids': 0,
+                'revisions': [{'rev': None, 'date': '1', 'changes': []}],
+            }
+            return change(base, '2', **winner_fields), change(base, '3', **loser_fields)
+
+        def conflicts_db(docs):
+            """Database of documents with the first one as the winner"""
+            db = MagicMock()
+            rows = [Row(id=i[0]['_id'], key=i[0]['_rev'], value=[j['_rev'] for j in i], doc=deepcopy(i[0])) for i in docs]
+            revs = dict([((j['_id'], j['_rev']), j) for i in docs for j in i[1:]])
+            db.iterview.return_value = rows
+            db.get.side_effect = lambda doc_id, rev: deepcopy(revs.get((doc_id, rev)))
+            db.update.side_effect = lambda docs: [(True, i['_id'], 'new') for i in docs]
+            return db
+
+        winner, loser = conflict({'title': u'new title'}, {'bids': [{'id': 'b'}]})
+        self.assertTrue(merge_conflict(winner, loser))
+        self.assertEqual(winner['title'], u'new title')
+        self.assertEqual(winner['bids'], [{'id': 'b'}])
+        self.assertEqual(winner['dateModified'], '3')
+        self.assertEqual([i['date'] for i in winner['revisions']], ['1', '2', '3'])
+        self.assertEqual(winner['revisions'][-1]['changes'], [{'op': 'remove', 'path': '/bids/0'}])
+
+        winner, loser = conflict({'status': 'active.auction'}, {'status': 'unsuccessful'})
+        with self.assertRaises(UnresolvableConflict):
+            merge_conflict(winner, loser)
+
+        winner, loser = conflict({'title': u'new title'}, {})
+        loser['revisions'] = loser['revisions'][:1]
+        self.assertFalse(merge_conflict(winner, loser))
+
+        # merged auctions are run through the model, so derived fields are computed again
+        db = conflicts_db([
+            conflict({'title': u'new title'}, {'bids': [{'id': 'b'}]}),
+            conflict({'status': 'active.auction'}, {'status': 'unsuccessful'}, 'b' * 32),
+            conflict({'title': u'new title'}, {'bids': [{'id': 'b'}]}, 'c' * 32, 'unknown'),
+        ])
+        winner, loser = conflict({}, {})
+        stats = resolve_conflicts(db, models, batch_size=10)
+        self.assertEqual(stats['resolved'], 1)
+        self.assertEqual(stats['unresolvable'], ['b' * 32, 'c' * 32])
+        saved, deleted = [i[0][0] for i in db.update.call_args_list]
+        self.assertEqual(saved[0]['bids'], [{'id': 'b'}])
+        self.assertEqual(saved[0]['title'], u'new title')
+        self.assertEqual(saved[0]['numberOfBids'], 1)
+        self.assertEqual(saved[0]['next_check'], u'2018-01-01T00:00:00+02:00')
+        self.assertEqual((saved[0]['_id'], saved[0]['_rev']), ('a' * 32, winner['_rev']))
+        self.assertEqual(deleted, [{'_id': 'a' * 32, '_rev': loser['_rev'], '_deleted': True}])
+
+        db = conflicts_db([conflict({'title': u'new title'}, {'bids': [{'id': 'b'}]})])
+        db.update.side_effect = lambda docs: [(False, i['_id'], Exception('conflict')) for i in docs]
+        stats = resolve_conflicts(db, models)
+        self.assertEqual(stats['resolved'], 0)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(db.update.call_count, 1)
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ConflictsTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
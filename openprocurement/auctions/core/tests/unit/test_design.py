@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+import unittest
+from copy import deepcopy
+from json import dumps, loads
+from uuid import uuid4
+
+from couchdb.http import ResourceConflict
+from mock import MagicMock, patch
+from pyramid.config import Configurator
+from pyramid.exceptions import ConfigurationConflictError
+
+from openprocurement.api import design
+from openprocurement.api.design import sync_design
+
+from openprocurement.auctions.core import design as core_design
+from openprocurement.auctions.core.design import (
+    CHANGES_FIELDS,
+    DESIGN_HASH,
+    FIELDS,
+    STAGING_SUFFIX,
+    FilteredView,
+    StagedViewDefinition,
+    add_design,
+    add_index_options,
+    add_listing_projections,
+    auctions_by_dateModified_view,
+    auctions_real_type_by_dateModified_view,
+    auctions_real_type_status_by_dateModified_view,
+    warm_up_design
+)
+from openprocurement.auctions.core.tests.base import BaseWebTest
+from openprocurement.auctions.core.utils import register_auction_listing_projection
+
+
+class ListingProjectionsTest(unittest.TestCase):
+
+    def test_listing_projections(self):
+        def get_projections(view):
+            line = [i for i in view.map_fun.splitlines() if 'var projections=' in i][0]
+            return loads(line.split('var projections=', 1)[1].rsplit(', data={};', 1)[0])
+
+        self.assertNotIn('lots', FIELDS)
+        self.assertEqual(get_projections(design.auctions_by_dateModified_view), {})
+        self.assertIn('|| {};'.format(dumps(FIELDS)), design.auctions_by_dateModified_view.map_fun)
+
+        config = Configurator()
+        config.registry.auction_listing_projections = {}
+        config.add_directive('add_auction_listing_projection', register_auction_listing_projection)
+        try:
+            config.add_auction_listing_projection('dgfOtherAssets', ['lots', 'status', 'dgfID'])
+            config.commit()
+            self.assertEqual(config.registry.auction_listing_projections, {'dgfOtherAssets': ['lots', 'status', 'dgfID']})
+            self.assertEqual(get_projections(design.auctions_by_dateModified_view), {
+                'dgfOtherAssets': FIELDS + ['lots', 'dgfID'],
+            })
+            self.assertEqual(get_projections(design.auctions_test_by_local_seq_view), {
+                'dgfOtherAssets': CHANGES_FIELDS + ['lots', 'dgfID'],
+            })
+            self.assertIn("doc.mode == 'test'", design.auctions_test_by_local_seq_view.map_fun)
+            self.assertIn('emit(doc._local_seq, data);', design.auctions_test_by_local_seq_view.map_fun)
+            # module views aren't changed
+            self.assertEqual(get_projections(auctions_by_dateModified_view), {})
+
+            # the code doesn't depend on the order of registration
+            config.add_auction_listing_projection('dgfFinancialAssets', ['dgfID'])
+            config.commit()
+            map_fun = design.auctions_by_dateModified_view.map_fun
+            add_listing_projections(dict(reversed(config.registry.auction_listing_projections.items())))
+            self.assertEqual(design.auctions_by_dateModified_view.map_fun, map_fun)
+
+            config.add_auction_listing_projection('dgfOtherAssets', ['dgfID'])
+            config.add_auction_listing_projection('dgfOtherAssets', ['title'])
+            with self.assertRaises(ConfigurationConflictError):
+                config.commit()
+        finally:
+            add_design()
+
+
+class ListingProjectionsSyncTest(BaseWebTest):
+
+    def test_projection_synced_before_commit(self):
+        # the API syncs the design docs before the configuration is committed
+        config = Configurator()
+        config.registry.auction_listing_projections = {}
+        config.add_directive('add_auction_listing_projection', register_auction_listing_projection)
+        try:
+            config.add_auction_listing_projection('dgfOtherAssets', ['lots', 'dgfID'])
+            # written at once like on a new database, instead of staged
+            del self.db['_design/auctions']
+            sync_design(self.db)
+            map_fun = self.db['_design/auctions']['views']['by_dateModified']['map']
+            self.assertIn('"dgfOtherAssets": {}'.format(dumps(FIELDS + ['lots', 'dgfID'])), map_fun)
+            self.assertEqual(map_fun, design.auctions_by_dateModified_view.map_fun)
+            config.commit()
+        finally:
+            add_design()
+        del self.db['_design/auctions']
+
+        auction = {
+            '_id': uuid4().hex,
+            'doc_type': 'Auction',
+            'procurementMethodType': 'otherType',
+            'status': 'active.tendering',
+            'lots': [{'id': uuid4().hex}],
+            'dateModified': u'2018-01-01T00:00:00+02:00',
+        }
+        self.db.save(auction)
+        sync_design(self.db)
+        self.assertNotIn('lots', self.db.view('auctions/by_dateModified').rows[0].value)
+
+
+def fixture_db():
+    storage = {}
+    db = MagicMock()
+
+    def save(doc):
+        stored = storage.get(doc['_id'])
+        if stored and stored['_rev'] != doc.get('_rev'):
+            raise ResourceConflict(('conflict', 'Document update conflict.'))
+        doc['_rev'] = str(int(stored['_rev']) + 1 if stored else 1)
+        storage[doc['_id']] = deepcopy(doc)
+
+    db.get.side_effect = lambda key, default=None: deepcopy(storage.get(key, default))
+    db.__getitem__.side_effect = lambda key: deepcopy(storage[key])
+    db.delete.side_effect = lambda doc: storage.pop(doc['_id'])
+    db.save.side_effect = save
+    db.info.return_value = {'view_index': {'updater_running': False}}
+    db.storage = storage
+    return db
+
+
+@patch('openprocurement.auctions.core.design.Thread')
+class StagedSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        add_design()
+
+    def sync_design(self, db):
+        views = [j for i, j in design.__dict__.items() if "_view" in i]
+        design.ViewDefinition.sync_many(db, views, callback=design.add_index_options)
+
+    def test_create(self, thread):
+        db = fixture_db()
+        self.sync_design(db)
+        self.assertIn('_design/auctions', db.storage)
+        self.assertIn(DESIGN_HASH, db.storage['_design/auctions'])
+        self.assertEqual(db.storage['_design/auctions']['options'], {'local_seq': True})
+        self.assertIn('partial', db.storage['_design/auctions']['shows'])
+        self.assertFalse(thread.called)
+
+    def test_unchanged(self, thread):
+        db = fixture_db()
+        self.sync_design(db)
+        saves = db.save.call_count
+        self.sync_design(db)
+        self.assertEqual(db.save.call_count, saves)
+        self.assertFalse(thread.called)
+
+    def test_changed(self, thread):
+        db = fixture_db()
+        self.sync_design(db)
+        doc = db.storage['_design/auctions']
+        doc['views']['all']['map'] = 'function(doc) {}'
+        doc['views']['custom'] = {'map': 'function(doc) {}'}
+        doc[DESIGN_HASH] = 'old'
+        self.sync_design(db)
+
+        self.assertEqual(db.storage['_design/auctions'][DESIGN_HASH], 'old')
+        staging = db.storage['_design/auctions' + STAGING_SUFFIX]
+        self.assertNotEqual(staging['views']['all']['map'], 'function(doc) {}')
+        self.assertIn('custom', staging['views'])
+        self.assertEqual(thread.call_count, 1)
+
+        warm_up_design(*thread.call_args[1]['args'])
+        db.view.assert_any_call('auctions{}/{}'.format(STAGING_SUFFIX, sorted(staging['views'])[0]), limit=0, stale='update_after')
+        self.assertEqual(db.storage['_design/auctions'][DESIGN_HASH], staging[DESIGN_HASH])
+        self.assertEqual(db.storage['_design/auctions']['views'], staging['views'])
+        self.assertNotIn('_design/auctions' + STAGING_SUFFIX, db.storage)
+
+    def test_changed_while_warmed_up(self, thread):
+        db = fixture_db()
+        self.sync_design(db)
+        db.storage['_design/auctions'][DESIGN_HASH] = 'old'
+        self.sync_design(db)
+        db.storage['_design/auctions']['_rev'] = '10'
+        warm_up_design(*thread.call_args[1]['args'])
+        self.assertEqual(db.storage['_design/auctions'][DESIGN_HASH], 'old')
+        self.assertNotIn('_design/auctions' + STAGING_SUFFIX, db.storage)
+
+    def test_no_warm_up(self, thread):
+        db = fixture_db()
+        core_design.sync_design(db)
+        db.storage['_design/auctions'][DESIGN_HASH] = 'old'
+        core_design.sync_design(db, warm_up=False)
+        self.assertNotEqual(db.storage['_design/auctions'][DESIGN_HASH], 'old')
+        self.assertFalse(thread.called)
+
+
+class StagedSyncDatabaseTest(BaseWebTest):
+
+    def test_unchanged_hash(self):
+        # design docs are synced by the API through the staged sync
+        self.assertIs(design.ViewDefinition, StagedViewDefinition)
+        self.assertIs(design.add_index_options, add_index_options)
+        doc = self.db['_design/auctions']
+        self.assertIn(DESIGN_HASH, doc)
+        with patch('openprocurement.auctions.core.design.Thread') as thread:
+            sync_design(self.db)
+        self.assertEqual(self.db['_design/auctions']['_rev'], doc['_rev'])
+        self.assertNotIn('_design/auctions' + STAGING_SUFFIX, self.db)
+        self.assertFalse(thread.called)
+
+
+class FilteredViewTest(BaseWebTest):
+
+    def test_filtered_view(self):
+        auctions = []
+        for index, (pmt, status) in enumerate([
+            ('firstType', 'active.tendering'),
+            ('firstType', 'active.qualification'),
+            ('firstType', 'active.tendering'),
+            ('secondType', 'active.tendering'),
+            ('firstType', 'active.tendering'),
+        ]):
+            auction = {
+                '_id': uuid4().hex,
+                'doc_type': 'Auction',
+                'procurementMethodType': pmt,
+                'status': status,
+                'dateModified': u'2018-01-0{}T00:00:00+02:00'.format(index + 1),
+            }
+            self.db.save(auction)
+            auctions.append(auction)
+        tendering = [i['_id'] for i in auctions if i['procurementMethodType'] == 'firstType' and i['status'] == 'active.tendering']
+        first_type = [i['_id'] for i in auctions if i['procurementMethodType'] == 'firstType']
+
+        # every auction is emitted once
+        view = FilteredView(auctions_real_type_by_dateModified_view, ['firstType'])
+        self.assertEqual([i.id for i in view(self.db)], first_type)
+        self.assertEqual([i.id for i in view(self.db, descending=True)], first_type[::-1])
+        self.assertEqual([i.key for i in view(self.db, startkey=auctions[2]['dateModified'])],
+                         [auctions[2]['dateModified'], auctions[4]['dateModified']])
+        view = FilteredView(auctions_real_type_status_by_dateModified_view, ['firstType', 'active.tendering'])
+        self.assertEqual([i.id for i in view(self.db)], tendering)
+        self.assertEqual([i.id for i in view(self.db, descending=True)], tendering[::-1])
+        self.assertEqual([i.id for i in view(self.db, startkey=auctions[2]['dateModified'], descending=True)],
+                         tendering[1::-1])
+        self.assertEqual(len(self.db.view('auctions/type_by_dateModified').rows), 5)
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ListingProjectionsTest))
+    suite.addTest(unittest.makeSuite(ListingProjectionsSyncTest))
+    suite.addTest(unittest.makeSuite(StagedSyncTest))
+    suite.addTest(unittest.makeSuite(StagedSyncDatabaseTest))
+    suite.addTest(unittest.makeSuite(FilteredViewTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
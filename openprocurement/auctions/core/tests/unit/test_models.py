@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from mock import MagicMock, patch
+from pyramid.security import Allow
+from schematics.transforms import blacklist, whitelist
+from schematics.types import StringType
+from schematics.types.compound import ModelType
+from schematics.types.serializable import serializable
+from zope.interface import implementer
+
+from openprocurement.api.constants import TZ
+from openprocurement.api.models.auction_models import ListType, Model
+
+from openprocurement.auctions.core.interfaces import IAuction
+from openprocurement.auctions.core.models import (
+    ACCESS_CACHE,
+    DOCSERVICE_URL_CACHE,
+    Auction,
+    Bid,
+    DirtyFieldsMixin,
+    LazyHydrationMixin,
+    get_auction_access,
+    get_docservice_url,
+    get_lot_bids_counts,
+    get_stored_next_check,
+    is_hidden_field
+)
+
+
+class DirtyFieldsTest(unittest.TestCase):
+
+    def test_dirty_fields(self):
+        auction = Auction({
+            'title': u'title',
+            'value': {'amount': 100, 'currency': u'UAH'},
+            'bids': [{'id': uuid4().hex, 'status': u'active'}, {'id': uuid4().hex, 'status': u'active'}],
+            'questions': [{'id': uuid4().hex, 'title': u'question'}],
+        })
+        self.assertIsNone(auction.get_dirty_fields())
+        auction.start_tracking()
+        get_dirty_fields = lambda: set([i for i in auction.get_dirty_fields() if not i.startswith('_')])
+
+        self.assertEqual(auction.value.amount, 100)
+        self.assertEqual([i.status for i in auction.bids], [u'active', u'active'])
+        self.assertEqual(get_dirty_fields(), set())
+
+        auction.bids[1].status = u'invalid'
+        self.assertEqual(get_dirty_fields(), set(['bids']))
+        auction.value.amount = 200
+        self.assertEqual(get_dirty_fields(), set(['bids', 'value']))
+        auction.questions.pop()
+        self.assertEqual(get_dirty_fields(), set(['bids', 'value', 'questions']))
+        auction.import_data({'title': u'new title'})
+        self.assertEqual(get_dirty_fields(), set(['bids', 'value', 'questions', 'title']))
+
+
+class LazyHydrationTest(unittest.TestCase):
+
+    def test_lazy_hydration(self):
+        class Item(Model):
+            id = StringType()
+
+        class Container(LazyHydrationMixin, DirtyFieldsMixin, Model):
+            title = StringType()
+            items = ListType(ModelType(Item), default=list())
+            others = ListType(ModelType(Item), default=list())
+
+        data = {
+            'title': u'title',
+            'items': [{'id': u'1'}, {'id': u'2'}],
+            'others': [{'id': u'3'}],
+        }
+
+        container = Container(data)
+        self.assertIsNone(container._lazy)
+        self.assertEqual(container._data['items'][0].id, u'1')
+
+        container = Container.lazy(data)
+        self.assertEqual(sorted(container._lazy), ['items', 'others'])
+        self.assertNotIn('items', container._data)
+        self.assertIn('items', container)
+        self.assertEqual(container.title, u'title')
+        self.assertEqual(container.get_raw_list('items'), data['items'])
+        self.assertEqual([i.id for i in container.items], [u'1', u'2'])
+        self.assertIs(container.items[0].__parent__, container)
+        self.assertEqual(list(container._lazy), ['others'])
+        self.assertIsNone(container.get_raw_list('items'))
+        self.assertEqual(container['others'][0].id, u'3')
+        with self.assertRaises(AttributeError):
+            container.missing
+
+        container = Container.lazy(data)
+        self.assertEqual(container.serialize(), Container(data).serialize())
+
+        container = Container.lazy(data)
+        container.import_data({'items': [{'id': u'4'}]})
+        self.assertIsNone(container._lazy)
+        self.assertEqual([i.id for i in container.items], [u'4'])
+
+        container = Container.lazy(data)
+        container.validate()
+        self.assertIsNone(container._lazy)
+        self.assertEqual([i.id for i in container._data['others']], [u'3'])
+
+        # lists assigned before they're read aren't converted
+        container = Container.lazy(data)
+        container.items = [Item({'id': u'5'})]
+        container['others'] = []
+        self.assertIsNone(container.get_raw_list('items'))
+        container.validate()
+        self.assertEqual([i.id for i in container.items], [u'5'])
+        self.assertEqual(container.others, [])
+
+        # converted lists are tracked, reading them doesn't make them dirty
+        container = Container.lazy(data)
+        container.start_tracking()
+        self.assertEqual(len(container.items), 2)
+        self.assertEqual(container.get_dirty_fields(), set())
+        container.others[0].id = u'6'
+        self.assertEqual(container.get_dirty_fields(), set(['others']))
+
+
+class AuctionAccessTest(unittest.TestCase):
+
+    def test_auction_access(self):
+        class AccessBid(DirtyFieldsMixin, Model):
+            id = StringType()
+            owner = StringType()
+            owner_token = StringType()
+
+        class AccessAuction(LazyHydrationMixin, DirtyFieldsMixin, Model):
+            _id = StringType()
+            _rev = StringType()
+            owner = StringType()
+            owner_token = StringType()
+            bids = ListType(ModelType(AccessBid), default=list())
+
+            @property
+            def id(self):
+                return self._id
+
+            @property
+            def rev(self):
+                return self._rev
+
+        data = {
+            '_id': u'a',
+            '_rev': u'1-a',
+            'owner': u'broker',
+            'owner_token': u'token',
+            'bids': [{'id': u'1', 'owner': u'broker1', 'owner_token': u'token1'}],
+        }
+        ACCESS_CACHE.clear()
+
+        roles, acl = get_auction_access(AccessAuction(data))
+        self.assertEqual(roles, {'broker_token': 'auction_owner', 'broker1_token1': 'bid_owner'})
+        self.assertEqual(acl, (
+            (Allow, 'broker1_token1', 'create_award_complaint'),
+            (Allow, 'broker_token', 'edit_auction'),
+            (Allow, 'broker_token', 'upload_auction_documents'),
+            (Allow, 'broker_token', 'edit_complaint'),
+        ))
+
+        # lazy bids aren't converted
+        auction = AccessAuction.lazy(data)
+        self.assertEqual(get_auction_access(auction), (roles, acl))
+        self.assertIn('bids', auction._lazy)
+
+        # cached by the revision
+        access = get_auction_access(AccessAuction(data))
+        self.assertIs(get_auction_access(AccessAuction(data)), access)
+        self.assertIsNot(get_auction_access(AccessAuction(dict(data, _rev=u'2-b'))), access)
+
+        # not cached while owners could change
+        auction = AccessAuction(data)
+        auction.start_tracking()
+        auction.bids.append(AccessBid({'id': u'2', 'owner': u'broker2', 'owner_token': u'token2'}))
+        self.assertEqual(get_auction_access(auction)[0]['broker2_token2'], 'bid_owner')
+        self.assertIs(get_auction_access(AccessAuction(data)), access)
+        auction = AccessAuction(data)
+        auction.start_tracking()
+        auction.owner_token = u'new'
+        self.assertIn('broker_new', get_auction_access(auction)[0])
+
+        # not cached if built from a partially fetched auction
+        ACCESS_CACHE.clear()
+        partial = dict(data)
+        del partial['bids']
+        auction = AccessAuction(partial)
+        auction.partial_fields = ['questions']
+        self.assertNotIn('broker1_token1', get_auction_access(auction)[0])
+        self.assertEqual(get_auction_access(AccessAuction(data)), (roles, acl))
+        # while the cached one is used for it
+        self.assertIs(get_auction_access(auction), get_auction_access(AccessAuction(data)))
+
+
+    def test_auction_access_copies(self):
+        ACCESS_CACHE.clear()
+        data = {
+            '_id': uuid4().hex,
+            '_rev': u'1-a',
+            'owner': u'broker',
+            'owner_token': u'token',
+            'bids': [{'id': uuid4().hex, 'owner': u'broker1', 'owner_token': u'token1'}],
+        }
+        auction = Auction(data)
+        acl = auction.__acl__()
+        acl.append((Allow, 'g:admins', 'edit_auction'))
+        roles = auction.__local_roles__()
+        roles['broker2_token2'] = 'bid_owner'
+
+        # changes of the returned ones don't get to the cache
+        auction = Auction(data)
+        self.assertNotIn((Allow, 'g:admins', 'edit_auction'), auction.__acl__())
+        self.assertNotIn('broker2_token2', auction.__local_roles__())
+        self.assertEqual(auction.__local_roles__(), {'broker_token': 'auction_owner', 'broker1_token1': 'bid_owner'})
+
+
+class BidsCountsTest(unittest.TestCase):
+
+    def test_bids_counts(self):
+        lot1, lot2 = uuid4().hex, uuid4().hex
+
+        @implementer(IAuction)
+        class CountedAuction(LazyHydrationMixin, Model):
+            bids = ListType(ModelType(Bid), default=list())
+
+        def bid_data(lots, status='active'):
+            return {'id': uuid4().hex, 'status': status, 'lotValues': [{'relatedLot': i} for i in lots]}
+
+        data = {'bids': [bid_data([lot1, lot2]), bid_data([lot1]), bid_data([lot1], 'draft')]}
+
+        auction = CountedAuction(data)
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 2, lot2: 1})
+        self.assertIs(get_lot_bids_counts(auction), get_lot_bids_counts(auction))
+
+        # lazy bids aren't converted
+        auction = CountedAuction.lazy(data)
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 2, lot2: 1})
+        self.assertIn('bids', auction._lazy)
+
+        # counted again on changes of bids
+        auction = CountedAuction(data)
+        for bid in auction.bids:
+            bid.__parent__ = auction
+        get_lot_bids_counts(auction)
+        auction.bids[2].status = 'active'
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 3, lot2: 1})
+        auction.bids[0].import_data({'lotValues': [{'relatedLot': lot2}]})
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 2, lot2: 1})
+        auction.bids[1].lotValues[0].__parent__ = auction.bids[1]
+        auction.bids[1].lotValues[0].relatedLot = lot2
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 1, lot2: 2})
+        auction.bids.append(Bid(bid_data([lot1])))
+        self.assertEqual(get_lot_bids_counts(auction), {lot1: 2, lot2: 2})
+        auction.bids = []
+        self.assertEqual(get_lot_bids_counts(auction), {})
+
+
+class StoredNextCheckTest(unittest.TestCase):
+
+    def test_stored_next_check(self):
+        now = datetime(2018, 1, 1, 12, tzinfo=TZ)
+        next_check = (now + timedelta(hours=1)).isoformat()
+
+        class CheckedLot(DirtyFieldsMixin, Model):
+            id = StringType()
+            status = StringType()
+
+        class CheckedAuction(LazyHydrationMixin, DirtyFieldsMixin, Model):
+            _id = StringType()
+            _rev = StringType()
+            title = StringType()
+            status = StringType()
+            lots = ListType(ModelType(CheckedLot), default=list())
+
+            @property
+            def rev(self):
+                return self._rev
+
+            @serializable(serialize_when_none=False)
+            def next_check(self):
+                return get_stored_next_check(self)
+
+        data = {
+            '_id': u'a',
+            '_rev': u'1-a',
+            'title': u'title',
+            'status': u'active.auction',
+            'lots': [{'id': u'1', 'status': u'active'}],
+            'next_check': next_check,
+        }
+
+        with patch('openprocurement.auctions.core.models.get_now', MagicMock(return_value=now)):
+            with patch('openprocurement.auctions.core.models.get_request_from_root',
+                       MagicMock(return_value=MagicMock(method='GET'))):
+                self.assertEqual(get_stored_next_check(CheckedAuction(data)), next_check)
+                self.assertEqual(get_stored_next_check(CheckedAuction.lazy(data)), next_check)
+                self.assertIsNone(get_stored_next_check(CheckedAuction(dict(data, next_check=now.isoformat()))))
+                self.assertIsNone(get_stored_next_check(CheckedAuction(dict(data, next_check=None))))
+                auction = CheckedAuction(data)
+                auction._rev = u'2-b'
+                self.assertIsNone(get_stored_next_check(auction))
+            with patch('openprocurement.auctions.core.models.get_request_from_root',
+                       MagicMock(return_value=MagicMock(method='PATCH'))):
+                self.assertIsNone(get_stored_next_check(CheckedAuction(data)))
+
+            # not stored yet
+            self.assertIsNone(get_stored_next_check(CheckedAuction(dict(data, _rev=None))))
+
+            # computed again on changes of the fields it depends on
+            auction = CheckedAuction(data)
+            auction.start_tracking()
+            auction.title = u'new'
+            auction.lots[0].id  # noqa
+            self.assertEqual(get_stored_next_check(auction), next_check)
+            auction.lots[0].status = u'cancelled'
+            self.assertIsNone(get_stored_next_check(auction))
+            auction = CheckedAuction(data)
+            auction.start_tracking()
+            auction.import_data({'status': u'active.qualification'})
+            self.assertIsNone(get_stored_next_check(auction))
+
+
+class DocserviceUrlsTest(unittest.TestCase):
+
+    def test_docservice_urls(self):
+        url = 'http://localhost/get/{}?download={}'.format('a' * 32, 'b' * 32)
+        unhashed_url = 'http://localhost/api/2.5/auctions/{}/documents/{}?download={}'.format('c' * 32, 'd' * 32, 'b' * 32)
+
+        class HiddenAuction(Model):
+            class Options:
+                roles = {
+                    'default': blacklist('bids'),
+                    'active.tendering': whitelist('documents'),
+                }
+
+            documents = StringType()
+            bids = StringType()
+            lot_values = StringType()
+
+        def docservice_request(key='key'):
+            return MagicMock(registry=MagicMock(docservice_url='http://localhost', docservice_key=key))
+
+        self.assertTrue(is_hidden_field(HiddenAuction, 'active.auction', 'bids'))
+        self.assertFalse(is_hidden_field(HiddenAuction, 'active.auction', 'documents'))
+        self.assertFalse(is_hidden_field(HiddenAuction, 'active.auction', 'unknown'))
+        self.assertTrue(is_hidden_field(HiddenAuction, 'active.tendering', 'bids'))
+        self.assertTrue(is_hidden_field(HiddenAuction, 'active.tendering', 'lot_values'))
+        self.assertTrue(is_hidden_field(HiddenAuction, 'active.tendering', 'unknown'))
+        self.assertFalse(is_hidden_field(HiddenAuction, 'active.tendering', 'documents'))
+
+        DOCSERVICE_URL_CACHE.clear()
+        with patch('openprocurement.api.utils.generate_docservice_url') as generate_docservice_url:
+            generate_docservice_url.side_effect = lambda request, doc_id, temporary, prefix=None: (doc_id, prefix)
+            request = docservice_request()
+            self.assertEqual(get_docservice_url(request, url, True), ('b' * 32, None))
+            self.assertEqual(get_docservice_url(request, url, True), ('b' * 32, None))
+            self.assertEqual(generate_docservice_url.call_count, 1)
+            self.assertEqual(get_docservice_url(request, unhashed_url, False),
+                             ('b' * 32, '{}/{}'.format('c' * 32, 'd' * 32)))
+            self.assertEqual(generate_docservice_url.call_count, 2)
+            # signed again with a new key
+            get_docservice_url(docservice_request('new key'), url, True)
+            self.assertEqual(generate_docservice_url.call_count, 3)
+        DOCSERVICE_URL_CACHE.clear()
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(DirtyFieldsTest))
+    suite.addTest(unittest.makeSuite(LazyHydrationTest))
+    suite.addTest(unittest.makeSuite(AuctionAccessTest))
+    suite.addTest(unittest.makeSuite(BidsCountsTest))
+    suite.addTest(unittest.makeSuite(StoredNextCheckTest))
+    suite.addTest(unittest.makeSuite(DocserviceUrlsTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import timedelta
+from copy import deepcopy
+from uuid import uuid4
+
+from openprocurement.api.utils import get_now, get_revision_changes
+
+from openprocurement.auctions.core.migration import migrate_revisions_to_chunks
+from openprocurement.auctions.core.models import Auction
+from openprocurement.auctions.core.revisions import (
+    get_auction_revisions,
+    get_revisions_chunk_id,
+    move_revisions_to_chunks,
+    split_revisions
+)
+from openprocurement.auctions.core.tests.base import BaseWebTest, test_auction_data
+from openprocurement.auctions.core.tests.fixtures.auction import (
+    FixtureAuction,
+    fixture_auctions,
+    fixture_document
+)
+from openprocurement.auctions.core.traversal import AuctionSnapshot
+from openprocurement.auctions.core.utils import get_auction_revision_changes
+
+
+class RevisionsChunksTest(BaseWebTest):
+
+    def test_revisions_chunks(self):
+        self.assertEqual(split_revisions(range(10), 0), ([], range(10)))
+        self.assertEqual(split_revisions(range(4), 3), ([], range(4)))
+        self.assertEqual(split_revisions(range(8), 3), ([[1, 2, 3], [4, 5, 6]], [0, 7]))
+
+        auction = Auction({
+            'id': uuid4().hex,
+            'title': u'title',
+            'revisions': [{'author': u'broker', 'rev': str(i), 'changes': []} for i in range(6)],
+        })
+        # a chunk left by a failed save is overwritten
+        chunk_id = get_revisions_chunk_id(auction.id, 0)
+        self.db.save({'_id': chunk_id, 'revisions': [{'rev': '1'}]})
+        self.assertTrue(move_revisions_to_chunks(self.db, auction, 2))
+        self.assertEqual(auction.revisionsChunks, 2)
+        self.assertEqual([i.rev for i in auction.revisions], ['0', '5'])
+        self.assertEqual([i['rev'] for i in self.db.get(chunk_id)['revisions']], ['1', '2'])
+        chunk = self.db.get(get_revisions_chunk_id(auction.id, 1))
+        self.assertEqual(chunk['doc_type'], 'AuctionRevisions')
+        self.assertEqual(chunk['index'], 1)
+        self.assertEqual([i['rev'] for i in chunk['revisions']], ['3', '4'])
+        self.assertFalse(move_revisions_to_chunks(self.db, auction, 2))
+
+        page, total = get_auction_revisions(self.db, auction, 0, 100)
+        self.assertEqual(total, 6)
+        self.assertEqual([i['rev'] for i in page], ['0', '1', '2', '3', '4', '5'])
+        page, total = get_auction_revisions(self.db, auction, 2, 3)
+        self.assertEqual([i['rev'] for i in page], ['2', '3', '4'])
+        page, total = get_auction_revisions(self.db, auction, 6, 3)
+        self.assertEqual(page, [])
+
+        auction = {'_id': uuid4().hex, 'revisions': [{'rev': str(i)} for i in range(7)]}
+        self.assertTrue(migrate_revisions_to_chunks(self.db, auction, 2))
+        self.assertEqual(auction['revisionsChunks'], 2)
+        self.assertEqual(auction['revisions'], [{'rev': '0'}, {'rev': '5'}, {'rev': '6'}])
+        chunk = self.db.get(get_revisions_chunk_id(auction['_id'], 1))
+        self.assertEqual(chunk['revisions'], [{'rev': '3'}, {'rev': '4'}])
+        self.assertFalse(migrate_revisions_to_chunks(self.db, auction, 2))
+
+
+class AuctionSnapshotTest(unittest.TestCase):
+
+    def test_auction_snapshot(self):
+        now = get_now()
+        doc = deepcopy(test_auction_data)
+        doc.update({
+            '_id': uuid4().hex,
+            '_rev': u'1-{}'.format(uuid4().hex),
+            'status': u'active.tendering',
+            'enquiryPeriod': {'startDate': now.isoformat(), 'endDate': (now + timedelta(days=7)).isoformat()},
+            'tenderPeriod': {'startDate': now.isoformat(), 'endDate': (now + timedelta(days=7)).isoformat()},
+            'next_check': (now + timedelta(days=7)).isoformat(),
+        })
+        expected = Auction(doc).serialize('plain')
+        expected['next_check'] = doc['next_check']
+
+        auction = Auction(doc)
+        snapshot = AuctionSnapshot(auction)
+        auction.start_tracking()
+        self.assertEqual(get_auction_revision_changes(auction, snapshot), [])
+
+        auction.title = u'new title'
+        auction.value.amount = 200
+        self.assertEqual(snapshot.serialize(), expected)
+        self.assertEqual(snapshot.serialize(['title', 'value', 'next_check']), {
+            'title': expected['title'],
+            'value': expected['value'],
+            'next_check': doc['next_check'],
+        })
+        self.assertEqual(sorted(get_auction_revision_changes(auction, snapshot)), sorted([
+            {'op': 'replace', 'path': '/title', 'value': u'new title'},
+            {'op': 'replace', 'path': '/value/amount', 'value': 200},
+        ]))
+
+
+class DirtyRevisionChangesTest(unittest.TestCase):
+
+    def test_fixture_auctions(self):
+        def add_bid_document(auction):
+            bid = auction.bids[0]
+            bid.documents.append(type(bid).documents.model_class(fixture_document()))
+
+        def cancel(auction):
+            auction.status = u'cancelled'
+
+        def switch_award(auction):
+            if auction.awards:
+                auction.awards[0].status = u'unsuccessful'
+                auction.awards[0].complaints[0].status = u'resolved'
+
+        def sign_contract(auction):
+            if auction.contracts:
+                auction.contracts[0].status = u'active'
+                auction.contracts[0].documents[0].title = u'signed.pdf'
+
+        def edit(auction):
+            auction.title = u'new title'
+            auction.value.amount = 200
+            del auction.documents[0]
+
+        for data in fixture_auctions():
+            for change in (add_bid_document, cancel, switch_award, sign_contract, edit):
+                # changes are diffed with the whole auction
+                auction = FixtureAuction(deepcopy(data))
+                src = auction.serialize('plain')
+                change(auction)
+                expected = get_revision_changes(auction.serialize('plain'), src)
+                self.assertEqual(get_auction_revision_changes(auction, src), expected)
+
+                auction = FixtureAuction(deepcopy(data))
+                snapshot = AuctionSnapshot(auction)
+                auction.start_tracking()
+                change(auction)
+                self.assertEqual(sorted(get_auction_revision_changes(auction, snapshot)), sorted(expected),
+                                 (data['status'], change.__name__))
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(RevisionsChunksTest))
+    suite.addTest(unittest.makeSuite(AuctionSnapshotTest))
+    suite.addTest(unittest.makeSuite(DirtyRevisionChangesTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
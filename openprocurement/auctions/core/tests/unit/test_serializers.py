@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import unittest
+from copy import deepcopy
+from json import dumps, loads
+
+from mock import patch
+from schematics.models import Model as SchematicsModel
+from schematics.transforms import Role, blacklist, whitelist
+from schematics.types import IntType, StringType
+from schematics.types.compound import DictType, ListType as SchematicsListType, ModelType
+from schematics.types.serializable import serializable
+
+from openprocurement.api.models.auction_models import Model
+
+from openprocurement.auctions.core.serializers import (
+    EXPORT_LOOP,
+    SERIALIZERS,
+    compile_serializers,
+    export_loop,
+    install_serializers
+)
+from openprocurement.auctions.core.tests.fixtures.auction import FixtureAuction, fixture_auctions
+
+
+class CompiledSerializersTest(unittest.TestCase):
+
+    def test_compiled_serializers(self):
+        class Value(SchematicsModel):
+            amount = IntType()
+            currency = StringType()
+
+        class Item(Model):
+            class Options:
+                serialize_when_none = False
+                roles = {
+                    'view': blacklist('owner'),
+                    'edit': whitelist('title'),
+                }
+
+            id = StringType()
+            title = StringType()
+            owner = StringType()
+            value = ModelType(Value)
+
+            @serializable(serialized_name='count')
+            def items_count(self):
+                return 1
+
+        class Container(Model):
+            class Options:
+                roles = {
+                    'view': blacklist('secret'),
+                    'edit': whitelist('title', 'items'),
+                    'custom': Role(lambda name, value, seq: value is None, []),
+                }
+
+            title = StringType()
+            secret = StringType()
+            counter = IntType(serialized_name='total', serialize_when_none=False)
+            items = SchematicsListType(ModelType(Item), default=list())
+            tags = DictType(StringType)
+
+            @serializable
+            def computed(self):
+                return len(self.items)
+
+        class Secret(Model):
+            class Options:
+                roles = {'view': blacklist('computed')}
+
+            title = StringType()
+
+            @serializable
+            def computed(self):
+                raise AssertionError('skipped field got')
+
+        def export(cls, instance, loop, role=None, print_none=False):
+            converter = lambda field, value: field.to_primitive(value)
+            with patch('schematics.types.compound.export_loop', loop):
+                return loop(cls, instance, converter, role=role, print_none=print_none)
+
+        data = {
+            'title': u'title',
+            'secret': u'secret',
+            'items': [{'id': u'1', 'title': u'item', 'owner': u'owner', 'value': {'amount': 1}}, {'id': u'2'}],
+            'tags': {'a': u'b'},
+        }
+        SERIALIZERS.clear()
+
+        # the output is the same as the one of the export loop of schematics
+        for i in (data, dict(data, secret=None, counter=1), {}):
+            for role in ('view', 'edit', 'custom', 'missing', None):
+                for print_none in (False, True):
+                    container = Container(i)
+                    self.assertEqual(
+                        dumps(export(Container, container, export_loop, role, print_none)),
+                        dumps(export(Container, container, EXPORT_LOOP, role, print_none))
+                    )
+
+        container = Container(data)
+        self.assertEqual(export(Container, container, export_loop, 'edit'), {
+            'title': u'title',
+            'items': [{'title': u'item'}],
+        })
+        view = export(Container, container, export_loop, 'view')
+        self.assertNotIn('secret', view)
+        self.assertEqual(view['computed'], 2)
+        self.assertEqual(view['items'][0], {'id': u'1', 'title': u'item', 'value': {'amount': 1, 'currency': None}, 'count': 1})
+        self.assertIsNotNone(SERIALIZERS[(Container, 'view')])
+        self.assertIsNotNone(SERIALIZERS[(Item, 'view')])
+        # models other than the ones of openprocurement are left to schematics
+        self.assertNotIn((Value, 'view'), SERIALIZERS)
+
+        # roles filtering by values aren't compiled
+        self.assertIsNone(SERIALIZERS[(Container, 'custom')])
+
+        # fields skipped by the role aren't got
+        self.assertEqual(export(Secret, Secret({'title': u'title'}), export_loop, 'view'), {'title': u'title'})
+
+        with self.assertRaises(ValueError):
+            export_loop(Container, container, None, role='missing', raise_error_on_role=True)
+
+        SERIALIZERS.clear()
+        compile_serializers([Container])
+        self.assertIn((Item, 'view'), SERIALIZERS)
+        self.assertIn((Item, 'custom'), SERIALIZERS)
+        self.assertNotIn((Value, 'edit'), SERIALIZERS)
+
+
+class FixtureAuctionsSerializersTest(unittest.TestCase):
+
+    def test_fixture_auctions(self):
+        def export(auction, role, compiled):
+            with patch('schematics.transforms.export_loop', EXPORT_LOOP), \
+                    patch('schematics.types.compound.export_loop', EXPORT_LOOP):
+                if compiled:
+                    install_serializers()
+                return dumps(auction.to_primitive(role=role))
+
+        SERIALIZERS.clear()
+        roles = [None] + sorted(FixtureAuction._options.roles)
+        for data in fixture_auctions():
+            for role in roles:
+                auction = FixtureAuction(deepcopy(data))
+                self.assertEqual(export(auction, role, True), export(auction, role, False), (data['status'], role))
+        view = loads(export(FixtureAuction(fixture_auctions()[-1]), 'view', True))
+        for name in ('bids', 'awards', 'contracts', 'documents', 'complaints'):
+            self.assertTrue(view[name])
+        self.assertTrue(view['awards'][0]['documents'])
+        self.assertTrue(view['awards'][0]['complaints'])
+        self.assertIsNotNone(SERIALIZERS[(FixtureAuction, 'view')])
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(CompiledSerializersTest))
+    suite.addTest(unittest.makeSuite(FixtureAuctionsSerializersTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from schematics.models import Model as SchematicsModel
+from schematics.types import StringType
+from schematics.types.compound import ListType as SchematicsListType, ModelType
+
+from openprocurement.auctions.core.traversal import get_items_by_id
+
+
+class ItemsByIdTest(unittest.TestCase):
+
+    def test_items_by_id(self):
+        class Item(SchematicsModel):
+            id = StringType()
+
+        class Container(SchematicsModel):
+            items = SchematicsListType(ModelType(Item), default=list())
+
+        doc = Container({'items': [{'id': u'a'}, {'id': u'b'}, {'id': u'a'}]})
+        items = get_items_by_id(doc, 'items', u'a')
+        self.assertEqual(len(items), 2)
+        self.assertIs(items[-1], doc.items[2])
+        self.assertIs(get_items_by_id(doc, 'items', u'b')[0], doc.items[1])
+        self.assertEqual(get_items_by_id(doc, 'items', u'c'), [])
+        self.assertEqual(get_items_by_id(doc, 'missing', u'a'), [])
+
+        # the index is built once while the list doesn't change
+        doc = Container({'items': [{'id': u'a'}, {'id': u'b'}]})
+        get_items_by_id(doc, 'items', u'a')
+        index = doc._id_indexes['items'][2]
+        get_items_by_id(doc, 'items', u'b')
+        self.assertIs(doc._id_indexes['items'][2], index)
+
+        doc.items.append(Item({'id': u'a'}))
+        self.assertEqual(len(get_items_by_id(doc, 'items', u'a')), 2)
+        doc.items.pop(0)
+        doc.items.append(Item({'id': u'c'}))
+        self.assertEqual(get_items_by_id(doc, 'items', u'b'), [doc.items[0]])
+        self.assertEqual(get_items_by_id(doc, 'items', u'c'), [doc.items[2]])
+        doc.items[0].id = u'd'
+        self.assertEqual(get_items_by_id(doc, 'items', u'd'), [doc.items[0]])
+        self.assertEqual(get_items_by_id(doc, 'items', u'b'), [])
+        doc.items = [Item({'id': u'e'})]
+        self.assertEqual(get_items_by_id(doc, 'items', u'e'), [doc.items[0]])
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ItemsByIdTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from cornice.errors import Errors
+from couchdb.http import ResourceConflict, ResourceNotFound
+from mock import MagicMock, patch
+from munch import Munch
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.interfaces import IRequest
+from pyramid.registry import Registry
+from pyramid.request import Request, apply_request_extensions
+from schematics.models import Model as SchematicsModel
+from schematics.transforms import blacklist, whitelist
+from schematics.types import StringType
+from schematics.types.compound import ListType as SchematicsListType, ModelType
+from schematics.types.serializable import serializable
+from webob.etag import ETagMatcher
+from zope.interface import Interface, implementer
+
+from openprocurement.api.interfaces import IContentConfigurator
+from openprocurement.api.utils import ROUTE_PREFIX, get_now
+
+from openprocurement.auctions.core.constants import (
+    AUCTION_ID_LEASE_ATTEMPTS,
+    ETAG_UNSTABLE_STATUSES
+)
+from openprocurement.auctions.core.interfaces import IAuction
+from openprocurement.auctions.core.models import Auction
+from openprocurement.auctions.core.tests.base import BaseWebTest, test_procuringEntity
+from openprocurement.auctions.core.traversal import factory
+from openprocurement.auctions.core.utils import (
+    AUCTION_ID_LEASES,
+    RAW_LISTING_FIELDS,
+    apply_patch,
+    auction_etag_view,
+    auction_serialize,
+    awardingTypePredicate,
+    build_route_dispatch,
+    extract_auction_adapter,
+    generate_auction_id,
+    get_auction_etag,
+    get_auction_route_dispatch,
+    get_partial_auction_doc,
+    get_partial_fetch_fields,
+    isAuction,
+    replay_on_conflict,
+    save_auction
+)
+
+
+class AuctionIdLeasesTest(BaseWebTest):
+
+    def test_auction_id_leases(self):
+        now = datetime(2018, 1, 1, 12)
+        AUCTION_ID_LEASES.clear()
+        auction_ids = [generate_auction_id(now, self.db, '', 3) for i in range(4)]
+        self.assertEqual([i[-6:] for i in auction_ids], ['000001', '000002', '000003', '000004'])
+        self.assertEqual(self.db.get('auctionID')['2018-01-01'], 7)
+        self.assertTrue(generate_auction_id(now, self.db, '1', 3).endswith('-000001-1'))
+        self.assertEqual(self.db.get('auctionID_1')['2018-01-01'], 4)
+        self.assertTrue(generate_auction_id(now + timedelta(days=1), self.db, '', 3).endswith('-01-02-000001'))
+        with patch('openprocurement.auctions.core.utils.getpid', return_value=-1):
+            self.assertTrue(generate_auction_id(now + timedelta(days=1), self.db, '', 3).endswith('-01-02-000004'))
+
+        save = self.db.save
+        conflict = ResourceConflict(('conflict', 'Document update conflict.'))
+        conflicts = [conflict, conflict]
+
+        def save_with_conflicts(doc):
+            if conflicts:
+                raise conflicts.pop()
+            return save(doc)
+
+        AUCTION_ID_LEASES.clear()
+        with patch.object(self.db, 'save', side_effect=save_with_conflicts):
+            self.assertTrue(generate_auction_id(now, self.db, '', 3).endswith('-000007'))
+            AUCTION_ID_LEASES.clear()
+            conflicts.extend([conflict] * AUCTION_ID_LEASE_ATTEMPTS)
+            with self.assertRaises(ResourceConflict):
+                generate_auction_id(now, self.db, '', 3)
+        self.assertEqual(self.db.get('auctionID')['2018-01-01'], 10)
+
+
+class ConflictReplayTest(unittest.TestCase):
+
+    def test_auction_conflict_replay(self):
+        conflict = ResourceConflict(('conflict', 'Document update conflict.'))
+
+        class Revisions(list):
+            model_class = dict
+
+        class StoredAuction(object):
+            id = uuid4().hex
+            rev = u'1-a'
+            mode = None
+            dateModified = None
+            revisions = Revisions()
+
+            def __init__(self, conflicts):
+                self.revisions = []
+                self.conflicts = conflicts
+
+            def store(self, db):
+                if self.conflicts:
+                    raise conflict
+
+        class View(object):
+
+            def __init__(self, request):
+                self.request = request
+                self.context = None
+                self.calls = 0
+
+            @replay_on_conflict
+            def patch(self):
+                self.calls += 1
+                if save_auction(self.request):
+                    return {'data': self.calls}
+
+            def post(self):
+                return save_auction(self.request)
+
+        def refetch(request):
+            request.validated['auction'] = StoredAuction(request.refetched_conflicts)
+            return request.validated['auction']
+
+        with patch('openprocurement.auctions.core.utils.context_unpack'), \
+                patch('openprocurement.auctions.core.utils.update_logging_context') as update_logging_context, \
+                patch('openprocurement.auctions.core.utils.factory', side_effect=refetch) as factory, \
+                patch('openprocurement.auctions.core.utils.get_auction_revision_changes',
+                      return_value=[{'op': 'remove', 'path': '/title'}]):
+            # replayed once after a conflict
+            request = MagicMock(validated={'auction_src': {}, 'auction': StoredAuction(True)}, refetched_conflicts=False)
+            request.registry.conflict_replay_attempts = 3
+            request.registry.revisions_chunk_size = 0
+            view = View(request)
+            self.assertEqual(view.patch(), {'data': 2})
+            self.assertEqual(factory.call_count, 1)
+            self.assertEqual(request.validated['auction_conflicts'], 1)
+            update_logging_context.assert_any_call(request, {'AUCTION_REPLAYS': 1})
+
+            # replays are exhausted
+            request = MagicMock(validated={'auction_src': {}, 'auction': StoredAuction(True)}, refetched_conflicts=True)
+            request.registry.conflict_replay_attempts = 2
+            request.registry.revisions_chunk_size = 0
+            view = View(request)
+            self.assertIsNone(view.patch())
+            self.assertEqual(view.calls, 3)
+            self.assertEqual(request.errors.status, 409)
+            update_logging_context.assert_any_call(request, {'AUCTION_CONFLICTS': 3})
+
+            # views not opted in aren't replayed
+            factory.reset_mock()
+            request = MagicMock(validated={'auction_src': {}, 'auction': StoredAuction(True)})
+            request.registry.revisions_chunk_size = 0
+            self.assertIsNone(View(request).post())
+            self.assertEqual(request.errors.status, 409)
+            self.assertFalse(factory.called)
+
+
+class ConflictReplayDatabaseTest(BaseWebTest):
+
+    def setUp(self):
+        super(ConflictReplayDatabaseTest, self).setUp()
+
+        class IReplayAuction(IAuction):
+            pass
+
+        @implementer(IReplayAuction)
+        class ReplayAuction(Auction):
+            _procedure_type = 'replayAuction'
+            procurementMethodType = StringType(default='replayAuction')
+
+        registry = self.app.app.registry
+        registry.pmtConfigurator['replayAuction'] = ReplayAuction._procedure_type
+        registry.auction_procurementMethodTypes['replayAuction'] = ReplayAuction
+        self.replay_attempts = registry.conflict_replay_attempts
+
+        now = get_now()
+        self.auction = {
+            '_id': uuid4().hex,
+            'doc_type': 'Auction',
+            'procurementMethodType': 'replayAuction',
+            'title': u'title',
+            'procuringEntity': test_procuringEntity,
+            'value': {'amount': 100, 'currency': u'UAH'},
+            'minimalStep': {'amount': 35, 'currency': u'UAH'},
+            'enquiryPeriod': {'startDate': now.isoformat(), 'endDate': (now + timedelta(days=7)).isoformat()},
+            'tenderPeriod': {'startDate': now.isoformat(), 'endDate': (now + timedelta(days=14)).isoformat()},
+            'status': 'active.tendering',
+        }
+        self.db.save(self.auction)
+
+    def tearDown(self):
+        registry = self.app.app.registry
+        registry.conflict_replay_attempts = self.replay_attempts
+        registry.auction_procurementMethodTypes.pop('replayAuction')
+        registry.pmtConfigurator.pop('replayAuction')
+        super(ConflictReplayDatabaseTest, self).tearDown()
+
+    def patch_auction(self, data, concurrent_writes):
+        """Run a view opted in for conflict replay, which patches the auction
+        with the data after another writer changed the stored document
+        `concurrent_writes` times, once on each run.
+        """
+        db = self.db
+
+        class View(object):
+
+            def __init__(self, request):
+                self.request = request
+                self.context = request.context
+                self.calls = 0
+
+            @replay_on_conflict
+            def patch(self):
+                self.calls += 1
+                if self.calls <= concurrent_writes:
+                    doc = db.get(self.context.id)
+                    doc['description'] = u'description {}'.format(self.calls)
+                    db.save(doc)
+                if apply_patch(self.request, src=self.request.validated['auction_src']):
+                    return {'data': self.context.serialize('view')}
+
+        request = Request.blank('{}/auctions/{}'.format(ROUTE_PREFIX, self.auction['_id']), method='PATCH')
+        request.registry = self.app.app.registry
+        apply_request_extensions(request)
+        request.matchdict = {'auction_id': self.auction['_id']}
+        request.validated = {'data': data}
+        request.errors = Errors()
+        request.context = factory(request)
+        view = View(request)
+        return view, request, view.patch()
+
+    def test_conflict_replay(self):
+        self.app.app.registry.conflict_replay_attempts = 2
+        view, request, result = self.patch_auction({'title': u'new title'}, 1)
+        self.assertEqual(view.calls, 2)
+        self.assertFalse(request.errors)
+        self.assertEqual(result['data']['title'], u'new title')
+        self.assertEqual(result['data']['description'], u'description 1')
+
+        # the patch is applied to the document written concurrently
+        doc = self.db.get(self.auction['_id'])
+        self.assertEqual(doc['title'], u'new title')
+        self.assertEqual(doc['description'], u'description 1')
+        self.assertEqual(len(doc['revisions']), 1)
+        paths = [i['path'] for i in doc['revisions'][0]['changes']]
+        self.assertIn('/title', paths)
+        self.assertNotIn('/description', paths)
+
+    def test_conflict_replays_exhausted(self):
+        self.app.app.registry.conflict_replay_attempts = 2
+        view, request, result = self.patch_auction({'title': u'new title'}, 3)
+        self.assertIsNone(result)
+        self.assertEqual(view.calls, 3)
+        self.assertEqual(request.errors.status, 409)
+        self.assertEqual(request.validated['auction_conflicts'], 3)
+
+        doc = self.db.get(self.auction['_id'])
+        self.assertEqual(doc['title'], u'title')
+        self.assertEqual(doc['description'], u'description 3')
+        self.assertNotIn('revisions', doc)
+
+
+class AuctionETagTest(unittest.TestCase):
+
+    def test_auction_etag(self):
+        def etag_request(principals=('system.Everyone', 'g:brokers'), path_qs=u'/api/2.5/auctions/1',
+                         if_none_match=(), rev=u'1-a', status=u'active.qualification'):
+            request = MagicMock(path_qs=path_qs, effective_principals=list(principals),
+                                if_none_match=ETagMatcher(list(if_none_match)), method='GET', exception=None)
+            request.registry.docservice_url = u'http://localhost'
+            request.response.headers = {}
+            request.validated = {'auction': Munch(rev=rev, status=status)}
+            return request
+
+        etag = get_auction_etag(etag_request(), u'1-a')
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, get_auction_etag(etag_request(principals=('g:brokers', 'system.Everyone')), u'1-a'))
+        self.assertNotEqual(etag, get_auction_etag(etag_request(), u'2-b'))
+        self.assertNotEqual(etag, get_auction_etag(etag_request(principals=('g:chronograph',)), u'1-a'))
+        self.assertNotEqual(etag, get_auction_etag(etag_request(path_qs=u'/api/2.5/auctions/1?opt_pretty=1'), u'1-a'))
+
+        view = MagicMock(return_value='response')
+        wrapper = auction_etag_view(view, None)
+        request = etag_request()
+        self.assertEqual(wrapper(None, request), 'response')
+        self.assertEqual(request.response.headers['ETag'], etag)
+
+        request = etag_request(if_none_match=[etag.strip('"')])
+        view.reset_mock()
+        response = wrapper(None, request)
+        self.assertIsInstance(response, HTTPNotModified)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertFalse(view.called)
+
+        request = etag_request(if_none_match=[etag.strip('"')], rev=u'2-b')
+        self.assertEqual(wrapper(None, request), 'response')
+        self.assertEqual(request.response.headers['ETag'], get_auction_etag(request, u'2-b'))
+
+        # neither errors nor other methods are answered with 304
+        request = etag_request(if_none_match=[etag.strip('"')])
+        request.exception = ResourceNotFound()
+        self.assertEqual(wrapper(None, request), 'response')
+        self.assertNotIn('ETag', request.response.headers)
+        request = etag_request(if_none_match=[etag.strip('"')])
+        request.method = 'PATCH'
+        self.assertEqual(wrapper(None, request), 'response')
+        self.assertNotIn('ETag', request.response.headers)
+
+        # representations changing with time get no ETag
+        self.assertIn('active.tendering', ETAG_UNSTABLE_STATUSES)
+        self.assertIn('active.auction', ETAG_UNSTABLE_STATUSES)
+        request = etag_request(if_none_match=[etag.strip('"')], status=u'active.tendering')
+        self.assertEqual(wrapper(None, request), 'response')
+        self.assertNotIn('ETag', request.response.headers)
+
+
+class ListingSerializeTest(unittest.TestCase):
+
+    def test_listing_serialize(self):
+        class Item(SchematicsModel):
+            id = StringType()
+
+        class ListedAuction(SchematicsModel):
+            class Options:
+                serialize_when_none = False
+                roles = {
+                    'active.tendering': blacklist('owner', '_id'),
+                    'complete': whitelist('status', 'doc_id'),
+                }
+
+            _id = StringType()
+            status = StringType()
+            title = StringType()
+            owner = StringType()
+            mode = StringType(default=u'real')
+            items = SchematicsListType(ModelType(Item), default=list())
+
+            @serializable(serialized_name='id')
+            def doc_id(self):
+                return self._id
+
+            @serializable
+            def numberOfItems(self):
+                return len(self.items)
+
+        def listing_request(model=ListedAuction):
+            request = Munch(context=None)
+            request.auction_from_data = MagicMock(return_value=model)
+            return request
+
+        def assert_same_as_model(data, fields):
+            auction = ListedAuction(data)
+            expected = dict([(i, j) for i, j in auction.serialize(auction.status).items() if i in fields])
+            self.assertEqual(auction_serialize(listing_request(), data, fields), expected)
+
+        RAW_LISTING_FIELDS.clear()
+        data = {
+            '_id': u'1',
+            'status': u'active.tendering',
+            'title': u'title',
+            'owner': u'broker',
+            'mode': u'test',
+            'items': [{'id': u'a'}],
+        }
+        fields = set(['id', 'title', 'owner', 'mode'])
+        self.assertEqual(auction_serialize(listing_request(), data, fields), {'id': u'1', 'title': u'title', 'mode': u'test'})
+        assert_same_as_model(data, fields)
+
+        # fields are filtered by the role of the status
+        complete = dict(data, status=u'complete')
+        self.assertEqual(auction_serialize(listing_request(), complete, set(['id', 'title', 'status'])),
+                         {'id': u'1', 'status': u'complete'})
+        assert_same_as_model(complete, set(['id', 'title', 'status']))
+
+        missing = dict(data)
+        del missing['title']
+        assert_same_as_model(missing, set(['id', 'title']))
+
+        default = dict(data)
+        del default['mode']
+        self.assertEqual(auction_serialize(listing_request(), default, set(['id', 'mode'])), {'id': u'1', 'mode': u'real'})
+
+        # computed and compound fields are serialized with the model
+        assert_same_as_model(data, set(['id', 'numberOfItems']))
+        assert_same_as_model(data, set(['id', 'items']))
+
+        unknown = dict(data, procurementMethodType=u'unknown', dateModified=u'2018-01-01T00:00:00+02:00', id=u'1')
+        self.assertEqual(auction_serialize(listing_request(None), unknown, set(['id', 'title'])), {
+            'procurementMethodType': u'unknown',
+            'dateModified': u'2018-01-01T00:00:00+02:00',
+            'id': u'1',
+        })
+
+
+class RouteDispatchTest(unittest.TestCase):
+
+    def test_auction_route_dispatch(self):
+        class IFlashAuction(Interface):
+            pass
+
+        @implementer(IFlashAuction)
+        class FlashAuction(object):
+            _procedure_type = 'flash'
+            procurementMethodType = 'belowThreshold'
+
+        class FlashConfigurator(object):
+            awarding_type = 'awarding_1_0'
+
+        registry = Registry()
+        registry.auction_procurementMethodTypes = {'belowThreshold': FlashAuction}
+        registry.pmtConfigurator = {'belowThreshold': 'flash'}
+        registry.auction_route_dispatch = {}
+        registry.registerAdapter(FlashConfigurator, (IFlashAuction, IRequest), IContentConfigurator)
+
+        def dispatch_request(auction):
+            request = MagicMock(registry=registry, auction=auction)
+            request.auction_route_dispatch = get_auction_route_dispatch(request)
+            return request
+
+        build_route_dispatch(MagicMock(app=MagicMock(registry=registry)))
+        self.assertEqual(registry.auction_route_dispatch, {'belowThreshold': ('flash', 'awarding_1_0')})
+
+        request = dispatch_request(FlashAuction())
+        self.assertTrue(isAuction('flash', None)(None, request))
+        self.assertFalse(isAuction('dgf', None)(None, request))
+        self.assertTrue(awardingTypePredicate('awarding_1_0', None)(None, request))
+        self.assertFalse(awardingTypePredicate('awarding_2_0', None)(None, request))
+
+        request = dispatch_request(None)
+        self.assertFalse(isAuction('flash', None)(None, request))
+        self.assertFalse(awardingTypePredicate('awarding_1_0', None)(None, request))
+
+        auction = FlashAuction()
+        auction.procurementMethodType = 'unknown'
+        request = dispatch_request(auction)
+        self.assertEqual(request.auction_route_dispatch, (None, None))
+        self.assertFalse(awardingTypePredicate('awarding_1_0', None)(None, request))
+
+
+class PartialFetchTest(BaseWebTest):
+
+    def test_partial_fetch(self):
+        def partial_request(method='GET', partial_fetch=1):
+            return MagicMock(method=method, registry=MagicMock(partial_fetch=partial_fetch))
+
+        parts = '/api/2.5/auctions/{}/questions/{}'.format('a' * 32, 'b' * 32).split('/')
+        self.assertEqual(get_partial_fetch_fields(partial_request(), parts), ['questions'])
+        self.assertIsNone(get_partial_fetch_fields(partial_request(method='PATCH'), parts))
+        self.assertIsNone(get_partial_fetch_fields(partial_request(partial_fetch=0), parts))
+        parts = '/api/2.5/auctions/{}/bids/{}'.format('a' * 32, 'b' * 32).split('/')
+        self.assertIsNone(get_partial_fetch_fields(partial_request(), parts))
+        parts = '/api/2.5/auctions/{}'.format('a' * 32).split('/')
+        self.assertIsNone(get_partial_fetch_fields(partial_request(), parts))
+
+        # the show function is synced with the views by the API
+        self.assertIn('partial', self.db.get('_design/auctions')['shows'])
+
+        auction_id = uuid4().hex
+        self.db.save({
+            '_id': auction_id, 'doc_type': 'Auction', 'status': 'active.tendering', 'owner': 'broker',
+            'title': u'title', 'questions': [{'id': 'a' * 32}], 'bids': [{'id': 'b' * 32}],
+        })
+        doc = get_partial_auction_doc(self.db, auction_id, ['questions'])
+        self.assertEqual(doc['questions'], [{'id': 'a' * 32}])
+        self.assertEqual(doc['owner'], 'broker')
+        self.assertNotIn('title', doc)
+        self.assertNotIn('bids', doc)
+
+        class StoredAuction(dict):
+            pass
+
+        # the whole document isn't got when the partial one is
+        request = MagicMock()
+        request.registry.db = MagicMock(wraps=self.db)
+        request.auction_from_data.side_effect = lambda data, lazy=False: StoredAuction(data)
+        auction = extract_auction_adapter(request, auction_id, True, ['questions'])
+        self.assertEqual(auction, doc)
+        self.assertEqual(auction.partial_fields, ['questions'])
+        self.assertFalse(request.registry.db.get.called)
+        auction = extract_auction_adapter(request, auction_id, True)
+        self.assertEqual(auction['title'], u'title')
+        self.assertFalse(hasattr(auction, 'partial_fields'))
+        self.assertTrue(request.registry.db.get.called)
+
+        db = MagicMock()
+        db.show.side_effect = ResourceNotFound(('not_found', 'missing_named_show'))
+        self.assertIsNone(get_partial_auction_doc(db, auction_id, ['questions']))
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(AuctionIdLeasesTest))
+    suite.addTest(unittest.makeSuite(ConflictReplayTest))
+    suite.addTest(unittest.makeSuite(ConflictReplayDatabaseTest))
+    suite.addTest(unittest.makeSuite(AuctionETagTest))
+    suite.addTest(unittest.makeSuite(ListingSerializeTest))
+    suite.addTest(unittest.makeSuite(RouteDispatchTest))
+    suite.addTest(unittest.makeSuite(PartialFetchTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from itertools import chain
 
 from pyramid.security import (
     ALL_PERMISSIONS,
@@ -7,6 +8,8 @@ from pyramid.security import (
     Everyone,
 )
 
+from openprocurement.auctions.core.serializers import export_fields
+
 
 class Root(object):
     __name__ = None
@@ -37,6 +40,7 @@ class Root(object):
         (Allow, 'g:Administrator', 'edit_tender'),
         (Allow, 'g:Administrator', 'edit_auction_award'),
         (Allow, 'g:Administrator', 'edit_bid'),
+        (Allow, 'g:Administrator', 'view_auction_revisions'),
         (Allow, 'g:admins', ALL_PERMISSIONS),
     ]
 
@@ -45,9 +49,37 @@ class Root(object):
         self.db = request.registry.db
 
 
+def build_id_index(items):
+    index = {}
+    for position, item in enumerate(items):
+        index.setdefault(item.id, []).append(position)
+    return index
+
+
+def get_items_by_id(parent, name, item_id):
+    """Items of the list field `name` of `parent` with the id, in list order.
+
+    Positions of items by id are indexed on the parent on first lookup. The
+    index is rebuilt when the list is replaced, items are appended to or
+    removed from it, or found positions don't hold items with the id anymore,
+    so a lookup takes constant time while the list stays the same.
+    """
+    items = getattr(parent, name, None) or []
+    indexes = parent.__dict__.setdefault('_id_indexes', {})
+    cached = indexes.get(name)
+    if cached and cached[0] is items and cached[1] == len(items):
+        positions = cached[2].get(item_id, [])
+        found = [items[i] for i in positions]
+        if found and all([i.id == item_id for i in found]):
+            return found
+    index = build_id_index(items)
+    indexes[name] = (items, len(items), index)
+    return [items[i] for i in index.get(item_id, [])]
+
+
 def get_item(parent, key, request):
     request.validated['{}_id'.format(key)] = request.matchdict['{}_id'.format(key)]
-    items = [i for i in getattr(parent, '{}s'.format(key), []) if i.id == request.matchdict['{}_id'.format(key)]]
+    items = get_items_by_id(parent, '{}s'.format(key), request.matchdict['{}_id'.format(key)])
     if not items:
         from openprocurement.auctions.core.utils import error_handler
         request.errors.add('url', '{}_id'.format(key), 'Not Found')
@@ -63,6 +95,47 @@ def get_item(parent, key, request):
         return item
 
 
+class AuctionSnapshot(object):
+    """State of the auction as it was loaded, the diff baseline of a request.
+
+    The document the auction was loaded from is run through the model and
+    serialized with `plain` role, so values match the ones the auction gave
+    before any change. Only requested fields are serialized, lists of the
+    others aren't even converted. Stored `next_check` is used as it is.
+    """
+
+    def __init__(self, auction):
+        self.auction = auction
+        self.baseline = None
+
+    def get_baseline(self):
+        if self.baseline is None:
+            model = type(self.auction)
+            doc = self.auction._initial
+            self.baseline = model.lazy(doc) if hasattr(model, 'lazy') else model(doc)
+            self.baseline.__parent__ = getattr(self.auction, '__parent__', None)
+        return self.baseline
+
+    def get_names(self, keys):
+        """Names of fields of the auction serialized to `keys`"""
+        model = type(self.auction)
+        return [
+            name for name, field in chain(model._fields.items(), model._serializables.items())
+            if (field.serialized_name or name) in keys
+        ]
+
+    def serialize(self, names=None):
+        model = type(self.auction)
+        names = set(chain(model._fields, model._serializables) if names is None else names)
+        next_check = self.auction._initial.get('next_check') if 'next_check' in names else None
+        if next_check:
+            names.discard('next_check')
+        data = export_fields(self.get_baseline(), 'plain', names)
+        if next_check:
+            data['next_check'] = next_check
+        return data
+
+
 def factory(request):
 
     request.validated['auction_src'] = {}
@@ -75,9 +148,9 @@ def factory(request):
     request.validated['auction'] = request.validated['db_doc'] = auction
     request.validated['auction_status'] = auction.status
     if request.method != 'GET':
-        request.validated['auction_src'] = auction.serialize('plain')
-        if auction._initial.get('next_check'):
-            request.validated['auction_src']['next_check'] = auction._initial.get('next_check')
+        request.validated['auction_src'] = AuctionSnapshot(auction)
+        if hasattr(auction, 'start_tracking'):
+            auction.start_tracking()
     #  Award branch
     if request.matchdict.get('award_id'):
         award = get_item(auction, 'award', request)
@@ -2,17 +2,26 @@
 from collections import Mapping
 from datetime import datetime, time, timedelta
 from functools import partial, wraps
+from itertools import chain
+from hashlib import sha1
+from json import loads
 from logging import getLogger
+from os import getpid
 from re import compile as re_compile
-from time import sleep
+from threading import Lock
 
-from couchdb.http import ResourceConflict
+from couchdb.http import ResourceConflict, ResourceNotFound
 from jsonpointer import resolve_pointer
 from cornice.resource import resource
 from pkg_resources import get_distribution
 from pyramid.compat import decode_path_info
 from pyramid.exceptions import URLDecodeError
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.interfaces import IRequest
 from schematics.exceptions import ModelValidationError
+from schematics.transforms import allow_none, wholelist
+from schematics.types import BooleanType, IntType, StringType
+from zope.interface import implementedBy
 
 from openprocurement.api.constants import (
     TZ, SANDBOX_MODE,
@@ -20,7 +29,8 @@ from openprocurement.api.constants import (
     DOCUMENT_BLACKLISTED_FIELDS as API_DOCUMENT_BLACKLISTED_FIELDS,
     SESSION,  # noqa forwarded import
 )
-from openprocurement.api.interfaces import IProjectConfigurator
+from openprocurement.api.interfaces import IContentConfigurator, IProjectConfigurator
+from openprocurement.api.models.auction_models import IsoDateTimeType
 from openprocurement.api.validation import error_handler
 from openprocurement.api.utils import (
     get_now,
@@ -40,13 +50,24 @@ from openprocurement.api.utils import (
 )
 
 from openprocurement.auctions.core.constants import (
+    AUCTION_ID_LEASE_ATTEMPTS,
+    COMPUTED_DEPENDENCIES,
+    COMPUTED_SUBTREES,
     DOCUMENT_TYPE_URL_ONLY,
-    DOCUMENT_TYPE_OFFLINE
+    DOCUMENT_TYPE_OFFLINE,
+    REVISIONS_CHUNK_SIZE,
+    CONFLICT_REPLAY_ATTEMPTS,
+    ETAG_UNSTABLE_STATUSES,
+    PARTIAL_FETCH_FIELDS,
+    PARTIAL_FETCH_SUBTREES,
 )
+from openprocurement.auctions.core.design import add_listing_projections
 from openprocurement.auctions.core.interfaces import IAuction
+from openprocurement.auctions.core.revisions import move_revisions_to_chunks
+from openprocurement.auctions.core.serializers import export_fields
 from openprocurement.auctions.core.plugins.awarding import includeme as awarding
 from openprocurement.auctions.core.plugins.contracting import includeme as contracting
-from openprocurement.auctions.core.traversal import factory
+from openprocurement.auctions.core.traversal import AuctionSnapshot, factory
 from openprocurement.auctions.core.configurator import project_configurator
 
 
@@ -58,6 +79,11 @@ VERSION = '{}.{}'.format(
     int(PKG.parsed_version[1]) if PKG.parsed_version[1].isdigit() else 0
 )
 ROUTE_PREFIX = '/api/{}'.format(VERSION)
+AUCTION_ID_LEASES = {}
+AUCTION_ID_LOCK = Lock()
+# types of fields with equal values in the document and the serialized model
+RAW_LISTING_TYPES = (BooleanType, IntType, StringType, IsoDateTimeType)
+RAW_LISTING_FIELDS = {}
 DOCUMENT_BLACKLISTED_FIELDS = (
     'title',
     'format',
@@ -78,36 +104,56 @@ class awardingTypePredicate(object):
     phash = text
 
     def __call__(self, context, request):
-        if request.auction is not None:
-            procurement_method_type = getattr(
-                request.auction,
-                'procurementMethodType',
-                None
-            )
-            if not procurement_method_type:
-                return False
+        dispatch = request.auction_route_dispatch
+        return dispatch is not None and dispatch[1] == self.val
 
-            desirable_awarding_version = request.content_configurator.awarding_type
-            return desirable_awarding_version == self.val
 
-        return False
+def lease_auction_ids(db, auctionIDdoc, key, block_size):
+    """Reserve `block_size` consecutive daily indices with one write.
 
-
-def generate_auction_id(ctime, db, server_id=''):
-    key = ctime.date().isoformat()
-    auctionIDdoc = 'auctionID_' + server_id if server_id else 'auctionID'
-    while True:
+    Returns the first index of the block. The write is retried on conflicts
+    up to AUCTION_ID_LEASE_ATTEMPTS times.
+    """
+    for attempt in range(AUCTION_ID_LEASE_ATTEMPTS):
+        auctionID = db.get(auctionIDdoc, {'_id': auctionIDdoc})
+        index = auctionID.get(key, 1)
+        auctionID[key] = index + block_size
         try:
-            auctionID = db.get(auctionIDdoc, {'_id': auctionIDdoc})
-            index = auctionID.get(key, 1)
-            auctionID[key] = index + 1
             db.save(auctionID)
-        except ResourceConflict:  # pragma: no cover
-            pass
-        except Exception:  # pragma: no cover
-            sleep(1)
+        except ResourceConflict:
+            if attempt + 1 == AUCTION_ID_LEASE_ATTEMPTS:
+                raise
         else:
-            break
+            return index
+
+
+def generate_auction_id(ctime, db, server_id='', block_size=1):
+    """Generate auctionID from the block of indices leased by this process.
+
+    Unused indices of a block are skipped: when the process exits, on the
+    next day or in a forked process, which gets a block of its own.
+    """
+    key = ctime.date().isoformat()
+    auctionIDdoc = 'auctionID_' + server_id if server_id else 'auctionID'
+    with AUCTION_ID_LOCK:
+        lease = AUCTION_ID_LEASES.get((db.name, auctionIDdoc))
+        if not lease or lease[:2] != [getpid(), key] or lease[2] >= lease[3]:
+            index = lease_auction_ids(db, auctionIDdoc, key, block_size)
+            lease = AUCTION_ID_LEASES[(db.name, auctionIDdoc)] = [getpid(), key, index, index + block_size]
+        index = lease[2]
+        lease[2] += 1
+    return format_auction_id(ctime, index, server_id)
+
+
+def generate_auction_ids(ctime, db, server_id, count):
+    """Generate `count` consecutive auctionIDs with one counter update"""
+    key = ctime.date().isoformat()
+    auctionIDdoc = 'auctionID_' + server_id if server_id else 'auctionID'
+    index = lease_auction_ids(db, auctionIDdoc, key, count)
+    return [format_auction_id(ctime, i, server_id) for i in range(index, index + count)]
+
+
+def format_auction_id(ctime, index, server_id=''):
     return project_configurator.AUCTION_PREFIX + '-{:04}-{:02}-{:02}-{:06}{}'.format(
         ctime.year,
         ctime.month,
@@ -117,20 +163,116 @@ def generate_auction_id(ctime, db, server_id=''):
     )
 
 
+def get_raw_listing_fields(model, role):
+    """Fields of `model` serialized with `role`, which can be taken from
+    the document as is, mapped to their keys in the document and fields.
+    """
+    key = (model, role)
+    if key not in RAW_LISTING_FIELDS:
+        roles = model._options.roles
+        gottago = roles.get(role, roles.get('default', wholelist()))
+        fields = {}
+        for name, field in model._fields.items():
+            if isinstance(field, RAW_LISTING_TYPES) and not gottago(name, None):
+                serialized_name = field.serialized_name or name
+                fields[serialized_name] = (serialized_name, field)
+        if 'doc_id' in model._serializables and not gottago('doc_id', None):
+            fields[model._serializables['doc_id'].serialized_name or 'doc_id'] = ('_id', None)
+        RAW_LISTING_FIELDS[key] = fields
+    return RAW_LISTING_FIELDS[key]
+
+
 def auction_serialize(request, auction_data, fields):
-    auction = request.auction_from_data(auction_data, raise_error=False)
-    if auction is None:
+    model = request.auction_from_data(auction_data, raise_error=False, create=False)
+    if model is None:
         return dict([(i, auction_data.get(i, '')) for i in ['procurementMethodType', 'dateModified', 'id']])
+    status = auction_data.get('status')
+    raw_fields = get_raw_listing_fields(model, status) if status else {}
+    if not set(fields).difference(raw_fields):
+        # nothing computed is requested, so the model isn't needed
+        # unless a missing value has to be filled with a default
+        data = {}
+        for i in fields:
+            key, field = raw_fields[i]
+            value = auction_data.get(key)
+            if value is not None:
+                data[i] = value
+            elif field is not None and field._default is not None:
+                break
+            elif field is not None and allow_none(model, field):
+                data[i] = None
+        else:
+            return data
+    auction = model(auction_data)
     auction.__parent__ = request.context
     return dict([(i, j) for i, j in auction.serialize(auction.status).items() if i in fields])
 
 
-def save_auction(request):
+def get_auction_revision_changes(auction, src):
+    """Revision patch between the current state of the auction and `src`.
 
-    auction = request.validated['auction']
+    If the auction tracks its dirty fields, only they, computed fields and
+    COMPUTED_SUBTREES are serialized and diffed, as the rest can't
+    contribute any operation, unless any of COMPUTED_DEPENDENCIES is dirty.
+    """
+    dirty = auction.get_dirty_fields() if hasattr(auction, 'get_dirty_fields') else None
+    if dirty is None or dirty.intersection(COMPUTED_DEPENDENCIES):
+        if isinstance(src, AuctionSnapshot):
+            src = src.serialize()
+        return get_revision_changes(auction.serialize("plain"), src)
+    model = type(auction)
+    names = dirty.union(model._serializables, COMPUTED_SUBTREES)
+    dst = export_fields(auction, "plain", names)
+    if isinstance(src, AuctionSnapshot):
+        src = src.serialize(names)
+    else:
+        keys = set([j.serialized_name or i for i, j in chain(model._fields.items(), model._serializables.items())
+                    if i in names])
+        src = dict([(i, j) for i, j in src.items() if i in keys])
+    return get_revision_changes(dst, src)
+
+
+class AuctionConflictReplay(Exception):
+    """Raised by save_auction to re-run a view opted in for conflict replay"""
+
+
+def replay_on_conflict(view):
+    """Re-run the view if the auction was changed concurrently.
+
+    On conflict in save_auction the auction is fetched again, the context is
+    rebuilt and the view is run once more with the same validated data, up to
+    `conflict_replay_attempts` times. The view method has to be decorated
+    after `json_view`.
+    """
+    @wraps(view)
+    def wrapper(self):
+        request = self.request
+        replays = 0
+        request.validated['auction_replays_allowed'] = getattr(
+            request.registry, 'conflict_replay_attempts', CONFLICT_REPLAY_ATTEMPTS
+        )
+        while True:
+            try:
+                return view(self)
+            except AuctionConflictReplay:
+                replays += 1
+                update_logging_context(request, {'AUCTION_REPLAYS': replays})
+                LOGGER.info('Replaying request on auction conflict',
+                            extra=context_unpack(request, {'MESSAGE_ID': 'save_auction_conflict_replay'}))
+                request.__dict__.pop('auction', None)
+                self.context = request.context = factory(request)
+    return wrapper
+
+
+def add_auction_revision(request, auction, src):
+    """Append revision with changes of the auction made since `src`.
+
+    Also sets dates of changed statuses and dateModified of the auction.
+    Returns False if the auction wasn't changed.
+    """
     if auction.mode == u'test':
         set_modetest_titles(auction)
-    patch = get_revision_changes(auction.serialize("plain"), request.validated['auction_src'])
+    patch = get_auction_revision_changes(auction, src)
     if patch:
         now = get_now()
         status_changes = [
@@ -148,17 +290,34 @@ def save_auction(request):
                     patch.append({"op": "remove", "path": date_path})
                 obj.date = now
         auction.revisions.append(type(auction).revisions.model_class({'author': request.authenticated_userid, 'changes': patch, 'rev': auction.rev}))
-        old_dateModified = auction.dateModified
         if getattr(auction, 'modified', True):
             auction.dateModified = now
-        try:
+        return True
+    return False
+
 
+def save_auction(request):
+
+    auction = request.validated['auction']
+    old_dateModified = auction.dateModified
+    if hasattr(auction, 'pin_next_check'):
+        auction.pin_next_check()
+    if add_auction_revision(request, auction, request.validated['auction_src']):
+        try:
+            chunk_size = getattr(request.registry, 'revisions_chunk_size', REVISIONS_CHUNK_SIZE)
+            if chunk_size:
+                move_revisions_to_chunks(request.registry.db, auction, chunk_size)
             auction.store(request.registry.db)
         except ModelValidationError, e:
             for i in e.message:
                 request.errors.add('body', i, e.message[i])
             request.errors.status = 422
         except ResourceConflict, e:  # pragma: no cover
+            conflicts = request.validated.get('auction_conflicts', 0) + 1
+            request.validated['auction_conflicts'] = conflicts
+            update_logging_context(request, {'AUCTION_CONFLICTS': conflicts})
+            if conflicts <= request.validated.get('auction_replays_allowed', 0):
+                raise AuctionConflictReplay(str(e))
             request.errors.add('body', 'data', str(e))
             request.errors.status = 409
         except Exception, e:  # pragma: no cover
@@ -172,7 +331,12 @@ def save_auction(request):
 
 def apply_patch(request, data=None, save=True, src=None):
     data = request.validated['data'] if data is None else data
-    patch = data and apply_data_patch(src or request.context.serialize(), data)
+    if isinstance(src, AuctionSnapshot):
+        # only patched fields of the auction are needed
+        src = src.serialize(src.get_names(data)) if data else {}
+    elif data and not src:
+        src = request.context.serialize()
+    patch = data and apply_data_patch(src, data)
     if patch:
         request.context.import_data(patch)
         if save:
@@ -406,7 +570,7 @@ def get_procurement_method_types(registry, procedure_types):
     return procurement_method_types
 
 
-def auction_from_data(request, data, raise_error=True, create=True):
+def auction_from_data(request, data, raise_error=True, create=True, lazy=False):
     procurementMethodType = data.get('procurementMethodType')
     if not procurementMethodType:
         pmts = get_procurement_method_types(request.registry, ('belowThreshold',))
@@ -418,19 +582,49 @@ def auction_from_data(request, data, raise_error=True, create=True):
         raise error_handler(request)
     update_logging_context(request, {'auction_type': procurementMethodType})
     if model is not None and create:
-        model = model(data)
+        model = model.lazy(data) if lazy and hasattr(model, 'lazy') else model(data)
     return model
 
 
-def extract_auction_adapter(request, auction_id):
+def get_partial_auction_doc(db, auction_id, fields):
+    """Auction document with only `fields` and PARTIAL_FETCH_FIELDS
+    got with the `partial` show function.
+
+    Returns None if there's no such document or the show function isn't
+    synced yet, so the caller falls back to the whole document.
+    """
+    try:
+        headers, body = db.show('auctions/partial', auction_id, fields=','.join(PARTIAL_FETCH_FIELDS + tuple(fields)))
+    except ResourceNotFound:
+        return None
+    return loads(body.read())
+
+
+def get_partial_fetch_fields(request, parts):
+    """Auction fields needed by a read-only GET of the path split by slashes,
+    or None if it needs the whole document
+    """
+    if request.method != 'GET' or not getattr(request.registry, 'partial_fetch', 0):
+        return None
+    if len(parts) > 5 and parts[5] in PARTIAL_FETCH_SUBTREES:
+        return [parts[5]]
+
+
+def extract_auction_adapter(request, auction_id, lazy=False, fields=None):
     db = request.registry.db
-    doc = db.get(auction_id)
+    doc = fields and get_partial_auction_doc(db, auction_id, fields)
+    if not doc:
+        doc, fields = db.get(auction_id), None
     if doc is None or doc.get('doc_type') != 'Auction':
         request.errors.add('url', 'auction_id', 'Not Found')
         request.errors.status = 404
         raise error_handler(request)
 
-    return request.auction_from_data(doc)
+    auction = request.auction_from_data(doc, lazy=lazy)
+    if fields:
+        # the auction lacks its bids, see `get_auction_access`
+        auction.partial_fields = fields
+    return auction
 
 
 def extract_auction(request):
@@ -449,7 +643,79 @@ def extract_auction(request):
         return
 
     auction_id = parts[4]
-    return extract_auction_adapter(request, auction_id)
+    # sub-resource reads need only lists on the path to the resource
+    lazy = request.method == 'GET' and len(parts) > 5 and bool(parts[5])
+    return extract_auction_adapter(request, auction_id, lazy, get_partial_fetch_fields(request, parts))
+
+
+def get_auction_etag(request, rev):
+    """ETag of the response, which depends on the auction revision,
+    the requested representation and the principals asking for it.
+    """
+    key = u'\n'.join([
+        rev,
+        request.path_qs,
+        u' '.join(sorted(request.effective_principals)),
+        getattr(request.registry, 'docservice_url', None) or u'',
+    ])
+    return '"{}"'.format(sha1(key.encode('utf-8')).hexdigest())
+
+
+def auction_etag_view(view, info):
+    """View deriver, which gives GET responses of an auction and its
+    sub-resources an ETag and answers the matching If-None-Match ones
+    with 304 Not Modified.
+
+    It's run after the permission of the view is checked, by then the
+    auction is extracted by the traversal. Auctions in
+    ETAG_UNSTABLE_STATUSES get no ETag.
+    """
+    def wrapper(context, request):
+        auction = None
+        # exception views, like the ones of missing sub-resources, are left as is
+        if request.method == 'GET' and getattr(request, 'exception', None) is None:
+            auction = getattr(request, 'validated', {}).get('auction')
+        if auction is None or not auction.rev or auction.status in ETAG_UNSTABLE_STATUSES:
+            return view(context, request)
+        etag = get_auction_etag(request, auction.rev)
+        if request.if_none_match and etag.strip('"') in request.if_none_match:
+            return HTTPNotModified(headers={'ETag': etag})
+        request.response.headers['ETag'] = etag
+        return view(context, request)
+    return wrapper
+
+
+def get_route_dispatch(registry, pmt):
+    """Procedure type and awarding type of auctions of the procurementMethodType,
+    which route predicates are checked against.
+
+    Values are kept in the `auction_route_dispatch` table of the registry, which
+    is filled at application start and on first request for ones added later.
+    """
+    dispatch = registry.auction_route_dispatch
+    if pmt not in dispatch:
+        model = registry.auction_procurementMethodTypes.get(pmt)
+        configurator = model and registry.adapters.lookup(
+            (implementedBy(model), IRequest), IContentConfigurator
+        )
+        dispatch[pmt] = (
+            registry.pmtConfigurator.get(pmt),
+            getattr(configurator, 'awarding_type', None) if pmt else None
+        )
+    return dispatch[pmt]
+
+
+def build_route_dispatch(event):
+    registry = event.app.registry
+    for pmt in registry.auction_procurementMethodTypes:
+        get_route_dispatch(registry, pmt)
+
+
+def get_auction_route_dispatch(request):
+    auction = request.auction
+    if auction is None:
+        return None
+    return get_route_dispatch(request.registry, getattr(auction, 'procurementMethodType', None))
 
 
 class isAuction(object):
@@ -462,20 +728,16 @@ class isAuction(object):
     phash = text
 
     def __call__(self, context, request):
-        pmt = getattr(request.auction, 'procurementMethodType', None)
-        if request.auction is not None:
-            return request.registry.pmtConfigurator.get(pmt) == self.val
-        return False
+        dispatch = request.auction_route_dispatch
+        return dispatch is not None and dispatch[0] == self.val
 
 
 class SubscribersPicker(isAuction):
     """ Subscriber predicate. """
 
     def __call__(self, event):
-        pmt = getattr(event.request.auction, 'procurementMethodType', None)
-        if event.request.auction is not None:
-            return event.request.registry.pmtConfigurator.get(pmt) == self.val
-        return False
+        dispatch = event.request.auction_route_dispatch
+        return dispatch is not None and dispatch[0] == self.val
 
 
 def register_auction_procurementMethodType(config, model, pmt):
@@ -489,6 +751,24 @@ def register_auction_procurementMethodType(config, model, pmt):
     """
     config.registry.pmtConfigurator[pmt] = model._procedure_type
     config.registry.auction_procurementMethodTypes[pmt] = model
+    config.registry.auction_route_dispatch.pop(pmt, None)
+
+
+def register_auction_listing_projection(config, pmt, fields):
+    """Register fields emitted by the listing views for a procurementMethodType.
+    :param config:
+        The pyramid configuration object that will be populated.
+    :param pmt:
+        Procurement method type of auctions
+    :param fields:
+        Fields emitted in addition to the ones of any procurementMethodType
+    """
+    # the views are replaced right away, as the API syncs the design docs
+    # before the configuration is committed; the action only detects conflicts
+    projections = config.registry.auction_listing_projections
+    projections[pmt] = list(fields)
+    add_listing_projections(projections)
+    config.action(('auction_listing_projection', pmt))
 
 
 def get_plugins(plugins_map):
@@ -12,7 +12,10 @@ from openprocurement.api.validation import (
     validate_patch_document_data,  # noqa forwarded import
 )
 
-from openprocurement.auctions.core.constants import STATUS4ROLE
+from openprocurement.auctions.core.constants import (
+    AUCTIONS_BATCH_MAX_SIZE,
+    STATUS4ROLE
+)
 
 
 def validate_document_data(request, **kwargs):
@@ -46,7 +49,10 @@ def validate_auction_data(request, **kwargs):
     data = validate_json_data(request)
     if data is None:
         return
+    validate_auction_creation_data(request, data)
+
 
+def validate_auction_creation_data(request, data):
     model = request.auction_from_data(data, create=False)
     if not request.check_accreditation(model.create_accreditation):
         request.errors.add(
@@ -67,6 +73,25 @@ def validate_auction_data(request, **kwargs):
         return
 
 
+def validate_auctions_batch_data(request, **kwargs):
+    update_logging_context(request, {'auction_id': '__new__'})
+    try:
+        json = request.json_body
+    except ValueError, e:
+        request.errors.add('body', 'data', e.message)
+        request.errors.status = 422
+        raise error_handler(request)
+    if not isinstance(json, dict) or not isinstance(json.get('data'), list) or not json['data']:
+        request.errors.add('body', 'data', 'Data not available')
+        request.errors.status = 422
+        raise error_handler(request)
+    if len(json['data']) > AUCTIONS_BATCH_MAX_SIZE:
+        request.errors.add('body', 'data', 'Batch can contain up to {} auctions'.format(AUCTIONS_BATCH_MAX_SIZE))
+        request.errors.status = 422
+        raise error_handler(request)
+    request.validated['batch'] = json['data']
+
+
 def validate_patch_auction_data(request, **kwargs):
     data = validate_json_data(request)
     if data is None:
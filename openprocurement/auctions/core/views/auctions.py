@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 from functools import partial
+from time import time
+from urllib import urlencode
+
+from pyramid.httpexceptions import HTTPError
+from schematics.exceptions import ModelValidationError
 
 from openprocurement.api.utils import get_now
 from openprocurement.api.utils import (
@@ -15,21 +20,34 @@ from openprocurement.api.utils import (
 
 from openprocurement.auctions.core.design import (
     FIELDS,
+    FilteredView,
     auctions_by_dateModified_view,
     auctions_real_by_dateModified_view,
     auctions_test_by_dateModified_view,
     auctions_by_local_seq_view,
     auctions_real_by_local_seq_view,
     auctions_test_by_local_seq_view,
+    auctions_type_by_dateModified_view,
+    auctions_real_type_by_dateModified_view,
+    auctions_test_type_by_dateModified_view,
+    auctions_type_status_by_dateModified_view,
+    auctions_real_type_status_by_dateModified_view,
+    auctions_test_type_status_by_dateModified_view,
 )
 from openprocurement.auctions.core.interfaces import IAuctionManager
 from openprocurement.auctions.core.utils import (
+    add_auction_revision,
     generate_auction_id,
+    generate_auction_ids,
     save_auction,
     auction_serialize,
     opresource,
     get_auction_route_name)
-from openprocurement.auctions.core.validation import validate_auction_data
+from openprocurement.auctions.core.validation import (
+    validate_auction_creation_data,
+    validate_auction_data,
+    validate_auctions_batch_data
+)
 
 
 VIEW_MAP = {
@@ -42,6 +60,16 @@ CHANGES_VIEW_MAP = {
     u'test': auctions_test_by_local_seq_view,
     u'_all_': auctions_by_local_seq_view,
 }
+TYPE_VIEW_MAP = {
+    u'': auctions_real_type_by_dateModified_view,
+    u'test': auctions_test_type_by_dateModified_view,
+    u'_all_': auctions_type_by_dateModified_view,
+}
+TYPE_STATUS_VIEW_MAP = {
+    u'': auctions_real_type_status_by_dateModified_view,
+    u'test': auctions_test_type_status_by_dateModified_view,
+    u'_all_': auctions_type_status_by_dateModified_view,
+}
 FEED = {
     u'dateModified': VIEW_MAP,
     u'changes': CHANGES_VIEW_MAP,
@@ -64,6 +92,60 @@ class AuctionsResource(APIResourceListing):
         self.object_name_for_listing = 'Auctions'
         self.log_message_id = 'auction_list_custom'
 
+    @json_view(permission='view_listing')
+    def get(self):
+        """Auctions List
+
+        With `procurementMethodType` and optionally `status` the feed
+        lists only auctions with these values.
+
+        With `feed=changes` and `longpoll=<seconds>` the request waits for
+        new changes up to the given number of seconds while there are none.
+        """
+        params = self.request.params
+        extra = [(i, params[i]) for i in ('procurementMethodType', 'status', 'longpoll') if params.get(i)]
+        pmt = params.get('procurementMethodType', '')
+        status = params.get('status', '')
+        longpoll = params.get('longpoll', '')
+        changes = params.get('feed') == 'changes'
+        if status and not pmt:
+            self.request.errors.add('params', 'procurementMethodType', 'Should be given with status')
+        if pmt and changes:
+            self.request.errors.add('params', 'feed', 'Changes feed can\'t be filtered')
+        if longpoll and not longpoll.isdigit():
+            self.request.errors.add('params', 'longpoll', 'Should be a number of seconds')
+        if self.request.errors:
+            self.request.errors.status = 422
+            return
+        if pmt:
+            view_map, prefix = (TYPE_STATUS_VIEW_MAP, [pmt, status]) if status else (TYPE_VIEW_MAP, [pmt])
+            self.VIEW_MAP = dict([(i, FilteredView(j, prefix)) for i, j in view_map.items()])
+            self.FEED = dict(self.FEED, dateModified=self.VIEW_MAP)
+        if longpoll and changes and not params.get('descending'):
+            data = self.get_longpoll(int(longpoll))
+        else:
+            data = super(AuctionsResource, self).get()
+        for page in ('next_page', 'prev_page'):
+            if data and extra and page in data:
+                for i in ('path', 'uri'):
+                    data[page][i] += ('&' if '?' in data[page][i] else '?') + urlencode(extra)
+        return data
+
+    def get_longpoll(self, longpoll):
+        deadline = time() + min(longpoll, self.request.registry.changes_longpoll_timeout)
+        list_view = self.CHANGES_VIEW_MAP.get(self.request.params.get('mode', ''), self.CHANGES_VIEW_MAP[u''])
+        while True:
+            # changes made while the view is read wake up the next wait
+            since = self.db.info()['update_seq']
+            data = super(AuctionsResource, self).get()
+            timeout = deadline - time()
+            if not data or data['data'] or timeout <= 0:
+                return data
+            self.db.changes(
+                feed='longpoll', since=since, limit=1, timeout=int(timeout * 1000),
+                filter='_view', view='{}/{}'.format(list_view.design, list_view.name)
+            )
+
     @json_view(content_type="application/json", permission='create_auction', validators=(validate_auction_data,))
     def post(self):
         """This API request is targeted to creating new Auctions by procuring organizations.
@@ -217,17 +299,11 @@ class AuctionsResource(APIResourceListing):
             self.request.validated['auction'],
             IAuctionManager
         ).create_auction(self.request)
-        auction_id = generate_id()
         auction = self.request.validated['auction']
-        auction.id = auction_id
-        auction.auctionID = generate_auction_id(get_now(), self.db, self.server_id)
-        if hasattr(auction, "initialize"):
-            auction.initialize()
-        status = self.request.json_body['data'].get('status')
-        if status and status in ['draft', 'pending.verification']:
-            auction.status = status
-        acc = set_ownership(auction, self.request)
-        self.request.validated['auction'] = auction
+        auctionID = generate_auction_id(get_now(), self.db, self.server_id,
+                                        self.request.registry.auction_id_block_size)
+        acc = init_auction(self.request, auction, auctionID, self.request.json_body['data'].get('status'))
+        auction_id = auction.id
         self.request.validated['auction_src'] = {}
         if save_auction(self.request):
             self.LOGGER.info('Created auction {} ({})'.format(auction_id, auction.auctionID),
@@ -237,3 +313,118 @@ class AuctionsResource(APIResourceListing):
             self.request.response.headers[
                 'Location'] = self.request.route_url(route_name=auction_route_name, auction_id=auction_id)
             return {'data': auction.serialize(auction.status), 'access': acc}
+
+
+def init_auction(request, auction, auctionID, status=None):
+    """Prepare the validated auction to be created by POST /auctions
+    or /auctions/batch: set its ids, initial status and ownership.
+
+    Returns the access of the auction.
+    """
+    request.validated['auction'] = auction
+    auction.id = generate_id()
+    auction.auctionID = auctionID
+    if hasattr(auction, "initialize"):
+        auction.initialize()
+    if status and status in ['draft', 'pending.verification']:
+        auction.status = status
+    return set_ownership(auction, request)
+
+
+@opresource(name='AuctionsBatch',
+            path='/auctions/batch',
+            description="Creation of auctions in batches")
+class AuctionsBatchResource(APIResource):
+
+    def item_error(self):
+        error = {'status': 'error', 'errors': list(self.request.errors)}
+        del self.request.errors[:]
+        return error
+
+    def validate_item(self, data):
+        """Validate auction data the same way as POST /auctions does,
+        including validators of the auction manager of the procedure.
+
+        Returns the created auction model or None if data is invalid,
+        errors are left in `request.errors`.
+        """
+        self.request.validated.pop('auction', None)
+        if not isinstance(data, dict):
+            self.request.errors.add('body', 'data', 'Data not available')
+            return
+        try:
+            validate_auction_creation_data(self.request, data)
+            if self.request.errors:
+                return
+            self.request.registry.getAdapter(
+                self.request.validated['auction'],
+                IAuctionManager
+            ).create_auction(self.request)
+        except HTTPError:
+            return
+        if not self.request.errors:
+            return self.request.validated['auction']
+
+    @json_view(content_type="application/json", permission='create_auction', validators=(validate_auctions_batch_data,))
+    def post(self):
+        """Creating new Auctions in a batch
+
+        Request contains a list of auctions in `data`, each of them is
+        validated and created as with POST /auctions. The response contains
+        the result for each auction in the same order: the auction with
+        its access token or errors.
+
+        .. sourcecode:: http
+
+            POST /auctions/batch HTTP/1.1
+            Host: example.com
+            Accept: application/json
+
+            {
+                "data": [
+                    {...},
+                    {...}
+                ]
+            }
+
+        """
+        results = []
+        auctions = []
+        for data in self.request.validated['batch']:
+            auction = self.validate_item(data)
+            if auction is None:
+                results.append(self.item_error())
+                continue
+            auctions.append((len(results), auction, data.get('status')))
+            results.append(None)
+        if not auctions:
+            self.request.response.status = 422
+            return {'data': results}
+
+        now = get_now()
+        auction_ids = generate_auction_ids(now, self.db, self.server_id, len(auctions))
+        docs = []
+        for (index, auction, status), auctionID in zip(auctions, auction_ids):
+            access = init_auction(self.request, auction, auctionID, status)
+            add_auction_revision(self.request, auction, {})
+            try:
+                auction.validate()
+            except ModelValidationError, e:
+                for i in e.message:
+                    self.request.errors.add('body', i, e.message[i])
+                results[index] = self.item_error()
+                continue
+            results[index] = {'access': access}
+            docs.append((index, auction, auction.to_primitive()))
+
+        for (index, auction, doc), (success, doc_id, rev) in zip(docs, self.db.update([i[2] for i in docs])):
+            if not success:
+                self.request.errors.add('body', 'data', str(rev))
+                results[index] = self.item_error()
+                continue
+            auction._rev = rev
+            results[index]['data'] = auction.serialize(auction.status)
+            self.LOGGER.info('Created auction {} ({})'.format(auction.id, auction.auctionID),
+                        extra=context_unpack(self.request, {'MESSAGE_ID': 'auction_create'}, {'auction_id': auction.id, 'auctionID': auction.auctionID}))
+        self.request.response.status = 201 if any(['data' in i for i in results]) else 422
+        return {'data': results}
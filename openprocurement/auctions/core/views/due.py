@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from schematics.exceptions import ConversionError
+
+from openprocurement.api.models.auction_models import IsoDateTimeType
+
+from openprocurement.auctions.core.constants import (
+    DUE_AUCTIONS_PAGE_SIZE,
+    DUE_AUCTIONS_PAGE_MAX_SIZE
+)
+from openprocurement.auctions.core.design import auctions_by_next_check_view
+from openprocurement.auctions.core.utils import (
+    APIResource,
+    get_now,
+    json_view,
+    opresource
+)
+
+
+def get_next_check_key(date):
+    """Key of auctions_by_next_check_view for the date"""
+    date = (date - date.utcoffset()).replace(tzinfo=None)
+    return '{}.{:03}Z'.format(date.strftime('%Y-%m-%dT%H:%M:%S'), date.microsecond // 1000)
+
+
+@opresource(name='AuctionsDue',
+            path='/auctions/due',
+            description="Auctions due for a check")
+class AuctionsDueResource(APIResource):
+
+    @json_view(permission='view_listing')
+    def get(self):
+        """Due Auctions List
+
+        Auctions which `next_check` comes until the given time (now by
+        default), earliest first. While there are more of them `next_page`
+        links the page starting with the next auction.
+
+        Example request to get due auctions:
+
+        .. sourcecode:: http
+
+            GET /auctions/due?until=2018-01-01T00:00:00%2B02:00&limit=100 HTTP/1.1
+            Host: example.com
+            Accept: application/json
+
+        """
+        until = self.request.params.get('until', '')
+        try:
+            until = IsoDateTimeType().to_native(until) if until else get_now()
+        except ConversionError:
+            self.request.errors.add('querystring', 'until', 'Until should be a date')
+        limit = self.request.params.get('limit', str(DUE_AUCTIONS_PAGE_SIZE))
+        limit = int(limit) if limit.isdigit() else -1
+        if not 0 < limit <= DUE_AUCTIONS_PAGE_MAX_SIZE:
+            self.request.errors.add('querystring', 'limit', 'Limit should be an integer from 1 to {}'.format(DUE_AUCTIONS_PAGE_MAX_SIZE))
+        # offset is the key and the id of the first auction of the page
+        offset = self.request.params.get('offset', '')
+        startkey, _, startkey_docid = offset.partition(',')
+        if offset and not (startkey and startkey_docid):
+            self.request.errors.add('querystring', 'offset', 'Offset should be taken from next_page')
+        if self.request.errors:
+            self.request.errors.status = 422
+            return
+        options = {'endkey': get_next_check_key(until), 'limit': limit + 1}
+        if offset:
+            options.update(startkey=startkey, startkey_docid=startkey_docid)
+        rows = list(auctions_by_next_check_view(self.db, **options))
+        data = {'data': [{'id': i.id, 'next_check': i.value} for i in rows[:limit]]}
+        if len(rows) > limit:
+            params = {
+                'offset': '{},{}'.format(rows[limit].key, rows[limit].id),
+                'until': until.isoformat(),
+                'limit': limit,
+            }
+            data['next_page'] = {
+                "offset": params['offset'],
+                "path": self.request.route_path('AuctionsDue', _query=params),
+                "uri": self.request.route_url('AuctionsDue', _query=params)
+            }
+        return data
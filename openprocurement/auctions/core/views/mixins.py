@@ -2,6 +2,10 @@
 from openprocurement.api.utils import (
     update_file_content_type, get_file, upload_file
 )
+from openprocurement.auctions.core.cache import (
+    get_auction_stable_until,
+    serialize_cached,
+)
 from openprocurement.auctions.core.interfaces import IAuctionManager
 from openprocurement.auctions.core.constants import STATUS4ROLE
 from openprocurement.auctions.core.utils import (
@@ -13,6 +17,7 @@ from openprocurement.auctions.core.utils import (
     check_status,
     get_now,
     json_view,
+    replay_on_conflict,
     save_auction,
     set_ownership,
 )
@@ -213,6 +218,7 @@ class AuctionAuctionResource(APIResource):
 class AuctionBidResource(APIResource):
 
     @json_view(content_type="application/json", permission='create_bid', validators=(validate_bid_data,))
+    @replay_on_conflict
     def collection_post(self):
         """Registration of new bid proposal
 
@@ -360,7 +366,8 @@ class AuctionBidResource(APIResource):
             self.request.errors.add('body', 'data', 'Can\'t view bids in current ({}) auction status'.format(self.request.validated['auction_status']))
             self.request.errors.status = 403
             return
-        return {'data': [i.serialize(self.request.validated['auction_status']) for i in auction.bids]}
+        role = self.request.validated['auction_status']
+        return {'data': serialize_cached(self.request, role, lambda: [i.serialize(role) for i in auction.bids])}
 
     @json_view(permission='view_auction')
     def get(self):
@@ -401,6 +408,7 @@ class AuctionBidResource(APIResource):
         return {'data': self.request.context.serialize(self.request.validated['auction_status'])}
 
     @json_view(content_type="application/json", permission='edit_bid', validators=(validate_patch_bid_data,))
+    @replay_on_conflict
     def patch(self):
         """Update of proposal
 
@@ -1255,9 +1263,13 @@ class AuctionResource(APIResource):
 
         """
         if self.request.authenticated_role == 'chronograph':
-            auction_data = self.context.serialize('chronograph_view')
+            role = 'chronograph_view'
         else:
-            auction_data = self.context.serialize(self.context.status)
+            role = self.context.status
+        auction_data = serialize_cached(
+            self.request, role, lambda: self.context.serialize(role),
+            get_auction_stable_until(self.context, get_now())
+        )
         return {'data': auction_data}
 
     #@json_view(content_type="application/json", validators=(validate_auction_data, ), permission='edit_auction')
@@ -1272,6 +1284,7 @@ class AuctionResource(APIResource):
         #return {'data': auction.serialize(auction.status)}
 
     @json_view(content_type="application/json", validators=(validate_patch_auction_data, ), permission='edit_auction')
+    @replay_on_conflict
     def patch(self):
         """Auction Edit (partial)
 
@@ -1346,12 +1359,14 @@ class AuctionDocumentResource(APIResource):
     def collection_get(self):
         """Auction Documents List"""
         if self.request.params.get('all', ''):
-            collection_data = [i.serialize("view") for i in self.context.documents]
+            collection_data = serialize_cached(
+                self.request, 'view_all', lambda: [i.serialize("view") for i in self.context.documents]
+            )
         else:
-            collection_data = sorted(dict([
+            collection_data = serialize_cached(self.request, 'view', lambda: sorted(dict([
                 (i.id, i.serialize("view"))
                 for i in self.context.documents
-            ]).values(), key=lambda i: i['dateModified'])
+            ]).values(), key=lambda i: i['dateModified']))
         return {'data': collection_data}
 
     @json_view(permission='upload_auction_documents', validators=(validate_file_upload,))
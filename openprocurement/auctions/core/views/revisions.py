@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from openprocurement.auctions.core.constants import (
+    REVISIONS_PAGE_SIZE,
+    REVISIONS_PAGE_MAX_SIZE
+)
+from openprocurement.auctions.core.revisions import get_auction_revisions
+from openprocurement.auctions.core.utils import (
+    APIResource,
+    json_view,
+    opresource
+)
+
+
+@opresource(name='AuctionRevisions',
+            path='/auctions/{auction_id}/revisions',
+            description="Auction revisions")
+class AuctionRevisionsResource(APIResource):
+
+    @json_view(permission='view_auction_revisions')
+    def get(self):
+        """Auction Revisions List
+
+        Example request to get revisions of auction:
+
+        .. sourcecode:: http
+
+            GET /auctions/64e93250be76435397e8c992ed4214d1/revisions?offset=100&limit=100 HTTP/1.1
+            Host: example.com
+            Accept: application/json
+
+        """
+        offset = self.request.params.get('offset', '0')
+        offset = int(offset) if offset.isdigit() else -1
+        limit = self.request.params.get('limit', str(REVISIONS_PAGE_SIZE))
+        limit = int(limit) if limit.isdigit() else -1
+        if offset < 0:
+            self.request.errors.add('querystring', 'offset', 'Offset should be a non-negative integer')
+        if not 0 < limit <= REVISIONS_PAGE_MAX_SIZE:
+            self.request.errors.add('querystring', 'limit', 'Limit should be an integer from 1 to {}'.format(REVISIONS_PAGE_MAX_SIZE))
+        if self.request.errors:
+            self.request.errors.status = 422
+            return
+        auction = self.request.validated['auction']
+        revisions, total = get_auction_revisions(self.db, auction, offset, limit)
+        data = {
+            'data': revisions,
+            'total': total,
+        }
+        if offset + len(revisions) < total:
+            params = {'offset': offset + len(revisions), 'limit': limit}
+            data['next_page'] = {
+                "offset": params['offset'],
+                "path": self.request.route_path('AuctionRevisions', auction_id=auction.id, _query=params),
+                "uri": self.request.route_url('AuctionRevisions', auction_id=auction.id, _query=params)
+            }
+        return data
@@ -9,6 +9,9 @@ entry_points = {
     ],
     'openprocurement.tests': [
         'auctions.core = openprocurement.auctions.core.tests.main:suite'
+    ],
+    'console_scripts': [
+        'auctions_resolve_conflicts = openprocurement.auctions.core.conflicts:main'
     ]
 }
 requires = [